@@ -0,0 +1,195 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from scipy import special
+
+from scripts.analysis.regression import (
+    MERGED_DATA_PATH, TICKERS_FILE, RESULTS_DIR, YEARS_TO_INCLUDE, BASE_PREDICTORS,
+    MANUFACTURING_PMI, SERVICES_PMI, load_sample, load_tickers,
+)
+
+# ------------------------------------------------------------------------
+# 1) Define Paths and Indicators
+# ------------------------------------------------------------------------
+
+CORRELATIONS_PATH = os.path.join(RESULTS_DIR, "correlations.parquet")
+
+# Every predictor any regression model uses
+INDICATORS = BASE_PREDICTORS + (MANUFACTURING_PMI, SERVICES_PMI)
+
+# Relative size below which a pair's variance counts as zero
+VARIANCE_TOLERANCE = 1e-10
+
+# ------------------------------------------------------------------------
+# 2) Pairwise-Complete Correlations
+# ------------------------------------------------------------------------
+
+def standardize(values):
+    """
+    Shifts and scales each column to O(1) (correlations are unchanged) and
+    zeroes missing values. Returns (standardized values, presence mask).
+    """
+    mask = ~np.isnan(values)
+    # Means and spreads from the mask counts: columns without values get 0 and 1
+    count = np.maximum(mask.sum(axis=0), 1)
+    mean = np.where(mask, values, 0.0).sum(axis=0) / count
+    centered = np.where(mask, values - mean, 0.0)
+    scale = np.sqrt((centered ** 2).sum(axis=0) / count)
+    scale = np.where(scale > 0, scale, 1.0)
+    return centered / scale, mask.astype("float64")
+
+
+def masked_correlation(A, mask_a, B, mask_b):
+    """
+    Pairwise-complete Pearson correlations between the columns of two
+    standardize()d arrays. With the missing values zeroed, the per-pair
+    counts, sums and cross products are the matrix products M_A'M_B,
+    A'M_B, M_A'B, A'B etc., so all pairs are computed at once.
+
+    Returns:
+        (r, n_obs): (a x b) arrays; r is NaN where a pair has fewer than
+        three observations or no variance.
+    """
+    n = mask_a.T @ mask_b
+    r = correlation_from_sums(n, A.T @ mask_b, mask_a.T @ B, (A ** 2).T @ mask_b, mask_a.T @ (B ** 2), A.T @ B)
+    return r, n
+
+
+def correlation_from_sums(n, sum_a, sum_b, sum_aa, sum_bb, sum_ab):
+    """
+    Pearson correlations from per-pair (possibly weighted) counts, sums,
+    sums of squares and cross products, over the rows where both series
+    are present. NaN where a pair has fewer than three observations or no
+    variance.
+    """
+    # A column that is constant over a pair's rows leaves only rounding error
+    variance_a = n * sum_aa - sum_a ** 2
+    variance_b = n * sum_bb - sum_b ** 2
+    variance_a[variance_a <= VARIANCE_TOLERANCE * n * sum_aa] = 0.0
+    variance_b[variance_b <= VARIANCE_TOLERANCE * n * sum_bb] = 0.0
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = variance_a * variance_b
+        r = np.clip((n * sum_ab - sum_a * sum_b) / np.sqrt(variance), -1.0, 1.0)
+    r[(n < 3) | ~(variance > 0)] = np.nan
+    return r
+
+
+def pairwise_correlation(A, B):
+    """
+    Pearson correlations between every column of A (n x a) and every
+    column of B (n x b), each pair over the rows where both are present
+    (as corr.test with pairwise-complete observations).
+
+    Returns:
+        (r, p_value, n_obs): (a x b) arrays. p-values are two-sided t-tests
+        with n_obs - 2 degrees of freedom; NaN where a pair has fewer than
+        three observations or no variance.
+    """
+    r, n = masked_correlation(*standardize(np.asarray(A, dtype="float64")),
+                              *standardize(np.asarray(B, dtype="float64")))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        df = n - 2
+        t = r * np.sqrt(df / (1.0 - r ** 2))
+        p_value = 2.0 * special.stdtr(np.maximum(df, 1), -np.abs(t))
+    p_value[np.isnan(r)] = np.nan
+    return r, p_value, n.astype("int64")
+
+# ------------------------------------------------------------------------
+# 3) Correlation Table
+# ------------------------------------------------------------------------
+
+def correlation_table(sample, tickers, indicators=INDICATORS):
+    """
+    Correlations of every ticker's closing price, and of every indicator,
+    with every indicator, in one pass (the indicator x indicator block is
+    computed once, not once per ticker).
+
+    Returns:
+        pd.DataFrame: Long table (variable, indicator, n_obs, r, p_value),
+        with `variable` a ticker or an indicator (both categorical).
+    """
+    indicators = [name for name in indicators if name in sample.columns]
+    present = [ticker for ticker in tickers if f"{ticker}_closing" in sample.columns]
+    if len(present) < len(tickers):
+        print(f"[WARNING] {len(tickers) - len(present)} tickers have no closing column and are skipped.")
+
+    variables = present + indicators
+    values = sample[[f"{ticker}_closing" for ticker in present] + indicators].to_numpy(dtype="float64")
+    r, p_value, n = pairwise_correlation(values, sample[indicators].to_numpy(dtype="float64"))
+
+    return pd.DataFrame({
+        "variable": pd.Categorical(np.repeat(variables, len(indicators)), categories=variables),
+        "indicator": pd.Categorical(np.tile(indicators, len(variables)), categories=indicators),
+        "n_obs": n.ravel().astype("int32"),
+        "r": r.ravel().astype("float32"),
+        "p_value": p_value.ravel(),
+    })
+
+
+def save_correlations(table, path=CORRELATIONS_PATH):
+    """Writes the table as dictionary-encoded Parquet, replacing `path` atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    pq.write_table(pa.Table.from_pandas(table, preserve_index=False), tmp_path)
+    os.replace(tmp_path, path)
+    print(f"Correlation table ({len(table)} pairs) saved to {path}")
+
+
+def query_correlations(path=CORRELATIONS_PATH, variables=None, indicators=None, max_p=None):
+    """
+    Reads the pairs matching all given filters: `variables` (tickers or
+    indicators), `indicators`, and p_value <= `max_p`. Filters are pushed
+    down to the Parquet reader.
+
+    Raises:
+        FileNotFoundError: If `path` does not exist.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Correlation table does not exist at path: {path}")
+    filters = []
+    if variables is not None:
+        filters.append(("variable", "in", list(variables)))
+    if indicators is not None:
+        filters.append(("indicator", "in", list(indicators)))
+    if max_p is not None:
+        filters.append(("p_value", "<=", max_p))
+    table = pq.read_table(path, filters=filters or None).to_pandas()
+    for column in ("variable", "indicator"):
+        table[column] = table[column].astype(str)
+    return table
+
+
+def run_correlations(csv_path=MERGED_DATA_PATH, ticker_file=TICKERS_FILE, output_path=CORRELATIONS_PATH,
+                     years=YEARS_TO_INCLUDE, sample=None):
+    """Builds and saves the correlation table on the regression sample (or `sample`, if given)."""
+    sample = load_sample(csv_path, years) if sample is None else sample
+    tickers = load_tickers(ticker_file)
+
+    started = time.perf_counter()
+    table = correlation_table(sample, tickers)
+    print(f"[INFO] Correlated {table['variable'].nunique()} series with {table['indicator'].nunique()} "
+          f"indicators in {time.perf_counter() - started:.3f}s")
+    save_correlations(table, output_path)
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ticker x indicator correlation table from merged_all_data.csv.")
+    parser.add_argument("-input", default=MERGED_DATA_PATH, help="Path of merged_all_data.csv")
+    parser.add_argument("-tickers", default=TICKERS_FILE, help="Path of tickers.txt")
+    parser.add_argument("-output", default=CORRELATIONS_PATH, help="Path of the Parquet table")
+    parser.add_argument("-years", type=int, default=YEARS_TO_INCLUDE, help="Years of history to include")
+    args = parser.parse_args()
+
+    try:
+        run_correlations(args.input, args.tickers, args.output, args.years)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,422 @@
+import os
+import sys
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+from scripts.utils.dates import parse_dates
+
+# ------------------------------------------------------------------------
+# 1) Define Paths and Model Settings
+# ------------------------------------------------------------------------
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+MERGED_DATA_PATH = os.path.join(PROJECT_ROOT, "data", "formatted", "merged_all_data.csv")
+TICKERS_FILE = os.path.join(PROJECT_ROOT, "tickers.txt")
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "data", "analysis")
+
+# Predictors of every model, plus the sector PMI of the ticker (if any)
+BASE_PREDICTORS = ("CPI", "GDP", "LeadingIndex", "Unemployment Rate", "Interest_rate")
+
+MANUFACTURING_PMI = "manufacturing_pmi_Actual"
+SERVICES_PMI = "services_pmi_Actual"
+
+# Sector-specific PMI per ticker; tickers not listed use no PMI
+SECTOR_PMI = {
+    # Technology
+    "NVDA": MANUFACTURING_PMI, "AAPL": MANUFACTURING_PMI, "MSFT": SERVICES_PMI,
+    # Financial Services
+    "BX": SERVICES_PMI, "V": SERVICES_PMI, "JPM": SERVICES_PMI,
+    # Consumer Cyclical
+    "AMZN": SERVICES_PMI, "TSLA": MANUFACTURING_PMI, "SBUX": SERVICES_PMI,
+    # Healthcare
+    "LLY": MANUFACTURING_PMI, "ABBV": MANUFACTURING_PMI, "UNH": SERVICES_PMI,
+    # Communication Services
+    "GOOGL": SERVICES_PMI, "META": SERVICES_PMI, "NFLX": SERVICES_PMI,
+    # Industrials
+    "GE": MANUFACTURING_PMI, "RTX": MANUFACTURING_PMI, "LMT": MANUFACTURING_PMI,
+    # Consumer Defensive
+    "WMT": SERVICES_PMI, "COST": SERVICES_PMI, "TGT": SERVICES_PMI,
+    # Utilities
+    "NEE": MANUFACTURING_PMI,
+}
+
+# Sample: the last YEARS_TO_INCLUDE years up to the latest date
+YEARS_TO_INCLUDE = 4
+
+# Stepwise thresholds: enter below PENT, remove above PREM
+PENT = 0.05
+PREM = 0.10
+
+# ------------------------------------------------------------------------
+# 2) Inputs
+# ------------------------------------------------------------------------
+
+def load_tickers(ticker_file=TICKERS_FILE):
+    """
+    Reads tickers.txt with whitespace removed and '.' replaced by '-'
+    (e.g. BRK.B -> BRK-B, as in the stock column names).
+
+    Raises:
+        FileNotFoundError: If `ticker_file` does not exist.
+    """
+    if not os.path.exists(ticker_file):
+        raise FileNotFoundError(f"Ticker file does not exist at path: {ticker_file}")
+    with open(ticker_file, "r", encoding="utf-8") as f:
+        tickers = ["".join(line.split()).replace(".", "-") for line in f]
+    return [ticker for ticker in tickers if ticker]
+
+
+def load_sample(csv_path=MERGED_DATA_PATH, years=YEARS_TO_INCLUDE):
+    """
+    Reads merged_all_data.csv and keeps the rows of the last `years` years
+    (all rows if `years` is None).
+
+    Raises:
+        FileNotFoundError: If `csv_path` does not exist.
+        ValueError: If no rows fall in the window.
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"CSV file does not exist at path: {csv_path}")
+    frame = pd.read_csv(csv_path)
+    frame["Date"] = parse_dates(frame["Date"])
+
+    if years is None:
+        sample = frame.dropna(subset=["Date"]).reset_index(drop=True)
+        if sample.empty:
+            raise ValueError(f"No dated rows in {csv_path}")
+    else:
+        start_date = frame["Date"].max() - pd.DateOffset(years=years)
+        sample = frame[frame["Date"] >= start_date].reset_index(drop=True)
+        if sample.empty:
+            raise ValueError(f"No data available since {start_date:%Y-%m-%d}")
+    print(f"[INFO] Sample: {len(sample)} rows from {sample['Date'].min():%Y-%m-%d} to {sample['Date'].max():%Y-%m-%d}")
+    return sample
+
+# ------------------------------------------------------------------------
+# 3) Batched OLS on a Shared Predictor Matrix
+# ------------------------------------------------------------------------
+
+class DesignGroup:
+    """
+    One predictor matrix X (n x p, without intercept) shared by the k
+    response columns Y (n x k) of a set of tickers.
+
+    X is centered and scaled to unit column norm once, and its Gram matrix
+    (the predictors' correlation matrix) and the cross products with every
+    response are formed once. Any subset of predictors is then fitted for
+    all responses together by solving a small |S| x |S| system, which is
+    what stepwise selection needs at every step.
+    """
+
+    def __init__(self, predictors, X, Y):
+        self.predictors = tuple(predictors)
+        self.n = X.shape[0]
+        self.x_mean = X.mean(axis=0)
+        self.y_mean = Y.mean(axis=0)
+        Xc = X - self.x_mean
+        self.x_scale = np.sqrt((Xc ** 2).sum(axis=0))
+        Z = Xc / self.x_scale
+        Yc = Y - self.y_mean
+        self.gram = Z.T @ Z
+        self.cross = Z.T @ Yc
+        self.tss = (Yc ** 2).sum(axis=0)
+
+    def fit(self, subset, columns=slice(None)):
+        """
+        Fits y ~ 1 + X[:, subset] for the response `columns` (indices into
+        Y). Returns a dict of arrays: coefficients, std errors, t and p
+        values (|S| x k, original units; the intercept in separate keys),
+        rss, sigma, df_residual, r_squared, adj_r_squared, f_statistic and
+        f_p_value (each of length k).
+        """
+        subset = list(subset)
+        cross = self.cross[:, columns]
+        tss = self.tss[columns]
+        df = self.n - 1 - len(subset)
+
+        if subset:
+            inverse = np.linalg.pinv(self.gram[np.ix_(subset, subset)], hermitian=True)
+            beta = inverse @ cross[subset]
+            rss = tss - (beta * cross[subset]).sum(axis=0)
+        else:
+            inverse = np.zeros((0, 0))
+            beta = np.zeros((0, cross.shape[1]))
+            rss = tss.copy()
+        rss = np.maximum(rss, 0.0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sigma2 = rss / df if df > 0 else np.full_like(rss, np.nan)
+            scale = self.x_scale[subset][:, None]
+            coefficients = beta / scale
+            std_errors = np.sqrt(np.outer(np.diag(inverse), sigma2)) / scale
+            t_values = coefficients / std_errors
+
+            # Intercept: y_mean - sum(b_j * x_mean_j)
+            means = self.x_mean[subset]
+            u = means / self.x_scale[subset]
+            intercept = self.y_mean[columns] - means @ coefficients
+            intercept_se = np.sqrt(sigma2 * (1.0 / self.n + u @ inverse @ u))
+
+            r_squared = 1.0 - rss / tss
+            adj_r_squared = 1.0 - (1.0 - r_squared) * (self.n - 1) / df
+            f_statistic = ((tss - rss) / max(len(subset), 1)) / sigma2
+
+        return {
+            "coefficients": coefficients,
+            "std_errors": std_errors,
+            "t_values": t_values,
+            "p_values": _t_p_values(t_values, df),
+            "intercept": intercept,
+            "intercept_se": intercept_se,
+            "intercept_p": _t_p_values(intercept / intercept_se, df),
+            "rss": rss,
+            "sigma": np.sqrt(sigma2),
+            "df_residual": df,
+            "r_squared": r_squared,
+            "adj_r_squared": adj_r_squared,
+            "f_statistic": f_statistic if subset else np.full_like(rss, np.nan),
+            "f_p_value": special.fdtrc(len(subset), df, f_statistic) if subset else np.full_like(rss, np.nan),
+        }
+
+    def vif(self):
+        """Variance inflation factors of the predictors (the diagonal of the inverse correlation matrix)."""
+        return np.diag(np.linalg.pinv(self.gram, hermitian=True))
+
+
+def _t_p_values(t_values, df):
+    """Two-sided p-values of Student t statistics with `df` degrees of freedom."""
+    if df <= 0:
+        return np.full_like(np.asarray(t_values, dtype="float64"), np.nan)
+    return 2.0 * special.stdtr(df, -np.abs(t_values))
+
+# ------------------------------------------------------------------------
+# 4) Bidirectional p-value Stepwise Selection
+# ------------------------------------------------------------------------
+
+def _group_by_selection(selected, columns):
+    """Groups response indices by their current selection (rows of `selected`)."""
+    groups = {}
+    for column in columns:
+        groups.setdefault(selected[column].tobytes(), []).append(column)
+    return [(np.flatnonzero(selected[members[0]]), np.array(members)) for members in groups.values()]
+
+
+def stepwise_both(group, pent=PENT, prem=PREM, max_steps=None):
+    """
+    Bidirectional stepwise selection by p-value (as olsrr's
+    ols_step_both_p) for every response of `group` at once.
+
+    Starting from the intercept-only model, each step adds the candidate
+    with the smallest p-value if it is below `pent`, then removes the
+    selected predictor with the largest p-value if it is above `prem`.
+    A response stops when a step neither adds nor removes a predictor, or
+    after `max_steps` steps (default: twice the number of predictors).
+    Responses with the same selection are fitted together.
+
+    Returns:
+        (selected, steps): A (k x p) boolean array of the final selections,
+        and a list of (column, step, variable, action, p_value) records.
+    """
+    p = len(group.predictors)
+    k = group.cross.shape[1]
+    max_steps = 2 * p if max_steps is None else max_steps
+    selected = np.zeros((k, p), dtype=bool)
+    active = np.arange(k)
+    steps = []
+
+    for step in range(1, max_steps + 1):
+        if not len(active):
+            break
+        changed = np.zeros(k, dtype=bool)
+
+        # Forward: p-value of each candidate added to the current selection
+        best_p = np.full(k, np.inf)
+        best_j = np.full(k, -1)
+        for subset, columns in _group_by_selection(selected, active):
+            for j in range(p):
+                if j in subset:
+                    continue
+                p_values = group.fit(list(subset) + [j], columns)["p_values"][-1]
+                better = p_values < best_p[columns]
+                best_p[columns[better]] = p_values[better]
+                best_j[columns[better]] = j
+        enter = active[best_p[active] < pent]
+        selected[enter, best_j[enter]] = True
+        changed[enter] = True
+        for column in enter:
+            steps.append((column, step, group.predictors[best_j[column]], "entry", best_p[column]))
+
+        # Backward: drop the weakest selected predictor
+        for subset, columns in _group_by_selection(selected, active):
+            if not len(subset):
+                continue
+            p_values = group.fit(subset, columns)["p_values"]
+            worst = np.nanargmax(np.where(np.isnan(p_values), -np.inf, p_values), axis=0)
+            worst_p = p_values[worst, np.arange(len(columns))]
+            remove = worst_p > prem
+            for column, position, value in zip(columns[remove], worst[remove], worst_p[remove]):
+                selected[column, subset[position]] = False
+                changed[column] = True
+                steps.append((column, step, group.predictors[subset[position]], "removal", value))
+
+        active = active[changed[active]]
+    return selected, steps
+
+# ------------------------------------------------------------------------
+# 5) Universe-wide Analysis
+# ------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class RegressionResults:
+    """
+    Tidy result tables: `coefficients` (ticker, model, term, estimate,
+    std_error, t_value, p_value), `summary` (ticker, model, n_obs,
+    predictors, r_squared, adj_r_squared, sigma, f_statistic, f_p_value),
+    `steps` (ticker, step, variable, action, p_value) and `vif` (ticker,
+    variable, tolerance, vif). `model` is "full" or "stepwise".
+    """
+    coefficients: pd.DataFrame
+    summary: pd.DataFrame
+    steps: pd.DataFrame
+    vif: pd.DataFrame
+
+
+def _design_groups(sample, tickers, pmi_map):
+    """
+    Splits the tickers into groups sharing one predictor matrix: the same
+    predictor set and the same rows without missing values. Predictors
+    that are constant on a group's rows are dropped.
+    """
+    groups = {}
+    for ticker in tickers:
+        stock_column = f"{ticker}_closing"
+        if stock_column not in sample.columns:
+            print(f"[WARNING] Stock column {stock_column} not found in data. Skipping {ticker}.")
+            continue
+        predictors = list(BASE_PREDICTORS)
+        if pmi_map.get(ticker) is not None:
+            predictors.append(pmi_map[ticker])
+        missing = [column for column in predictors if column not in sample.columns]
+        if missing:
+            print(f"[WARNING] Missing predictor columns for {ticker}: {', '.join(missing)}. Skipping.")
+            continue
+        rows = sample[predictors + [stock_column]].notna().all(axis=1).to_numpy()
+        groups.setdefault((tuple(predictors), rows.tobytes()), (rows, []))[1].append(ticker)
+
+    for (predictors, _), (rows, members) in groups.items():
+        X = sample.loc[rows, list(predictors)].to_numpy(dtype="float64")
+        varying = X.std(axis=0) > 0 if len(X) else np.zeros(len(predictors), dtype=bool)
+        if not varying.all():
+            dropped = [name for name, keep in zip(predictors, varying) if not keep]
+            print(f"[INFO] Removing constant predictors for {len(members)} tickers: {', '.join(dropped)}")
+        kept = [name for name, keep in zip(predictors, varying) if keep]
+        if not kept or rows.sum() <= len(kept) + 1:
+            print(f"[WARNING] Not enough observations or predictors for {', '.join(members)}. Skipping.")
+            continue
+        Y = sample.loc[rows, [f"{ticker}_closing" for ticker in members]].to_numpy(dtype="float64")
+        yield members, DesignGroup(kept, X[:, varying], Y)
+
+
+def _model_rows(model, members, group, fitted):
+    """Result rows of (subset, columns, fit) triples for the tickers `members[columns]`."""
+    coefficients, summary = [], []
+    for subset, columns, fit in fitted:
+        for i, column in enumerate(columns):
+            ticker = members[column]
+            coefficients.append((ticker, model, "(Intercept)", fit["intercept"][i], fit["intercept_se"][i],
+                                 fit["intercept"][i] / fit["intercept_se"][i], fit["intercept_p"][i]))
+            for position, j in enumerate(subset):
+                coefficients.append((ticker, model, group.predictors[j], fit["coefficients"][position, i],
+                                     fit["std_errors"][position, i], fit["t_values"][position, i],
+                                     fit["p_values"][position, i]))
+            summary.append((ticker, model, group.n, " + ".join(group.predictors[j] for j in subset),
+                            fit["r_squared"][i], fit["adj_r_squared"][i], fit["sigma"][i],
+                            fit["f_statistic"][i], fit["f_p_value"][i]))
+    return coefficients, summary
+
+
+def run_regressions(sample, tickers, pmi_map=SECTOR_PMI, pent=PENT, prem=PREM):
+    """
+    Fits, for every ticker, the full OLS model of its closing price on the
+    macro predictors (plus its sector PMI), a bidirectional stepwise model,
+    and the VIF/tolerance of the full model's predictors.
+
+    Tickers sharing a predictor matrix (see _design_groups) are solved
+    together, so X is centered, scaled and cross-multiplied once per group
+    instead of once per ticker and model.
+
+    Returns:
+        RegressionResults
+    """
+    coefficients, summary, steps, vif = [], [], [], []
+    for members, group in _design_groups(sample, tickers, pmi_map):
+        everything = np.arange(len(members))
+        all_predictors = list(range(len(group.predictors)))
+        full = group.fit(all_predictors, everything)
+        rows = _model_rows("full", members, group, [(all_predictors, everything, full)])
+        coefficients += rows[0]
+        summary += rows[1]
+
+        selected, records = stepwise_both(group, pent=pent, prem=prem)
+        records.sort(key=lambda record: (record[0], record[1]))
+        steps += [(members[column], step, variable, action, p_value)
+                  for column, step, variable, action, p_value in records]
+        fitted = [(subset, columns, group.fit(subset, columns))
+                  for subset, columns in _group_by_selection(selected, everything)]
+        rows = _model_rows("stepwise", members, group, fitted)
+        coefficients += rows[0]
+        summary += rows[1]
+
+        factors = group.vif()
+        vif += [(ticker, name, 1.0 / value, value)
+                for ticker in members for name, value in zip(group.predictors, factors)]
+
+    return RegressionResults(
+        coefficients=pd.DataFrame(coefficients, columns=["ticker", "model", "term", "estimate", "std_error",
+                                                         "t_value", "p_value"]),
+        summary=pd.DataFrame(summary, columns=["ticker", "model", "n_obs", "predictors", "r_squared",
+                                               "adj_r_squared", "sigma", "f_statistic", "f_p_value"]),
+        steps=pd.DataFrame(steps, columns=["ticker", "step", "variable", "action", "p_value"]),
+        vif=pd.DataFrame(vif, columns=["ticker", "variable", "tolerance", "vif"]),
+    )
+
+
+def save_results(results, output_dir=RESULTS_DIR):
+    """Writes each result table to `output_dir`/regression_<table>.csv."""
+    os.makedirs(output_dir, exist_ok=True)
+    for name in ("coefficients", "summary", "steps", "vif"):
+        path = os.path.join(output_dir, f"regression_{name}.csv")
+        getattr(results, name).to_csv(path, index=False)
+    print(f"Regression results saved to {output_dir}")
+
+
+def run_analysis(csv_path=MERGED_DATA_PATH, ticker_file=TICKERS_FILE, output_dir=RESULTS_DIR,
+                 years=YEARS_TO_INCLUDE, pent=PENT, prem=PREM):
+    """Loads the sample and tickers, runs every regression and saves the result tables."""
+    sample = load_sample(csv_path, years)
+    tickers = load_tickers(ticker_file)
+    print(f"[INFO] Loaded {len(tickers)} tickers from {ticker_file}")
+    results = run_regressions(sample, tickers, pent=pent, prem=prem)
+    save_results(results, output_dir)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-ticker OLS, stepwise selection and VIF on merged_all_data.csv.")
+    parser.add_argument("-input", default=MERGED_DATA_PATH, help="Path of merged_all_data.csv")
+    parser.add_argument("-tickers", default=TICKERS_FILE, help="Path of tickers.txt")
+    parser.add_argument("-output", default=RESULTS_DIR, help="Directory for the result tables")
+    parser.add_argument("-years", type=int, default=YEARS_TO_INCLUDE, help="Years of history to include")
+    parser.add_argument("-pent", type=float, default=PENT, help="p-value to enter the stepwise model")
+    parser.add_argument("-prem", type=float, default=PREM, help="p-value to leave the stepwise model")
+    args = parser.parse_args()
+
+    try:
+        run_analysis(args.input, args.tickers, args.output, args.years, args.pent, args.prem)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,289 @@
+import os
+import sys
+import time
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from scripts.analysis.regression import MERGED_DATA_PATH, TICKERS_FILE, RESULTS_DIR, BASE_PREDICTORS, load_sample, load_tickers
+
+# ------------------------------------------------------------------------
+# 1) Define Paths and Settings
+# ------------------------------------------------------------------------
+
+ROLLING_PATH = os.path.join(RESULTS_DIR, "rolling_ols.npz")
+
+# Default window: about one trading year (None = expanding window)
+WINDOW = 252
+
+# The sufficient statistics are rebuilt from the window's rows this often,
+# so rounding error from adding and removing rows cannot accumulate
+REFRESH_EVERY = 252
+
+# Within-window variance (of a standardized predictor) below which the
+# predictor is constant in that window and its coefficient is reported NaN
+CONSTANT_TOLERANCE = 1e-10
+
+# ------------------------------------------------------------------------
+# 2) Aligned Panel
+# ------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class RegressionPanel:
+    """
+    Predictors and responses on one date axis: `X[i]` holds the
+    `predictors` on `dates[i]` and `Y[i, j]` the closing price of
+    `tickers[j]` (NaN where missing).
+    """
+    dates: pd.DatetimeIndex
+    predictors: tuple
+    tickers: tuple
+    X: np.ndarray
+    Y: np.ndarray
+
+
+def build_regression_panel(sample, tickers, predictors=BASE_PREDICTORS):
+    """
+    Builds the RegressionPanel of merged_all_data.csv rows (see
+    regression.load_sample). Tickers without a closing column are skipped.
+
+    Raises:
+        ValueError: If a predictor column is missing.
+    """
+    missing = [name for name in predictors if name not in sample.columns]
+    if missing:
+        raise ValueError(f"Missing predictor columns: {', '.join(missing)}")
+    present = tuple(ticker for ticker in tickers if f"{ticker}_closing" in sample.columns)
+    if len(present) < len(tickers):
+        print(f"[WARNING] {len(tickers) - len(present)} tickers have no closing column and are skipped.")
+
+    return RegressionPanel(
+        dates=pd.DatetimeIndex(sample["Date"]),
+        predictors=tuple(predictors),
+        tickers=present,
+        X=sample[list(predictors)].to_numpy(dtype="float64"),
+        Y=sample[[f"{ticker}_closing" for ticker in present]].to_numpy(dtype="float64"),
+    )
+
+# ------------------------------------------------------------------------
+# 3) Rolling / Expanding OLS
+# ------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class RollingResults:
+    """
+    `coefficients[i, j]` are the (intercept, predictors...) of `tickers[j]`
+    fitted on the window ending at `dates[i]`, with `r_squared[i, j]` and
+    the window's observation count `n_obs[i, j]`. NaN where the window has
+    fewer than the minimum number of observations.
+    """
+    dates: pd.DatetimeIndex
+    tickers: tuple
+    terms: tuple
+    coefficients: np.ndarray
+    r_squared: np.ndarray
+    n_obs: np.ndarray
+
+    def betas(self, term):
+        """The (dates x tickers) frame of one term's coefficient."""
+        return pd.DataFrame(self.coefficients[:, :, self.terms.index(term)], index=self.dates,
+                            columns=list(self.tickers))
+
+
+class _WindowStats:
+    """
+    Per-ticker sufficient statistics of a window: Z'Z (T x k x k), Z'y
+    (T x k), y'y and the observation count, where Z is the design with an
+    intercept column. Rows are added or removed in O(T * k^2).
+    """
+
+    def __init__(self, Z, Y, mask):
+        self.Z = Z
+        self.Y = Y
+        self.mask = mask
+        self.outer = Z[:, :, None] * Z[:, None, :]
+        T, k = Y.shape[1], Z.shape[1]
+        self.xtx = np.zeros((T, k, k))
+        self.xty = np.zeros((T, k))
+        self.yty = np.zeros(T)
+        self.count = np.zeros(T)
+
+    def update(self, row, sign):
+        m = sign * self.mask[row]
+        y = self.Y[row]
+        self.xtx += m[:, None, None] * self.outer[row]
+        self.xty += (m * y)[:, None] * self.Z[row]
+        self.yty += m * y ** 2
+        self.count += m
+
+    def rebuild(self, start, stop):
+        rows = slice(start, stop)
+        m = self.mask[rows]
+        y = self.Y[rows]
+        self.xtx = np.einsum("rt,rij->tij", m, self.outer[rows])
+        self.xty = np.einsum("rt,ri->ti", m * y, self.Z[rows])
+        self.yty = (m * y ** 2).sum(axis=0)
+        self.count = m.sum(axis=0)
+
+
+def _drop_constant(xtx, xty, count):
+    """
+    Takes predictors that are constant within a window (aliased with the
+    intercept) out of that window's system: their rows and columns become
+    the identity, so their coefficient solves to 0. Returns the adjusted
+    copies and the (windows x predictors) mask of dropped predictors.
+    """
+    mean = xtx[:, 0, 1:] / count[:, None]
+    spread = np.diagonal(xtx, axis1=1, axis2=2)[:, 1:] / count[:, None] - mean ** 2
+    constant = spread <= CONSTANT_TOLERANCE
+    if constant.any():
+        xtx, xty = xtx.copy(), xty.copy()
+        windows, columns = np.nonzero(constant)
+        columns = columns + 1
+        xtx[windows, columns, :] = 0.0
+        xtx[windows, :, columns] = 0.0
+        xtx[windows, columns, columns] = 1.0
+        xty[windows, columns] = 0.0
+    return xtx, xty, constant
+
+
+def _solve(xtx, xty):
+    """Batched solve of xtx @ b = xty; minimum-norm solutions if any system is singular."""
+    try:
+        return np.linalg.solve(xtx, xty[:, :, None])[:, :, 0]
+    except np.linalg.LinAlgError:
+        return (np.linalg.pinv(xtx, hermitian=True) @ xty[:, :, None])[:, :, 0]
+
+
+def rolling_ols(panel, window=WINDOW, min_obs=None, refresh=REFRESH_EVERY):
+    """
+    Fits y ~ 1 + X for every ticker on a sliding window of `window` rows
+    ending at every date (an expanding window from the first row if
+    `window` is None), for all tickers at once.
+
+    The window's Z'Z, Z'y, y'y and counts are kept per ticker and updated
+    as rows enter and leave, so each step costs O(T * k^2) plus T small
+    k x k solves instead of refitting every window. Rows with a missing
+    predictor are skipped; a missing price only drops that ticker's row.
+    Predictors are standardized (and prices centered) on the full sample
+    before accumulating, and the statistics are rebuilt every `refresh`
+    steps, to keep the running sums well conditioned. A predictor that is
+    constant within a window (e.g. an annual figure) is dropped from that
+    window's fit and its coefficient is NaN, as lm reports aliased terms.
+
+    Parameters:
+        min_obs (int, optional): Fewest observations a window needs.
+            Default: number of coefficients + 1.
+
+    Returns:
+        RollingResults
+    """
+    X, Y = panel.X, panel.Y
+    n, p = X.shape
+    k = p + 1
+    min_obs = k + 1 if min_obs is None else min_obs
+
+    valid_x = ~np.isnan(X).any(axis=1)
+    mask = (~np.isnan(Y) & valid_x[:, None]).astype("float64")
+    x_mean = X[valid_x].mean(axis=0) if valid_x.any() else np.zeros(p)
+    x_scale = X[valid_x].std(axis=0) if valid_x.any() else np.ones(p)
+    x_scale = np.where(x_scale > 0, x_scale, 1.0)
+    Z = np.column_stack([np.ones(n), (X - x_mean) / x_scale])
+    Z[~valid_x] = 0.0
+    # Tickers without a usable price get mean 0
+    y_mean = np.where(mask > 0, Y, 0.0).sum(axis=0) / np.maximum(mask.sum(axis=0), 1)
+    Yc = np.where(mask > 0, Y - y_mean, 0.0)
+
+    stats = _WindowStats(Z, Yc, mask)
+    coefficients = np.full((n, Y.shape[1], k), np.nan)
+    r_squared = np.full((n, Y.shape[1]), np.nan)
+    n_obs = np.zeros((n, Y.shape[1]), dtype="int32")
+
+    for t in range(n):
+        start = 0 if window is None else max(0, t + 1 - window)
+        if refresh and t and t % refresh == 0:
+            stats.rebuild(start, t + 1)
+        else:
+            stats.update(t, 1.0)
+            if window is not None and t >= window:
+                stats.update(t - window, -1.0)
+
+        count = np.rint(stats.count)
+        n_obs[t] = count
+        ready = count >= min_obs
+        if not ready.any():
+            continue
+
+        xtx, xty, constant = _drop_constant(stats.xtx[ready], stats.xty[ready], count[ready])
+        beta = _solve(xtx, xty)
+        rss = stats.yty[ready] - (beta * xty).sum(axis=1)
+        tss = stats.yty[ready] - xty[:, 0] ** 2 / count[ready]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r_squared[t, ready] = 1.0 - rss / tss
+
+        # Back to original units: b_j = beta_j / scale_j, intercept shifted by the means
+        slopes = beta[:, 1:] / x_scale
+        coefficients[t, ready, 0] = beta[:, 0] + y_mean[ready] - slopes @ x_mean
+        coefficients[t, ready, 1:] = np.where(constant, np.nan, slopes)
+
+    return RollingResults(panel.dates, panel.tickers, ("(Intercept)",) + panel.predictors,
+                          coefficients, r_squared, n_obs)
+
+# ------------------------------------------------------------------------
+# 4) Persistence
+# ------------------------------------------------------------------------
+
+def save_rolling(results, path=ROLLING_PATH):
+    """Saves the results as one .npz archive, replacing `path` atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, dates=results.dates.to_numpy(dtype="datetime64[D]"), tickers=np.array(results.tickers),
+             terms=np.array(results.terms), coefficients=results.coefficients, r_squared=results.r_squared,
+             n_obs=results.n_obs)
+    os.replace(tmp_path, path)
+    print(f"Rolling regression {results.coefficients.shape} saved to {path}")
+
+
+def load_rolling(path=ROLLING_PATH):
+    """
+    Reads results saved by save_rolling.
+
+    Raises:
+        FileNotFoundError: If `path` does not exist.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Rolling regression results do not exist at path: {path}")
+    with np.load(path) as archive:
+        return RollingResults(pd.DatetimeIndex(archive["dates"]), tuple(archive["tickers"].tolist()),
+                              tuple(archive["terms"].tolist()), archive["coefficients"], archive["r_squared"],
+                              archive["n_obs"])
+
+
+def run_rolling(csv_path=MERGED_DATA_PATH, ticker_file=TICKERS_FILE, output_path=ROLLING_PATH, window=WINDOW,
+                predictors=BASE_PREDICTORS):
+    """Runs the rolling regression over the whole history of merged_all_data.csv and saves it."""
+    panel = build_regression_panel(load_sample(csv_path, years=None), load_tickers(ticker_file), predictors)
+    started = time.perf_counter()
+    results = rolling_ols(panel, window=window)
+    label = "expanding" if window is None else f"{window}-day"
+    print(f"[INFO] {label} OLS for {len(panel.tickers)} tickers over {len(panel.dates)} dates "
+          f"in {time.perf_counter() - started:.2f}s")
+    save_rolling(results, output_path)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling or expanding OLS of every ticker on the macro predictors.")
+    parser.add_argument("-input", default=MERGED_DATA_PATH, help="Path of merged_all_data.csv")
+    parser.add_argument("-tickers", default=TICKERS_FILE, help="Path of tickers.txt")
+    parser.add_argument("-output", default=ROLLING_PATH, help="Path of the .npz archive")
+    parser.add_argument("-window", type=int, default=WINDOW, help="Window length in rows (0: expanding window)")
+    args = parser.parse_args()
+
+    try:
+        run_rolling(args.input, args.tickers, args.output, window=args.window or None)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -1,6 +1,9 @@
 import os
 import pandas as pd
 
+from scripts.utils.timeseries import FORMAT_CALENDAR, FORMAT_START, materialize
+from scripts.utils.dates import parse_dates
+
 # Set up dynamic paths
 PROJECT_ROOT = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "../../")
@@ -11,37 +14,40 @@ PROCESSED_DATA_DIR = os.path.join(PROJECT_ROOT, "data", "formatted")  # Output p
 # Ensure the output directory exists
 os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
 
-def process_cpi_data_with_year_month_day(input_file_name, output_file_name):
+def process_cpi_data_with_year_month_day(input_file_name="us_cpi.csv", output_file_name="formatted_cpi_data.csv", data=None):
+    """
+    Formats the refined CPI releases into daily (Date, Actual) rows from 2020
+    onwards, each day carrying the latest release. When `data` is given it is
+    used instead of reading `input_file_name` from disk.
+    """
     # Construct input and output file paths
     input_file_path = os.path.join(RAW_DATA_DIR, input_file_name)
     output_file_path = os.path.join(PROCESSED_DATA_DIR, output_file_name)
 
     try:
-        # Load the CSV file
-        data = pd.read_csv(input_file_path)
+        # Load the CSV file (or take the refined frame handed over in memory)
+        data = pd.read_csv(input_file_path) if data is None else data.copy()
 
-        # Combine Year, Month, and Day into a single Date column
-        data["Date"] = pd.to_datetime(
-            data["Year"].astype(str) + " " + data["Month"] + " " + data["Day"].astype(str),
-            format="%Y %b %d"
-        ).dt.strftime("%Y-%m-%d")  # Convert to YYYY-MM-DD format
+        # Parse the release dates
+        data["Date"] = parse_dates(data["Date"], "iso")
 
-        # Convert "Actual" from percentage to decimal
-        data["Actual"] = data["Actual"].str.rstrip('%').astype(float) / 100
+        # Convert "Actual" from percent to decimal
+        data["Actual"] = data["Actual"] / 100
 
         # Keep only the Date and Actual columns
         filtered_data = data[["Date", "Actual"]]
 
-        # Filter data for dates after 2020
-        filtered_data["Date"] = pd.to_datetime(filtered_data["Date"])
-        filtered_data = filtered_data[filtered_data["Date"].dt.year >= 2020]
+        # Materialize the releases onto the daily calendar from 2020 onwards
+        filtered_data = materialize(filtered_data, "Date", calendar=FORMAT_CALENDAR, start=FORMAT_START)
 
         # Save the processed data to a new file
         filtered_data.to_csv(output_file_path, index=False)
 
         print(f"Processed CPI data saved to: {output_file_path}")
+        return filtered_data
     except Exception as e:
         print(f"Error processing CPI file: {e}")
 
-# Example: Process the CPI file
-process_cpi_data_with_year_month_day("us_cpi.csv", "formatted_cpi_data.csv")
+if __name__ == "__main__":
+    # Example: Process the CPI file
+    process_cpi_data_with_year_month_day("us_cpi.csv", "formatted_cpi_data.csv")
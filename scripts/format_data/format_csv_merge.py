@@ -1,6 +1,12 @@
 import os
+import argparse
+import dataclasses
+
 import pandas as pd
 
+from scripts.utils.dates import ISO_FORMAT, parse_dates
+from scripts.utils.timeseries import asof_join
+
 # Step 1: Set up project directory paths dynamically
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
 RAW_DATA_DIR = os.path.join(PROJECT_ROOT, "data", "formatted")
@@ -22,32 +28,165 @@ file_paths = [
     os.path.join(RAW_DATA_DIR, "formatted_interest_rate_data.csv")
 ]
 
-# Step 3: Load and merge all CSV files
-final_data = None
+output_file_path = os.path.join(PROCESSED_DATA_DIR, "merged_all_data.csv")
 
-for file_path in file_paths:
-    temp_data = pd.read_csv(file_path)
-    temp_data['Date'] = pd.to_datetime(temp_data['Date'], errors='coerce')
-    if final_data is None:
-        final_data = temp_data
-    else:
-        final_data = pd.merge(final_data, temp_data, on='Date', how='outer')
 
-# Step 4: Rename columns for clarity
-final_data = final_data.rename(columns={
-    'Actual_x': 'CPI',
-    'Actual_y': 'Unemployment Rate'
-})
+# Step 3: How each file is aligned onto the trading days of the price matrix
+# (merged_stock_data.csv). Prices are joined on the exact date; indicators
+# take the latest value already released by each day's close. Release
+# times are US Eastern; GDP's publication delay (GDP_RELEASE_LAG) is
+# already applied by format_gdp, so its rows are dated by release.
+PRICE_FILE = "merged_stock_data.csv"
 
-# Step 5: Fill missing values with the previous row's data
-final_data.fillna(method='ffill', inplace=True)
 
+@dataclasses.dataclass(frozen=True)
+class MergeSource:
+    rename: dict = dataclasses.field(default_factory=dict)
+    release_time: str = None
+    exact: bool = False
 
-# Step 6: Sort the merged data by Date
-final_data = final_data.sort_values(by='Date')
 
-# Step 7: Save the merged data to a CSV file
-output_file_path = os.path.join(PROCESSED_DATA_DIR, "merged_all_data.csv")
-final_data.to_csv(output_file_path, index=False)
+MERGE_SOURCES = {
+    "formatted_cpi_data.csv": MergeSource(rename={"Actual": "CPI"}, release_time="08:30"),
+    "formatted_UnemploymentRate.csv": MergeSource(rename={"Actual": "Unemployment Rate"}, release_time="08:30"),
+    "formatted_us_leading_index.csv": MergeSource(release_time="10:00"),
+    "formatted_us_nominal_GDP.csv": MergeSource(),
+    "merged_pmi_data.csv": MergeSource(release_time="09:45"),
+    PRICE_FILE: MergeSource(exact=True),
+    "processed_sp500_data.csv": MergeSource(exact=True),
+    "formatted_interest_rate_data.csv": MergeSource(release_time="14:00"),
+}
+
+
+# Step 4: Streaming. The date axis is processed one period of trading days
+# at a time (pandas period alias, "Y" = calendar year); only the price rows
+# of the current period are held besides the small indicator tables.
+MERGE_CHUNK = "Y"
+MERGE_CHUNKS = ("Y", "Q", "M")
+
+# Rows read from merged_stock_data.csv per read_csv chunk
+READ_ROWS = 256
+
+
+def _load(file_path, data):
+    file_name = os.path.basename(file_path)
+    frame = data[file_name].copy() if file_name in data else pd.read_csv(file_path)
+    frame['Date'] = parse_dates(frame['Date'], "iso")
+    return frame
+
+
+def _split_periods(prices, chunk):
+    periods = prices['Date'].dt.to_period(chunk)
+    for _, group in prices.groupby(periods, sort=True):
+        yield group
+
+
+def _iter_price_chunks(price_path, data, chunk):
+    """
+    Yields the price table one `chunk` period at a time (all rows when
+    `chunk` is None). A file is read READ_ROWS rows at a time, so it must be
+    sorted by Date, as format_stock writes it.
+    """
+    file_name = os.path.basename(price_path)
+    if file_name in data or chunk is None:
+        prices = _load(price_path, data).dropna(subset=['Date']).sort_values('Date', kind='mergesort')
+        yield from ([prices] if chunk is None else _split_periods(prices, chunk))
+        return
+
+    pending = None
+    for rows in pd.read_csv(price_path, chunksize=READ_ROWS):
+        rows['Date'] = parse_dates(rows['Date'], "iso")
+        rows = rows.dropna(subset=['Date'])
+        pending = rows if pending is None else pd.concat([pending, rows], ignore_index=True)
+        if pending.empty:
+            continue
+        # The last period may continue in the next read chunk
+        periods = pending['Date'].dt.to_period(chunk)
+        complete = (periods != periods.iloc[-1]).to_numpy()
+        if complete.any():
+            yield from _split_periods(pending[complete], chunk)
+            pending = pending[~complete].reset_index(drop=True)
+    if pending is not None and not pending.empty:
+        yield from _split_periods(pending, chunk)
+
+
+def _align_chunk(prices, sources):
+    """Aligns every (file name, source, frame) onto the trading days of `prices`."""
+    days = pd.DatetimeIndex(prices['Date'].unique()).sort_values()
+    columns = [pd.DataFrame({'Date': days})]
+    for file_name, source, frame in sources:
+        frame = prices if file_name == PRICE_FILE else frame
+        frame = frame.rename(columns=source.rename)
+        if source.exact:
+            aligned = frame.drop_duplicates(subset=['Date'], keep='last').set_index('Date').reindex(days)
+            aligned = aligned.reset_index(drop=True)
+        else:
+            aligned = asof_join(days, frame, release_time=source.release_time)
+        columns.append(aligned)
+    return pd.concat(columns, axis=1)
+
+
+def merge_all_data(file_paths=file_paths, output_file_path=output_file_path, data=None, chunk=MERGE_CHUNK):
+    """
+    Aligns every formatted CSV onto the trading days of merged_stock_data.csv
+    and saves merged_all_data.csv (one row per trading day).
+
+    Each indicator is as-of joined (see MERGE_SOURCES): a day gets the
+    latest value released by its close, and days before an indicator's
+    first release stay empty. Prices are joined on the exact date. `data`
+    may map a file name from `file_paths` to an in-memory frame, which is
+    used instead of reading that file.
+
+    With `chunk` (one of MERGE_CHUNKS) the trading days are merged and
+    appended to the output one period at a time, so peak memory depends on
+    the period length and the number of columns, not on the history
+    length. With `chunk=None` the whole table is built in memory.
+
+    Returns:
+        pd.DataFrame or str: The merged table when `chunk` is None,
+        otherwise the path it was written to (never None on success, which
+        the pipeline runner takes as the stage having failed).
+
+    Raises:
+        ValueError: If merged_stock_data.csv is not among `file_paths`, or
+            `chunk` is not a known period.
+    """
+    data = data or {}
+    if chunk is not None and chunk not in MERGE_CHUNKS:
+        raise ValueError(f"Unknown chunk '{chunk}'. Expected one of {MERGE_CHUNKS} or None.")
+
+    # Step 5: The trading-day index comes from the price matrix
+    price_paths = [path for path in file_paths if os.path.basename(path) == PRICE_FILE]
+    if not price_paths:
+        raise ValueError(f"'{PRICE_FILE}' is required to build the trading-day index.")
+
+    # Step 6: Load the (small) indicator tables once, in the order of `file_paths`
+    sources = []
+    for file_path in file_paths:
+        file_name = os.path.basename(file_path)
+        frame = None if file_name == PRICE_FILE else _load(file_path, data)
+        sources.append((file_name, MERGE_SOURCES.get(file_name, MergeSource()), frame))
+
+    # Step 7: Align and write each chunk of trading days
+    tmp_path = output_file_path + ".tmp"
+    final_data = output_file_path
+    rows = 0
+    with open(tmp_path, "w", encoding="utf-8", newline="") as output:
+        for prices in _iter_price_chunks(price_paths[0], data, chunk):
+            merged = _align_chunk(prices, sources)
+            merged.to_csv(output, index=False, header=rows == 0, date_format=ISO_FORMAT)
+            rows += len(merged)
+            if chunk is None:
+                final_data = merged
+    os.replace(tmp_path, output_file_path)
+
+    print(f"All data merged and saved as {output_file_path} ({rows} rows)")
+    return final_data
+
 
-print(f"All data merged and saved as {output_file_path}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge the formatted CSVs into merged_all_data.csv.")
+    parser.add_argument("-chunk", choices=MERGE_CHUNKS + ("none",), default=MERGE_CHUNK,
+                        help="Period of trading days merged and written at a time ('none': all at once)")
+    args = parser.parse_args()
+    merge_all_data(chunk=None if args.chunk == "none" else args.chunk)
@@ -1,6 +1,9 @@
 import os
 import pandas as pd
 
+from scripts.utils.timeseries import FORMAT_CALENDAR, FORMAT_START, materialize
+from scripts.utils.dates import dates_from_ymd
+
 # Set up dynamic paths
 PROJECT_ROOT = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "../../")
@@ -11,36 +14,65 @@ PROCESSED_DATA_DIR = os.path.join(PROJECT_ROOT, "data", "formatted")  # Output p
 # Ensure the output directory exists
 os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
 
-def process_gdp_files_with_date_filter(input_dir, output_dir):
-    for file_name in os.listdir(input_dir):
+# A year's nominal GDP is first published with the advance estimate at the
+# end of the following January, so it is only used from Feb 1 of the next year
+GDP_RELEASE_LAG = pd.DateOffset(years=1, months=1)
+
+def process_gdp_files_with_date_filter(input_dir=RAW_DATA_DIR, output_dir=PROCESSED_DATA_DIR, data=None,
+                                       release_lag=GDP_RELEASE_LAG):
+    """
+    Formats every GDP CSV in `input_dir` into daily (Date, GDP) rows from 2020
+    through the end of the last reported year. Each yearly figure applies
+    from the day it was published (`release_lag` after Jan 1 of its year),
+    or from Jan 1 of its year itself when `release_lag` is None.
+    When `data` is given, only that in-memory frame is formatted (saved as if
+    it were 'us_nominal_GDP.csv'). Returns the last formatted frame.
+    """
+    if data is not None:
+        sources = [("us_nominal_GDP.csv", data)]
+    else:
         # Process only files containing "gdp" in the name
-        if "gdp" in file_name.lower() and file_name.endswith(".csv"):
-            input_file_path = os.path.join(input_dir, file_name)
-            output_file_path = os.path.join(output_dir, "formatted_" + file_name)
+        sources = [
+            (file_name, None) for file_name in sorted(os.listdir(input_dir))
+            if "gdp" in file_name.lower() and file_name.endswith(".csv")
+        ]
+
+    formatted = None
+    for file_name, frame in sources:
+        input_file_path = os.path.join(input_dir, file_name)
+        output_file_path = os.path.join(output_dir, "formatted_" + file_name)
+
+        try:
+            # Load the CSV file (or take the refined frame handed over in memory)
+            data = pd.read_csv(input_file_path) if frame is None else frame.copy()
 
-            try:
-                # Load the CSV file
-                data = pd.read_csv(input_file_path)
+            # Combine Year, Month, and Day into a single Date column
+            data["Date"] = dates_from_ymd(data["Year"], data["Month"], data["Day"])
 
-                # Combine Year, Month, and Day into a single Date column
-                data["Date"] = pd.to_datetime(
-                    data["Year"].astype(str) + " " + data["Month"].astype(str) + " " + data["Day"].astype(str),
-                    format="%Y %m %d"
-                ).dt.strftime("%Y-%m-%d")  # Convert to YYYY-MM-DD format
+            # Keep only the Date and GDP columns
+            filtered_data = data[["Date", "GDP"]]
 
-                # Keep only the Date and Actual columns
-                filtered_data = data[["Date", "GDP"]]
+            # Materialize the yearly figures onto the daily calendar from 2020
+            # through Dec 31 of the last reported year
+            horizon = filtered_data["Date"].max() + pd.DateOffset(years=1, days=-1)
+            if release_lag is None:
+                filtered_data = materialize(filtered_data, "Date", calendar=FORMAT_CALENDAR,
+                                            start=FORMAT_START, end=horizon)
+            else:
+                filtered_data = materialize(filtered_data, "Date", calendar=FORMAT_CALENDAR,
+                                            start=FORMAT_START, end=horizon + release_lag,
+                                            fill="release_lag", release_lag=release_lag)
 
-                # Filter data for dates after 2020
-                filtered_data["Date"] = pd.to_datetime(filtered_data["Date"])
-                filtered_data = filtered_data[filtered_data["Date"].dt.year >= 2020]
+            # Save the processed data to a new file
+            filtered_data.to_csv(output_file_path, index=False)
 
-                # Save the processed data to a new file
-                filtered_data.to_csv(output_file_path, index=False)
+            print(f"Processed GDP data saved to: {output_file_path}")
+            formatted = filtered_data
+        except Exception as e:
+            print(f"Error processing file {file_name}: {e}")
 
-                print(f"Processed GDP data saved to: {output_file_path}")
-            except Exception as e:
-                print(f"Error processing file {file_name}: {e}")
+    return formatted
 
-# Run the function
-process_gdp_files_with_date_filter(RAW_DATA_DIR, PROCESSED_DATA_DIR)
+if __name__ == "__main__":
+    # Run the function
+    process_gdp_files_with_date_filter(RAW_DATA_DIR, PROCESSED_DATA_DIR)
@@ -1,6 +1,10 @@
 import os
 import pandas as pd
 import sys
+
+from scripts.utils.timeseries import FORMAT_CALENDAR, FORMAT_START, materialize
+from scripts.utils.dates import ISO_FORMAT, dates_from_ymd
+
 # Step 1: Dynamically set PROJECT_ROOT
 PROJECT_ROOT = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "../../")
@@ -16,126 +20,124 @@ os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
 input_file_path = os.path.join(RAW_DATA_DIR, "federal_interest_rate.csv")
 output_file_path = os.path.join(PROCESSED_DATA_DIR, "formatted_interest_rate_data.csv")
 
-# Check if the input file exists
-if not os.path.exists(input_file_path):
-    sys.exit(f"[ERROR] Input file not found at: {input_file_path}")
-else:
-    print(f"Found input file at: {input_file_path}")
-
-# Step 3: Load the CSV file
-try:
-    df = pd.read_csv(input_file_path)
-except Exception as e:
-    sys.exit(f"[ERROR] Failed to read CSV file: {e}")
-
-# Inspect the columns (optional)
 # Step 4: Ensure required columns are present
 required_columns = ['Year', 'Month', 'Day', 'Time', 'Actual', 'Forecast', 'Previous']
-missing_columns = [col for col in required_columns if col not in df.columns]
-if missing_columns:
-    sys.exit(f"[ERROR] Missing expected columns: {missing_columns}")
-
-# Step 5: Combine 'Year', 'Month', 'Day' into 'Date' in 'yyyy-mm-dd' format
-try:
-    # Ensure 'Year', 'Month', 'Day' are numeric
-    df['Year'] = pd.to_numeric(df['Year'], errors='coerce').astype('Int64')
-    df['Month'] = pd.to_numeric(df['Month'], errors='coerce').astype('Int64')
-    df['Day'] = pd.to_numeric(df['Day'], errors='coerce').astype('Int64')
-    
-    # Drop rows with NaN in 'Year', 'Month', or 'Day'
-    initial_row_count = len(df)
-    df.dropna(subset=['Year', 'Month', 'Day'], inplace=True)
-    dropped_rows = initial_row_count - len(df)
-    if dropped_rows > 0:
-        print(f"[WARNING] Dropped {dropped_rows} rows due to invalid 'Year', 'Month', or 'Day' values.")
-    
-    # Create 'Date' column
-    df['Date'] = pd.to_datetime(df[['Year', 'Month', 'Day']], errors='coerce')
-    
-    # Drop rows where 'Date' couldn't be created
-    initial_row_count = len(df)
-    df.dropna(subset=['Date'], inplace=True)
-    dropped_rows = initial_row_count - len(df)
-    if dropped_rows > 0:
-        print(f"[WARNING] Dropped {dropped_rows} rows due to invalid 'Date' values.")
-    
-    # Format 'Date' to 'yyyy-mm-dd'
-    df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
-except Exception as e:
-    sys.exit(f"[ERROR] Failed to create 'Date' column: {e}")
-
-# Step 6: Ensure 'Time' is in 'HH:MM' format
-try:
-    # Convert 'Time' to string and strip whitespace
-    df['Time'] = df['Time'].astype(str).str.strip()
-    
-    # Convert to datetime to validate format and reformat to 'HH:MM'
-    df['Time'] = pd.to_datetime(df['Time'], format='%H:%M', errors='coerce').dt.strftime('%H:%M')
-    
-    # Drop rows with invalid 'Time' formats
-    initial_row_count = len(df)
-    df.dropna(subset=['Time'], inplace=True)
-    dropped_rows = initial_row_count - len(df)
-    if dropped_rows > 0:
-        print(f"[WARNING] Dropped {dropped_rows} rows due to invalid 'Time' format.")
-    
-except Exception as e:
-    sys.exit(f"[ERROR] Failed to clean 'Time' column: {e}")
 
-# Step 7: Convert 'Actual', 'Forecast', 'Previous' from percentage strings to float decimals
+
+# Step 7: Convert 'Actual', 'Forecast', 'Previous' from percent to float decimals
 def convert_percentage_to_decimal(series, column_name):
     try:
-        # Remove any percentage signs, commas, and whitespace
-        series_cleaned = series.astype(str).str.replace('%', '').str.replace(',', '').str.strip()
+        if not pd.api.types.is_numeric_dtype(series):
+            # Remove any percentage signs, commas, and whitespace
+            series = series.astype(str).str.replace('%', '').str.replace(',', '').str.strip()
         # Convert to float and divide by 100 to get decimal
-        decimal_series = series_cleaned.astype(float) / 100
+        decimal_series = series.astype(float) / 100
         return decimal_series
     except Exception as e:
-        sys.exit(f"[ERROR] Failed to convert '{column_name}' from percentage to decimal: {e}")
-
-# Apply conversion
-df['Interest_rate'] = convert_percentage_to_decimal(df['Actual'], 'Actual')
-df['Forecast'] = convert_percentage_to_decimal(df['Forecast'], 'Forecast')
-df['Previous'] = convert_percentage_to_decimal(df['Previous'], 'Previous')
-
-# Drop the original 'Actual' column as it's now converted to 'Interest_rate'
-df.drop(columns=['Actual'], inplace=True)
-
-# Drop rows with NaN in 'Interest_rate', 'Forecast', or 'Previous'
-initial_row_count = len(df)
-df.dropna(subset=['Interest_rate', 'Forecast', 'Previous'], inplace=True)
-dropped_rows = initial_row_count - len(df)
-if dropped_rows > 0:
-    print(f"[WARNING] Dropped {dropped_rows} rows due to invalid 'Interest_rate', 'Forecast', or 'Previous' values.")
-
-
-# Step 8: Select only the desired columns for output
-desired_columns = ['Date', 'Time', 'Interest_rate', 'Forecast', 'Previous']
-df = df[desired_columns]
-
-# Step 9: Filter data for dates on or after 2020-01-01
-try:
-    # Convert 'Date' to datetime for filtering
-    df['Date'] = pd.to_datetime(df['Date'], format='%Y-%m-%d', errors='coerce')
-    
-    # Drop rows where 'Date' couldn't be parsed
+        raise ValueError(f"Failed to convert '{column_name}' from percentage to decimal: {e}")
+
+
+def format_interest_rate(input_file_path=input_file_path, output_file_path=output_file_path, data=None, horizon=None):
+    """
+    Formats the FOMC rate decisions into daily
+    (Date, Time, Interest_rate, Forecast, Previous) rows from 2020 through
+    `horizon` (default: Dec 31 of the last decision's year), each day
+    carrying the latest decision.
+    When `data` is given it is used instead of reading `input_file_path`.
+
+    Raises:
+        FileNotFoundError: If `data` is None and the input CSV is missing.
+        ValueError: If a required column is missing or cannot be cleaned.
+    """
+    if data is None:
+        # Check if the input file exists
+        if not os.path.exists(input_file_path):
+            raise FileNotFoundError(f"Input file not found at: {input_file_path}")
+        else:
+            print(f"Found input file at: {input_file_path}")
+
+        # Step 3: Load the CSV file
+        df = pd.read_csv(input_file_path)
+    else:
+        df = data.copy()
+
+    # Inspect the columns (optional)
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing expected columns: {missing_columns}")
+
+    # Step 5: Combine 'Year', 'Month', 'Day' into a datetime64 'Date'
+    try:
+        # Missing or impossible dates become NaT
+        df['Date'] = dates_from_ymd(df['Year'], df['Month'], df['Day'])
+
+        # Drop rows where 'Date' couldn't be created
+        initial_row_count = len(df)
+        df.dropna(subset=['Date'], inplace=True)
+        dropped_rows = initial_row_count - len(df)
+        if dropped_rows > 0:
+            print(f"[WARNING] Dropped {dropped_rows} rows due to invalid 'Date' values.")
+
+    except Exception as e:
+        raise ValueError(f"Failed to create 'Date' column: {e}")
+
+    # Step 6: Ensure 'Time' is in 'HH:MM' format
+    try:
+        # Validate 'H:MM' / 'HH:MM' and zero-pad the hour; anything else becomes NaN
+        parts = df['Time'].astype(str).str.strip().str.extract(r'^(\d{1,2}):(\d{2})$')
+        valid = (pd.to_numeric(parts[0], errors='coerce') < 24) & (pd.to_numeric(parts[1], errors='coerce') < 60)
+        df['Time'] = (parts[0].str.zfill(2) + ':' + parts[1]).where(valid)
+
+        # Drop rows with invalid 'Time' formats
+        initial_row_count = len(df)
+        df.dropna(subset=['Time'], inplace=True)
+        dropped_rows = initial_row_count - len(df)
+        if dropped_rows > 0:
+            print(f"[WARNING] Dropped {dropped_rows} rows due to invalid 'Time' format.")
+
+    except Exception as e:
+        raise ValueError(f"Failed to clean 'Time' column: {e}")
+
+    # Apply conversion
+    df['Interest_rate'] = convert_percentage_to_decimal(df['Actual'], 'Actual')
+    df['Forecast'] = convert_percentage_to_decimal(df['Forecast'], 'Forecast')
+    df['Previous'] = convert_percentage_to_decimal(df['Previous'], 'Previous')
+
+    # Drop the original 'Actual' column as it's now converted to 'Interest_rate'
+    df.drop(columns=['Actual'], inplace=True)
+
+    # Drop rows with NaN in 'Interest_rate', 'Forecast', or 'Previous'
     initial_row_count = len(df)
-    df.dropna(subset=['Date'], inplace=True)
+    df.dropna(subset=['Interest_rate', 'Forecast', 'Previous'], inplace=True)
     dropped_rows = initial_row_count - len(df)
     if dropped_rows > 0:
-        print(f"[WARNING] Dropped {dropped_rows} rows due to invalid 'Date' formats during filtering.")
-    
-    # Apply the date filter
-    df = df[df['Date'] >= pd.Timestamp('2020-01-01')]
-    
-    # Convert 'Date' back to string in 'yyyy-mm-dd' format
-    df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
-except Exception as e:
-    sys.exit(f"[ERROR] Failed to filter data based on 'Date': {e}")
-
-# Step 10: Save the processed data to a CSV file
-try:
-    df.to_csv(output_file_path, index=False)
+        print(f"[WARNING] Dropped {dropped_rows} rows due to invalid 'Interest_rate', 'Forecast', or 'Previous' values.")
+
+
+    # Step 8: Select only the desired columns for output
+    desired_columns = ['Date', 'Time', 'Interest_rate', 'Forecast', 'Previous']
+    df = df[desired_columns]
+
+    # Step 9: Materialize the decisions onto the daily calendar from 2020-01-01
+    try:
+        # By default the last decision is carried to the end of its year
+        if horizon is None and not df.empty:
+            horizon = pd.Timestamp(year=df['Date'].max().year, month=12, day=31)
+
+        df = materialize(df, 'Date', calendar=FORMAT_CALENDAR, start=FORMAT_START, end=horizon)
+    except Exception as e:
+        raise ValueError(f"Failed to materialize data onto the daily calendar: {e}")
+
+    # Step 10: Save the processed data to a CSV file
+    df.to_csv(output_file_path, index=False, date_format=ISO_FORMAT)
     print(f"Processed data saved to: {output_file_path}")
-except Exception as e:
-    sys.exit(f"[ERROR] Failed to save processed data: {e}")
+    return df
+
+
+if __name__ == "__main__":
+    try:
+        format_interest_rate()
+    except (FileNotFoundError, ValueError) as e:
+        sys.exit(f"[ERROR] {e}")
+    except Exception as e:
+        sys.exit(f"[ERROR] Failed to save processed data: {e}")
@@ -1,6 +1,9 @@
 import os
 import pandas as pd
 
+from scripts.utils.timeseries import FORMAT_CALENDAR, FORMAT_START, materialize
+from scripts.utils.dates import parse_dates
+
 # Set up dynamic paths
 PROJECT_ROOT = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "../../")
@@ -11,39 +14,53 @@ PROCESSED_DATA_DIR = os.path.join(PROJECT_ROOT, "data", "formatted")  # Output p
 # Ensure the output directory exists
 os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
 
-def process_leading_index_files_with_date_filter(input_dir, output_dir):
-    for file_name in os.listdir(input_dir):
+def process_leading_index_files_with_date_filter(input_dir=RAW_DATA_DIR, output_dir=PROCESSED_DATA_DIR, data=None):
+    """
+    Formats every Leading Index CSV in `input_dir` into daily (Date, LeadingIndex)
+    rows from 2020 onwards. When `data` is given, only that
+    in-memory frame is formatted (saved as if it were 'us_leading_index.csv').
+    Returns the last formatted frame.
+    """
+    if data is not None:
+        sources = [("us_leading_index.csv", data)]
+    else:
         # Process only files containing "leading" in the name
-        if "leading" in file_name.lower() and file_name.endswith(".csv"):
-            input_file_path = os.path.join(input_dir, file_name)
-            output_file_path = os.path.join(output_dir, "formatted_" + file_name)
+        sources = [
+            (file_name, None) for file_name in sorted(os.listdir(input_dir))
+            if "leading" in file_name.lower() and file_name.endswith(".csv")
+        ]
+
+    formatted = None
+    for file_name, frame in sources:
+        input_file_path = os.path.join(input_dir, file_name)
+        output_file_path = os.path.join(output_dir, "formatted_" + file_name)
+
+        try:
+            # Load the CSV file (or take the refined frame handed over in memory)
+            data = pd.read_csv(input_file_path) if frame is None else frame.copy()
 
-            try:
-                # Load the CSV file
-                data = pd.read_csv(input_file_path)
+            # Parse the release dates
+            data["Date"] = parse_dates(data["Date"], "iso")
 
-                # Combine Year, Month, and Day into a single Date column
-                data["Date"] = pd.to_datetime(
-                    data["Year"].astype(str) + " " + data["Month"] + " " + data["Day"].astype(str),
-                    format="%Y %b %d"
-                ).dt.strftime("%Y-%m-%d")  # Convert to YYYY-MM-DD format
+            # Convert "LeadingIndex" from percent to decimal
+            data["LeadingIndex"] = data["LeadingIndex"] / 100
 
-                # Convert "LeadingIndex" from percentage to decimal
-                data["LeadingIndex"] = data["LeadingIndex"].str.rstrip('%').astype(float) / 100
+            # Keep only the Date and LeadingIndex columns
+            filtered_data = data[["Date", "LeadingIndex"]]
 
-                # Keep only the Date and LeadingIndex columns
-                filtered_data = data[["Date", "LeadingIndex"]]
+            # Materialize the releases onto the daily calendar from 2020 onwards
+            filtered_data = materialize(filtered_data, "Date", calendar=FORMAT_CALENDAR, start=FORMAT_START)
 
-                # Filter data for dates after 2020
-                filtered_data["Date"] = pd.to_datetime(filtered_data["Date"])
-                filtered_data = filtered_data[filtered_data["Date"].dt.year >= 2020]
+            # Save the processed data to a new file
+            filtered_data.to_csv(output_file_path, index=False)
 
-                # Save the processed data to a new file
-                filtered_data.to_csv(output_file_path, index=False)
+            print(f"Processed Leading Index data saved to: {output_file_path}")
+            formatted = filtered_data
+        except Exception as e:
+            print(f"Error processing file {file_name}: {e}")
 
-                print(f"Processed Leading Index data saved to: {output_file_path}")
-            except Exception as e:
-                print(f"Error processing file {file_name}: {e}")
+    return formatted
 
-# Run the function
-process_leading_index_files_with_date_filter(RAW_DATA_DIR, PROCESSED_DATA_DIR)
+if __name__ == "__main__":
+    # Run the function
+    process_leading_index_files_with_date_filter(RAW_DATA_DIR, PROCESSED_DATA_DIR)
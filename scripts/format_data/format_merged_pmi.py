@@ -1,6 +1,9 @@
 import os
 import pandas as pd  # pandas 라이브러리 사용
 
+from scripts.utils.timeseries import FORMAT_CALENDAR, FORMAT_START, materialize
+from scripts.utils.dates import ISO_FORMAT, parse_dates
+
 # Set up dynamic paths
 PROJECT_ROOT = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "../../")
@@ -12,30 +15,39 @@ PROCESSED_DATA_DIR = os.path.join(PROJECT_ROOT, "data","formatted")  # output_pa
 os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
 
 # 
-def process_pmi_files_with_date_filter(input_dir, output_dir):
+def process_pmi_files_with_date_filter(input_dir=RAW_DATA_DIR, output_dir=PROCESSED_DATA_DIR, data=None):
+    """
+    Merges every PMI CSV in `input_dir` into merged_pmi_data.csv, one row per
+    day from 2020 onwards with each PMI's latest release. `data` may
+    map a PMI name (e.g. "manufacturing_pmi") to an in-memory frame, which is
+    used instead of reading "<name>.csv".
+    """
     all_data = []  # 
-    
-    for file_name in os.listdir(input_dir):
+    data = data or {}
+
+    file_names = set(f"{pmi_type}.csv" for pmi_type in data)
+    file_names.update(
+        file_name for file_name in os.listdir(input_dir)
         # if the file contains the name"pmi" process
-        if "pmi" in file_name.lower() and file_name.endswith(".csv"):
+        if "pmi" in file_name.lower() and file_name.endswith(".csv")
+    )
+
+    for file_name in sorted(file_names):
             input_file_path = os.path.join(input_dir, file_name)
             
             try:
-               
-                data = pd.read_csv(input_file_path)
-                
                 # extract the file name
                 pmi_type = os.path.splitext(file_name)[0]
-                
+
                 # filter only date and actual section
-                filtered_data = data[["Date", "Actual"]]
-                
-                # select data only after 2020
-                filtered_data["Date"] = pd.to_datetime(filtered_data["Date"])  
-                filtered_data = filtered_data[filtered_data["Date"].dt.year >= 2020]
+                if pmi_type in data:
+                    filtered_data = data[pmi_type][["Date", "Actual"]].copy()
+                else:
+                    filtered_data = pd.read_csv(input_file_path)[["Date", "Actual"]]
                 
-                # unifying the format
-                filtered_data["Date"] = filtered_data["Date"].dt.strftime("%Y-%m-%d")
+                # materialize the releases onto the daily calendar from 2020
+                filtered_data["Date"] = parse_dates(filtered_data["Date"], "iso")
+                filtered_data = materialize(filtered_data, "Date", calendar=FORMAT_CALENDAR, start=FORMAT_START)
                 
                 
                 filtered_data.rename(columns={"Actual": f"{pmi_type}_Actual"}, inplace=True)
@@ -48,16 +60,20 @@ def process_pmi_files_with_date_filter(input_dir, output_dir):
     
     
     if all_data:
-        merged_data = pd.concat(all_data, axis=1)
-        merged_data = merged_data.loc[:, ~merged_data.columns.duplicated()] 
+        # align the PMIs on their dates
+        merged_data = all_data[0]
+        for filtered_data in all_data[1:]:
+            merged_data = pd.merge(merged_data, filtered_data, on="Date", how="outer")
         
-       
+        # unifying the format (dates stay datetime64; only the CSV is written as text)
         merged_data.sort_values(by="Date", inplace=True) 
         output_file_path = os.path.join(output_dir, "merged_pmi_data.csv")
-        merged_data.to_csv(output_file_path, index=False)
+        merged_data.to_csv(output_file_path, index=False, date_format=ISO_FORMAT)
         print(f"Merged data saved to {output_file_path}")
+        return merged_data
     else:
         print("No valid data to merge.")
 
 
-process_pmi_files_with_date_filter(RAW_DATA_DIR, PROCESSED_DATA_DIR)
+if __name__ == "__main__":
+    process_pmi_files_with_date_filter(RAW_DATA_DIR, PROCESSED_DATA_DIR)
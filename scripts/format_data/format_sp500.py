@@ -1,6 +1,8 @@
 import os
 import pandas as pd
 
+from scripts.utils.dates import ISO_FORMAT, parse_dates
+
 # Step 1: Set up project directory paths dynamically
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
 RAW_DATA_DIR = os.path.join(PROJECT_ROOT, "data", "processed")
@@ -14,28 +16,33 @@ os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
 input_file_path = os.path.join(RAW_DATA_DIR, "sp500.csv")
 output_file_path = os.path.join(PROCESSED_DATA_DIR, "processed_sp500_data.csv")
 
-# Step 3: Load the CSV file
-data = pd.read_csv(input_file_path)
 
-# Step 4: Process the 'Date' column
-data['Date'] = pd.to_datetime(
-    data['Date'].astype(str).str.replace(r'-\d{2}:\d{2}$', '', regex=True),
-    errors='coerce'
-)
+def format_sp500(input_file_path=input_file_path, output_file_path=output_file_path, data=None):
+    """
+    Formats the S&P 500 history into (Date, Closing price) from 2020 onwards.
+    When `data` is given it is used instead of reading `input_file_path`.
+    """
+    # Step 3: Load the CSV file
+    data = pd.read_csv(input_file_path) if data is None else data.copy()
+
+    # Step 4: Process the 'Date' column (the date part of e.g. '2020-01-02 00:00:00-05:00')
+    data['Date'] = parse_dates(data['Date'], "iso")
+
+    # Step 5: Filter data for dates from 2020 onwards
+    data = data[data['Date'] >= '2020-01-01']
 
-# Step 5: Filter data for dates from 2020 onwards
-data = data[data['Date'] >= '2020-01-01']
+    # Step 7: Rename 'Close' column to 'Closing price'
+    data = data.rename(columns={'Close': 'Closing price'})
 
-# Step 6: Format 'Date' to "YYYY-MM-DD"
-data['Date'] = data['Date'].dt.strftime('%Y-%m-%d')
+    # Step 8: Select necessary columns
+    processed_data = data[['Date', 'Closing price']]
 
-# Step 7: Rename 'Close' column to 'Closing price'
-data = data.rename(columns={'Close': 'Closing price'})
+    # Step 9: Save the processed data to a CSV file
+    processed_data.to_csv(output_file_path, index=False, date_format=ISO_FORMAT)
 
-# Step 8: Select necessary columns
-processed_data = data[['Date', 'Closing price']]
+    print(f"Data processed and saved as {output_file_path}")
+    return processed_data
 
-# Step 9: Save the processed data to a CSV file
-processed_data.to_csv(output_file_path, index=False)
 
-print(f"Data processed and saved as {output_file_path}")
+if __name__ == "__main__":
+    format_sp500()
@@ -1,5 +1,9 @@
 import os
-import pandas as pd  # pandas 라이브러리 사용
+
+from scripts.stock_data.coverage import refresh_index
+from scripts.stock_data.loader import report_errors
+from scripts.stock_data.panel import open_panel
+from scripts.stock_data.price_matrix import PriceMatrix, build_price_matrix
 
 # Set up dynamic paths
 PROJECT_ROOT = os.path.abspath(
@@ -11,46 +15,39 @@ PROCESSED_DATA_FILE = os.path.join(PROJECT_ROOT, "data", "formatted", "merged_st
 # Ensure the output directory exists
 os.makedirs(os.path.dirname(PROCESSED_DATA_FILE), exist_ok=True)
 
-# 함수 정의: 디렉토리 내 모든 파일 처리 및 병합
-def merge_stock_data_by_date(input_dir, output_file):
-    merged_data = pd.DataFrame()  # 빈 데이터 프레임 초기화
-    
-    for file_name in os.listdir(input_dir):
-        if file_name.endswith(".csv"):
-            input_file_path = os.path.join(input_dir, file_name)
-            
-            # 파일 이름에서 주식 이름 추출 (예: AAPL.csv -> AAPL)
-            stock_name = os.path.splitext(file_name)[0]
-            
-            try:
-                # CSV 파일 읽기
-                data = pd.read_csv(input_file_path)
-                
-                # "Date"와 "Close" 필터링
-                filtered_data = data[["Date", "Close"]]
-                
-                # "Close" 컬럼 이름을 "{stock_name}_closing" 형식으로 변경
-                filtered_data.rename(columns={"Close": f"{stock_name}_closing"}, inplace=True)
-                
-                # "Date"를 기준으로 병합
-                if merged_data.empty:
-                    merged_data = filtered_data
-                else:
-                    merged_data = pd.merge(
-                        merged_data,
-                        filtered_data,
-                        on="Date",
-                        how="outer"
-                    )
-                
-                print(f"Processed: {file_name}")
-            except Exception as e:
-                print(f"Error processing {file_name}: {e}")
-    
+# 함수 정의: 디렉토리 내 모든 파일을 하나의 가격 행렬로 병합
+def merge_stock_data_by_date(input_dir=RAW_DATA_DIR, output_file=PROCESSED_DATA_FILE, dtype="float64", workers=None,
+                             panel_dir=None):
+    """
+    Aligns the closing prices of every ticker CSV in `input_dir` on the union
+    of their dates and saves them as (Date, <TICKER>_closing, ...) to
+    `output_file`. The files are read by `workers` threads and the matrix
+    is built in one pass (see scripts/stock_data/price_matrix.py).
+
+    With `panel_dir` (handed over by the format_panel stage, which has just
+    read the same CSVs), the closing prices are taken from that price panel
+    instead of reading the CSVs a second time.
+    Returns the wide frame.
+    """
+    if panel_dir is not None:
+        panel = open_panel(panel_dir)
+        # Copy the strided Close view out of the memory-mapped panel
+        prices = PriceMatrix(panel.dates, panel.tickers, panel.field_matrix("Close").astype(dtype))
+    else:
+        # "Date"와 "Close" 컬럼만 읽어서 (날짜 x 종목) 행렬 생성
+        prices, errors = build_price_matrix(input_dir, field="Close", dtype=dtype, workers=workers)
+        report_errors(errors, len(prices.tickers) + len(errors))
+
+    # Keep the coverage index of the raw CSVs in sync
+    refresh_index(input_dir)
+    print(f"Processed {len(prices.tickers)} tickers over {len(prices.dates)} dates.")
+
     # 병합된 데이터를 저장
-    merged_data.sort_values(by="Date", inplace=True)  # 날짜 정렬
-    merged_data.to_csv(output_file, index=False)
+    merged_data = prices.to_frame(suffix="_closing")
+    merged_data.to_csv(output_file, index=False, date_format="%Y-%m-%d")
     print(f"Merged data saved to {output_file}")
+    return merged_data
 
-# 함수 실행
-merge_stock_data_by_date(RAW_DATA_DIR, PROCESSED_DATA_FILE)
+if __name__ == "__main__":
+    # 함수 실행
+    merge_stock_data_by_date(RAW_DATA_DIR, PROCESSED_DATA_FILE)
@@ -1,6 +1,9 @@
 import os
 import pandas as pd
 
+from scripts.utils.timeseries import FORMAT_CALENDAR, FORMAT_START, materialize
+from scripts.utils.dates import parse_dates
+
 # Set up dynamic paths
 PROJECT_ROOT = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "../../")
@@ -11,42 +14,53 @@ PROCESSED_DATA_DIR = os.path.join(PROJECT_ROOT, "data", "formatted")  # Output p
 # Ensure the output directory exists
 os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
 
-def process_unemployment_rate_data(input_dir, output_dir):
-    for file_name in os.listdir(input_dir):
+def process_unemployment_rate_data(input_dir=RAW_DATA_DIR, output_dir=PROCESSED_DATA_DIR, data=None):
+    """
+    Formats every unemployment rate CSV in `input_dir` into daily (Date, Actual)
+    rows from 2020 onwards. When `data` is given, only that
+    in-memory frame is formatted (saved as if it were 'UnemploymentRate.csv').
+    Returns the last formatted frame.
+    """
+    if data is not None:
+        sources = [("UnemploymentRate.csv", data)]
+    else:
         # Process only the file named "unemployment_rate.csv"
-        if "unemployment" in file_name.lower() and file_name.endswith(".csv"):
-            input_file_path = os.path.join(input_dir, file_name)
-            output_file_path = os.path.join(output_dir, "formatted_" + file_name)
+        sources = [
+            (file_name, None) for file_name in sorted(os.listdir(input_dir))
+            if "unemployment" in file_name.lower() and file_name.endswith(".csv")
+        ]
+
+    formatted = None
+    for file_name, frame in sources:
+        input_file_path = os.path.join(input_dir, file_name)
+        output_file_path = os.path.join(output_dir, "formatted_" + file_name)
 
-            try:
-                # Load the CSV file
-                data = pd.read_csv(input_file_path)
+        try:
+            # Load the CSV file (or take the refined frame handed over in memory)
+            data = pd.read_csv(input_file_path) if frame is None else frame.copy()
 
-                # Keep only the Release Date and Actual columns
-                filtered_data = data[["Release Date", "Actual"]]
+            # Keep only the Date and Actual columns
+            filtered_data = data[["Date", "Actual"]].copy()
 
-                # Convert "Release Date" to the format YYYY-MM-DD
-                filtered_data["Release Date"] = pd.to_datetime(
-                    filtered_data["Release Date"].str.split('(').str[0].str.strip(),
-                    format="%b %d, %Y"
-                ).dt.strftime("%Y-%m-%d")
+            # Parse the release dates
+            filtered_data["Date"] = parse_dates(filtered_data["Date"], "iso")
 
-                # Filter for dates from 2020 and later
-                filtered_data["Release Date"] = pd.to_datetime(filtered_data["Release Date"])
-                filtered_data = filtered_data[filtered_data["Release Date"].dt.year >= 2020]
+            # Convert "Actual" from percent to decimal
+            filtered_data["Actual"] = filtered_data["Actual"] / 100
 
-                # Convert "Actual" from percentage to decimal
-                filtered_data["Actual"] = filtered_data["Actual"].str.rstrip('%').astype(float) / 100
+            # Materialize the releases onto the daily calendar from 2020 onwards
+            filtered_data = materialize(filtered_data, "Date", calendar=FORMAT_CALENDAR, start=FORMAT_START)
 
-                # Rename columns for consistency
-                filtered_data.rename(columns={"Release Date": "Date"}, inplace=True)
+            # Save the processed data to a new file
+            filtered_data.to_csv(output_file_path, index=False)
 
-                # Save the processed data to a new file
-                filtered_data.to_csv(output_file_path, index=False)
+            print(f"Processed unemployment rate data saved to: {output_file_path}")
+            formatted = filtered_data
+        except Exception as e:
+            print(f"Error processing file {file_name}: {e}")
 
-                print(f"Processed unemployment rate data saved to: {output_file_path}")
-            except Exception as e:
-                print(f"Error processing file {file_name}: {e}")
+    return formatted
 
-# Run the function
-process_unemployment_rate_data(RAW_DATA_DIR, PROCESSED_DATA_DIR)
+if __name__ == "__main__":
+    # Run the function
+    process_unemployment_rate_data(RAW_DATA_DIR, PROCESSED_DATA_DIR)
@@ -0,0 +1,293 @@
+import os
+import sys
+import time
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from scripts.analysis.correlation import standardize, masked_correlation
+from scripts.stock_data.loader import RAW_DATA_DIR
+from scripts.stock_data.panel import PANEL_DIR, open_panel
+from scripts.stock_data.price_matrix import build_price_matrix
+
+# ------------------------------------------------------------------------
+# 1) Define Paths and Settings
+# ------------------------------------------------------------------------
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+GRAPH_DIR = os.path.join(PROJECT_ROOT, "data", "graph")
+GRAPH_PATH = os.path.join(GRAPH_DIR, "stock_graph.npz")
+
+MEASURES = ("correlation", "partial")
+
+# Default neighbours per ticker
+TOP_K = 10
+
+# Tickers correlated per block: memory is O(BLOCK_SIZE x tickers) for the
+# correlation measure
+BLOCK_SIZE = 256
+
+# Fewest overlapping returns for a pair to be considered
+MIN_OBS = 60
+
+# Shrinkage of the correlation matrix towards the identity before it is
+# inverted for partial correlations, and the smallest eigenvalue kept
+SHRINKAGE = 0.1
+
+# ------------------------------------------------------------------------
+# 2) Returns Panel
+# ------------------------------------------------------------------------
+
+def log_returns(prices):
+    """Daily log returns of a (dates x tickers) price array; NaN where either day is missing."""
+    prices = np.asarray(prices, dtype="float64")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.log(prices[1:]) - np.log(prices[:-1])
+    returns[~np.isfinite(returns)] = np.nan
+    return returns
+
+
+def load_returns(panel_dir=PANEL_DIR, input_dir=RAW_DATA_DIR, field="Close", start=None, end=None):
+    """
+    Daily log returns of `field` for every ticker over [start, end], from
+    the memory-mapped panel (see panel.py) if it exists, otherwise from
+    the per-ticker CSVs.
+
+    Returns:
+        (pd.DatetimeIndex, tuple, np.ndarray): return dates, tickers and
+        the (dates x tickers) returns.
+    """
+    try:
+        panel = open_panel(panel_dir)
+        rows = panel.date_slice(start, end)
+        dates, tickers, prices = panel.dates[rows], panel.tickers, panel.field_matrix(field, start, end)
+    except FileNotFoundError:
+        matrix, _ = build_price_matrix(input_dir, field=field, start=start, end=end)
+        dates, tickers, prices = matrix.dates, matrix.tickers, matrix.values
+    return dates[1:], tuple(tickers), log_returns(prices)
+
+# ------------------------------------------------------------------------
+# 3) Edge Selection
+# ------------------------------------------------------------------------
+
+def _select(scores, weights, offset, k, threshold):
+    """
+    (rows, cols, weights) of the entries of one block of rows to keep:
+    the `k` best scores of each row and/or the scores >= `threshold`.
+    `scores` has -inf on the diagonal and for unusable pairs.
+    """
+    keep = np.isfinite(scores)
+    if threshold is not None:
+        keep &= scores >= threshold
+    if k is not None and k < scores.shape[1]:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        in_top = np.zeros_like(keep)
+        np.put_along_axis(in_top, top, True, axis=1)
+        keep &= in_top
+    rows, cols = np.nonzero(keep)
+    return rows + offset, cols, weights[rows, cols]
+
+
+def select_edges(blocks, N, k=TOP_K, threshold=None, absolute=False, symmetric=True):
+    """
+    Sparse adjacency from (first row, weight block) row blocks of an
+    N x N weight matrix (NaN for unusable pairs); see build_graph for the
+    meaning of the filters. Only the kept entries of each block are held.
+
+    Returns:
+        scipy.sparse.csr_matrix: (N x N) float32 weights, no self-loops.
+    """
+    rows, cols, weights = [np.zeros(0, dtype="int64")], [np.zeros(0, dtype="int64")], [np.zeros(0)]
+    for start, block in blocks:
+        block = np.array(block, dtype="float64")
+        block[np.arange(len(block)), np.arange(start, start + len(block))] = np.nan
+        scores = np.abs(block) if absolute else block.copy()
+        scores[np.isnan(scores)] = -np.inf
+        selected = _select(scores, block, start, k, threshold)
+        rows.append(selected[0])
+        cols.append(selected[1])
+        weights.append(selected[2])
+
+    rows, cols, weights = np.concatenate(rows), np.concatenate(cols), np.concatenate(weights)
+    if symmetric:
+        rows, cols, weights = np.concatenate([rows, cols]), np.concatenate([cols, rows]), np.concatenate([weights, weights])
+        # An edge kept in both directions appears twice
+        _, first = np.unique(rows.astype("int64") * N + cols, return_index=True)
+        rows, cols, weights = rows[first], cols[first], weights[first]
+
+    return sparse.csr_matrix((weights.astype("float32"), (rows, cols)), shape=(N, N))
+
+
+def _correlation_blocks(returns, block_size, min_obs):
+    """Yields (first row, correlation block) for row blocks of the ticker x ticker matrix."""
+    values, mask = standardize(returns)
+    for start in range(0, values.shape[1], block_size):
+        stop = min(start + block_size, values.shape[1])
+        r, n = masked_correlation(values[:, start:stop], mask[:, start:stop], values, mask)
+        r[n < min_obs] = np.nan
+        yield start, r
+
+
+def _partial_correlation(returns, block_size, min_obs, shrinkage):
+    """Dense partial correlation matrix from the shrunk, inverted correlation matrix (NaN diagonal)."""
+    N = returns.shape[1]
+    correlation = np.eye(N)
+    for start, r in _correlation_blocks(returns, block_size, min_obs):
+        correlation[start:start + len(r)] = np.nan_to_num(r)
+    np.fill_diagonal(correlation, 1.0)
+    correlation = (1.0 - shrinkage) * correlation + shrinkage * np.eye(N)
+
+    # Pairwise-complete correlations can still be indefinite: eigenvalues
+    # below the shrinkage intensity are raised to it before inverting
+    eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+    eigenvalues = np.maximum(eigenvalues, shrinkage)
+    precision = (eigenvectors / eigenvalues) @ eigenvectors.T
+    scale = np.sqrt(np.diag(precision))
+    partial = -precision / np.outer(scale, scale)
+    np.fill_diagonal(partial, np.nan)
+    return partial
+
+# ------------------------------------------------------------------------
+# 4) Graph
+# ------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class StockGraph:
+    """
+    A weighted ticker graph: `adjacency[i, j]` is the (partial) correlation
+    of the returns of `tickers[i]` and `tickers[j]` for every kept edge, as
+    a CSR matrix without self-loops. `start`/`end` are the first and last
+    return dates used.
+    """
+    tickers: tuple
+    adjacency: sparse.csr_matrix
+    measure: str
+    start: pd.Timestamp
+    end: pd.Timestamp
+
+    def neighbors(self, ticker):
+        """The neighbours of one ticker and their edge weights, strongest first."""
+        i = self.tickers.index(ticker)
+        row = self.adjacency.getrow(i)
+        weights = pd.Series(row.data, index=[self.tickers[j] for j in row.indices], name=ticker)
+        return weights.sort_values(ascending=False)
+
+    def edges(self):
+        """All edges as a (source, target, weight) frame."""
+        coo = self.adjacency.tocoo()
+        return pd.DataFrame({
+            "source": np.array(self.tickers, dtype=object)[coo.row],
+            "target": np.array(self.tickers, dtype=object)[coo.col],
+            "weight": coo.data,
+        })
+
+
+def build_graph(returns, tickers, k=TOP_K, threshold=None, measure="correlation", absolute=False,
+                symmetric=True, block_size=BLOCK_SIZE, min_obs=MIN_OBS, shrinkage=SHRINKAGE):
+    """
+    Builds the sparse adjacency between tickers from their returns.
+
+    Each ticker keeps its `k` strongest neighbours and/or the neighbours
+    whose weight is at least `threshold` (both filters apply when both are
+    given). Strength is the weight itself, or its magnitude with
+    `absolute`. With `symmetric`, an edge kept in either direction is kept
+    in both.
+
+    With measure="correlation", pairwise-complete correlations (pairs with
+    at least `min_obs` common returns) are computed `block_size` tickers
+    at a time and only the kept edges of each block are retained, so memory
+    stays O(block_size x tickers). measure="partial" conditions each pair
+    on all other tickers via the inverse of the shrunk correlation matrix,
+    which needs the dense tickers x tickers matrix.
+
+    Returns:
+        scipy.sparse.csr_matrix: (tickers x tickers) float32 weights.
+
+    Raises:
+        ValueError: If neither `k` nor `threshold` is given, or `measure`
+            is unknown.
+    """
+    if k is None and threshold is None:
+        raise ValueError("Give a number of neighbours `k`, a `threshold`, or both.")
+    if measure not in MEASURES:
+        raise ValueError(f"Unknown measure '{measure}'. Expected one of {MEASURES}.")
+    N = len(tickers)
+
+    if measure == "partial":
+        partial = _partial_correlation(returns, block_size, min_obs, shrinkage)
+        blocks = ((start, partial[start:start + block_size]) for start in range(0, N, block_size))
+    else:
+        blocks = _correlation_blocks(returns, block_size, min_obs)
+
+    return select_edges(blocks, N, k=k, threshold=threshold, absolute=absolute, symmetric=symmetric)
+
+# ------------------------------------------------------------------------
+# 5) Persistence
+# ------------------------------------------------------------------------
+
+def save_graph(graph, path=GRAPH_PATH):
+    """Saves the CSR arrays, tickers and metadata as one .npz archive, replacing `path` atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp.npz"
+    adjacency = graph.adjacency
+    np.savez(tmp_path, indptr=adjacency.indptr, indices=adjacency.indices, data=adjacency.data,
+             tickers=np.array(graph.tickers), measure=np.array(graph.measure),
+             period=np.array([graph.start, graph.end], dtype="datetime64[D]"))
+    os.replace(tmp_path, path)
+    print(f"Stock graph ({len(graph.tickers)} tickers, {adjacency.nnz} edges) saved to {path}")
+
+
+def load_graph(path=GRAPH_PATH):
+    """
+    Reads a graph saved by save_graph.
+
+    Raises:
+        FileNotFoundError: If `path` does not exist.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No stock graph found at {path}. Run scripts/graph/builder.py first.")
+    with np.load(path) as archive:
+        tickers = tuple(archive["tickers"].tolist())
+        adjacency = sparse.csr_matrix((archive["data"], archive["indices"], archive["indptr"]),
+                                      shape=(len(tickers), len(tickers)))
+        start, end = pd.DatetimeIndex(archive["period"])
+        return StockGraph(tickers, adjacency, str(archive["measure"]), start, end)
+
+
+def run_graph(k=TOP_K, threshold=None, measure="correlation", absolute=False, start=None, end=None,
+              output_path=GRAPH_PATH, panel_dir=PANEL_DIR):
+    """Builds the stock graph from the returns over [start, end] and saves it."""
+    dates, tickers, returns = load_returns(panel_dir, start=start, end=end)
+    if not len(dates):
+        raise ValueError("No returns in the requested period.")
+    started = time.perf_counter()
+    adjacency = build_graph(returns, tickers, k=k, threshold=threshold, measure=measure, absolute=absolute)
+    print(f"[INFO] Built the {measure} graph of {len(tickers)} tickers over {len(dates)} days "
+          f"in {time.perf_counter() - started:.2f}s")
+    graph = StockGraph(tickers, adjacency, measure, dates[0], dates[-1])
+    save_graph(graph, output_path)
+    return graph
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the sparse stock correlation graph from daily returns.")
+    parser.add_argument("-k", type=int, default=TOP_K, help="Neighbours kept per ticker (0: no limit)")
+    parser.add_argument("-threshold", type=float, default=None, help="Keep only edges with at least this weight")
+    parser.add_argument("-measure", choices=MEASURES, default="correlation", help="Edge weight")
+    parser.add_argument("-absolute", action="store_true", help="Rank and threshold by the weight's magnitude")
+    parser.add_argument("-start", default=None, help="First date of the returns (YYYY-MM-DD)")
+    parser.add_argument("-end", default=None, help="Last date of the returns (YYYY-MM-DD)")
+    parser.add_argument("-output", default=GRAPH_PATH, help="Path of the .npz archive")
+    parser.add_argument("-panel", default=PANEL_DIR, help="Directory of the price panel")
+    args = parser.parse_args()
+
+    try:
+        run_graph(args.k or None, args.threshold, args.measure, args.absolute, args.start, args.end,
+                  args.output, args.panel)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,395 @@
+import os
+import sys
+import time
+import argparse
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from scripts.analysis.correlation import correlation_from_sums
+from scripts.graph.builder import (
+    GRAPH_DIR, GRAPH_PATH, TOP_K, MIN_OBS, StockGraph, load_returns, log_returns, save_graph, select_edges,
+)
+from scripts.stock_data.loader import RAW_DATA_DIR
+from scripts.stock_data.panel import PANEL_DIR
+from scripts.stock_data.price_matrix import build_price_matrix
+
+# ------------------------------------------------------------------------
+# 1) Define Paths and Settings
+# ------------------------------------------------------------------------
+
+# Running sums, window contents and the current graph between refreshes
+STATE_PATH = os.path.join(GRAPH_DIR, "graph_state.npz")
+# Every refresh appends the edges it changed here
+CHANGES_PATH = os.path.join(GRAPH_DIR, "edge_changes.csv")
+CHANGE_COLUMNS = ["Date", "source", "target", "old_weight", "new_weight", "change"]
+
+WINDOWS = ("sliding", "ewm")
+
+# Sliding window length in trading days, and the exponential window's half-life
+WINDOW_LENGTH = 252
+HALFLIFE = 63
+
+# Smallest weight change reported for an edge that stays in the graph
+CHANGE_TOLERANCE = 0.01
+
+# The sliding window's sums are rebuilt from its rows this often, so
+# rounding error from adding and removing rows cannot accumulate
+REFRESH_EVERY = 252
+
+# ------------------------------------------------------------------------
+# 2) Running Pair Sums
+# ------------------------------------------------------------------------
+
+class PairMoments:
+    """
+    Weighted running count, sums, sums of squares and cross products of
+    the returns of ticker pairs, over the days on which both have a return.
+
+    Kept either for all N x N pairs (dense, O(N^2) per day) or only for
+    the (rows, cols) pairs given, e.g. the edges of a kNN graph (O(N * k)
+    per day).
+    """
+    FIELDS = ("n", "sum_a", "sum_b", "sum_aa", "sum_bb", "sum_ab")
+
+    def __init__(self, N, pairs=None):
+        self.N = N
+        self.pairs = pairs
+        shape = (N, N) if pairs is None else (len(pairs[0]),)
+        for field in self.FIELDS:
+            setattr(self, field, np.zeros(shape))
+
+    def _operands(self, returns):
+        present = ~np.isnan(returns)
+        values = np.where(present, returns, 0.0)
+        present = present.astype("float64")
+        if self.pairs is None:
+            return values[:, None], values[None, :], present[:, None], present[None, :]
+        rows, cols = self.pairs
+        return values[rows], values[cols], present[rows], present[cols]
+
+    def add(self, returns, weight=1.0):
+        """Adds one day's returns with `weight` (-1 removes a day added before)."""
+        a, b, mask_a, mask_b = self._operands(returns)
+        self.n += weight * (mask_a * mask_b)
+        self.sum_a += weight * (a * mask_b)
+        self.sum_b += weight * (mask_a * b)
+        self.sum_aa += weight * (a ** 2 * mask_b)
+        self.sum_bb += weight * (mask_a * b ** 2)
+        self.sum_ab += weight * (a * b)
+
+    def scale(self, factor):
+        """Decays every sum by `factor` (exponentially weighted windows)."""
+        for field in self.FIELDS:
+            getattr(self, field)[...] *= factor
+
+    def reset(self):
+        for field in self.FIELDS:
+            getattr(self, field)[...] = 0.0
+
+    def correlation(self, min_obs):
+        """Correlations of the tracked pairs; NaN where the (weighted) count is below `min_obs`."""
+        r = correlation_from_sums(self.n, self.sum_a, self.sum_b, self.sum_aa, self.sum_bb, self.sum_ab)
+        r[self.n < min_obs] = np.nan
+        return r
+
+# ------------------------------------------------------------------------
+# 3) Graph Maintainer
+# ------------------------------------------------------------------------
+
+def diff_edges(old, new, tickers, tolerance=CHANGE_TOLERANCE):
+    """
+    The edges that differ between two adjacencies: added, removed, or with
+    a weight that moved by more than `tolerance`.
+
+    Returns:
+        pd.DataFrame: (source, target, old_weight, new_weight, change).
+    """
+    N = len(tickers)
+    old, new = old.tocoo(), new.tocoo()
+    weights = pd.concat([
+        pd.Series(old.data, index=old.row.astype("int64") * N + old.col, dtype="float64"),
+        pd.Series(new.data, index=new.row.astype("int64") * N + new.col, dtype="float64"),
+    ], axis=1, keys=["old_weight", "new_weight"])
+    in_old, in_new = weights["old_weight"].notna(), weights["new_weight"].notna()
+    moved = (weights["new_weight"] - weights["old_weight"]).abs() > tolerance
+    weights = weights[moved | (in_old != in_new)].sort_index()
+
+    names = np.array(tickers, dtype=object)
+    keys = weights.index.to_numpy()
+    change = np.where(weights["old_weight"].isna(), "added", np.where(weights["new_weight"].isna(), "removed", "updated"))
+    return pd.DataFrame({
+        "source": names[keys // N],
+        "target": names[keys % N],
+        "old_weight": weights["old_weight"].to_numpy(),
+        "new_weight": weights["new_weight"].to_numpy(),
+        "change": change,
+    })
+
+
+class GraphMaintainer:
+    """
+    Keeps a stock graph up to date one trading day at a time.
+
+    The pair sums cover a sliding window of the last `length` days
+    (the day leaving the window is subtracted) or an exponentially
+    weighted window with half-life `halflife` days (the sums decay each
+    day), so a new day costs one O(N^2) vectorized update.
+
+    By default the sums are dense and each day re-selects the edges with
+    the builder's rules (`k`, `threshold`, `absolute`, `symmetric`), so
+    edges can enter and leave the graph. Given `edges` (an adjacency),
+    only those pairs are tracked and reweighted, in O(nnz) per day; the
+    topology is then fixed until the graph is initialized again.
+    """
+
+    def __init__(self, tickers, window="sliding", length=WINDOW_LENGTH, halflife=HALFLIFE, k=TOP_K,
+                 threshold=None, absolute=False, symmetric=True, min_obs=MIN_OBS, edges=None):
+        if window not in WINDOWS:
+            raise ValueError(f"Unknown window '{window}'. Expected one of {WINDOWS}.")
+        self.tickers = tuple(tickers)
+        self.window = window
+        self.length = length
+        self.halflife = halflife
+        self.selection = dict(k=k, threshold=threshold, absolute=absolute, symmetric=symmetric)
+        self.min_obs = min_obs
+
+        N = len(self.tickers)
+        self.edges = None if edges is None else sparse.csr_matrix(edges)
+        self.moments = PairMoments(N, None if self.edges is None else self.edges.nonzero())
+        # Sliding window: its days and their returns; exponential window: only its first day
+        self.dates = deque()
+        self.rows = deque()
+        self.updates = 0
+        self.adjacency = sparse.csr_matrix((N, N), dtype="float32")
+
+    @property
+    def start(self):
+        """First day of the window (None while it is empty)."""
+        return self.dates[0] if self.dates else None
+
+    @property
+    def end(self):
+        """Last day added (None while the window is empty)."""
+        return self.dates[-1] if self.dates else None
+
+    def add_day(self, date, returns):
+        """Adds one day's returns (length N, NaN where missing) to the window."""
+        returns = np.asarray(returns, dtype="float64")
+        if self.window == "ewm":
+            self.moments.scale(0.5 ** (1.0 / self.halflife))
+            self.moments.add(returns)
+            self.dates.append(pd.Timestamp(date))
+            while len(self.dates) > 2:
+                del self.dates[1]
+            return
+
+        self.dates.append(pd.Timestamp(date))
+        self.rows.append(returns)
+        self.moments.add(returns)
+        if len(self.rows) > self.length:
+            self.dates.popleft()
+            self.moments.add(self.rows.popleft(), -1.0)
+        self.updates += 1
+        if self.updates % REFRESH_EVERY == 0:
+            self.moments.reset()
+            for row in self.rows:
+                self.moments.add(row)
+
+    def current_adjacency(self):
+        """The graph implied by the current window."""
+        N = len(self.tickers)
+        r = self.moments.correlation(self.min_obs)
+        if self.edges is None:
+            return select_edges([(0, r)], N, **self.selection)
+        rows, cols = self.moments.pairs
+        keep = ~np.isnan(r)
+        return sparse.csr_matrix((r[keep].astype("float32"), (rows[keep], cols[keep])), shape=(N, N))
+
+    def step(self, date, returns, tolerance=CHANGE_TOLERANCE):
+        """Adds one day and returns the edges that changed (see diff_edges)."""
+        self.add_day(date, returns)
+        adjacency = self.current_adjacency()
+        changes = diff_edges(self.adjacency, adjacency, self.tickers, tolerance)
+        self.adjacency = adjacency
+        return changes
+
+    def graph(self):
+        """The current graph as a StockGraph."""
+        return StockGraph(self.tickers, self.adjacency, "correlation", self.start, self.end)
+
+# ------------------------------------------------------------------------
+# 4) State Persistence
+# ------------------------------------------------------------------------
+
+def _sparse_arrays(prefix, matrix):
+    return {f"{prefix}_indptr": matrix.indptr, f"{prefix}_indices": matrix.indices, f"{prefix}_data": matrix.data}
+
+
+def _sparse_matrix(archive, prefix, N):
+    return sparse.csr_matrix(
+        (archive[f"{prefix}_data"], archive[f"{prefix}_indices"], archive[f"{prefix}_indptr"]), shape=(N, N))
+
+
+def save_state(maintainer, last_prices, path=STATE_PATH):
+    """Saves the maintainer and the last day's prices, replacing `path` atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp.npz"
+    N = len(maintainer.tickers)
+    selection = maintainer.selection
+    arrays = {field: getattr(maintainer.moments, field) for field in PairMoments.FIELDS}
+    arrays.update(_sparse_arrays("adjacency", maintainer.adjacency))
+    if maintainer.edges is not None:
+        arrays.update(_sparse_arrays("edges", maintainer.edges))
+    np.savez(
+        tmp_path, tickers=np.array(maintainer.tickers), window=np.array(maintainer.window),
+        length=maintainer.length, halflife=maintainer.halflife, min_obs=maintainer.min_obs,
+        k=-1 if selection["k"] is None else selection["k"],
+        threshold=np.nan if selection["threshold"] is None else selection["threshold"],
+        absolute=selection["absolute"], symmetric=selection["symmetric"], updates=maintainer.updates,
+        dates=np.array(maintainer.dates, dtype="datetime64[D]"), rows=np.array(maintainer.rows).reshape(-1, N),
+        last_prices=last_prices, **arrays,
+    )
+    os.replace(tmp_path, path)
+
+
+def load_state(path=STATE_PATH):
+    """
+    Restores a maintainer saved by save_state.
+
+    Returns:
+        (GraphMaintainer, last day's prices)
+
+    Raises:
+        FileNotFoundError: If `path` does not exist.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Graph state does not exist at path: {path} (run with -init first)")
+    with np.load(path) as archive:
+        tickers = tuple(archive["tickers"].tolist())
+        N = len(tickers)
+        k, threshold = int(archive["k"]), float(archive["threshold"])
+        maintainer = GraphMaintainer(
+            tickers, window=str(archive["window"]), length=int(archive["length"]),
+            halflife=float(archive["halflife"]), k=None if k < 0 else k,
+            threshold=None if np.isnan(threshold) else threshold, absolute=bool(archive["absolute"]),
+            symmetric=bool(archive["symmetric"]), min_obs=int(archive["min_obs"]),
+            edges=_sparse_matrix(archive, "edges", N) if "edges_data" in archive.files else None,
+        )
+        for field in PairMoments.FIELDS:
+            setattr(maintainer.moments, field, archive[field])
+        maintainer.dates.extend(pd.DatetimeIndex(archive["dates"]))
+        maintainer.rows.extend(archive["rows"])
+        maintainer.updates = int(archive["updates"])
+        maintainer.adjacency = _sparse_matrix(archive, "adjacency", N)
+        return maintainer, archive["last_prices"]
+
+# ------------------------------------------------------------------------
+# 5) Daily Refresh
+# ------------------------------------------------------------------------
+
+def _read_prices(tickers, start, end=None, input_dir=RAW_DATA_DIR):
+    """Closing prices of `tickers` (in that order, NaN if missing) on the dates in [start, end] of the CSVs."""
+    matrix, _ = build_price_matrix(input_dir, tickers=list(tickers), start=start, end=end)
+    prices = np.full((len(matrix.dates), len(tickers)), np.nan)
+    columns = [tickers.index(ticker) for ticker in matrix.tickers]
+    prices[:, columns] = matrix.values
+    return matrix.dates, prices
+
+
+def initialize(window="sliding", panel_dir=PANEL_DIR, input_dir=RAW_DATA_DIR, state_path=STATE_PATH,
+               graph_path=GRAPH_PATH, fixed=False, **options):
+    """
+    Starts a maintained graph from the stored prices: fills the window
+    with the latest days (every day for an exponential window), then
+    saves the state and the graph. With `fixed`, the edges selected now
+    are kept and only their weights are updated afterwards.
+
+    Parameters:
+        options: GraphMaintainer settings (length, halflife, k, ...).
+    """
+    dates, tickers, returns = load_returns(panel_dir, input_dir)
+    maintainer = GraphMaintainer(tickers, window=window, **options)
+    first = 0 if window == "ewm" else max(0, len(dates) - maintainer.length)
+    for date, row in zip(dates[first:], returns[first:]):
+        maintainer.add_day(date, row)
+    maintainer.adjacency = maintainer.current_adjacency()
+
+    if fixed:
+        edges = maintainer.adjacency
+        fixed_maintainer = GraphMaintainer(tickers, window=window, edges=edges, **options)
+        for date, row in zip(dates[first:], returns[first:]):
+            fixed_maintainer.add_day(date, row)
+        fixed_maintainer.adjacency = edges
+        maintainer = fixed_maintainer
+
+    # The next day's returns are taken against the last stored prices
+    _, prices = _read_prices(tickers, dates[-1], dates[-1], input_dir)
+    save_state(maintainer, prices[-1], state_path)
+    save_graph(maintainer.graph(), graph_path)
+    return maintainer
+
+
+def refresh_graph(state_path=STATE_PATH, graph_path=GRAPH_PATH, changes_path=CHANGES_PATH, input_dir=RAW_DATA_DIR,
+                  tolerance=CHANGE_TOLERANCE):
+    """
+    Brings the maintained graph up to the latest prices in `input_dir`:
+    each trading day after the last one processed is added in turn, the
+    graph and state are saved, and the edges that changed are appended
+    to `changes_path` with the day they changed on. Tickers listed since
+    the graph was initialized are ignored until it is initialized again.
+
+    Returns:
+        pd.DataFrame: The changed edges (Date, source, target, old_weight,
+        new_weight, change).
+
+    Raises:
+        FileNotFoundError: If there is no state yet (see initialize).
+    """
+    started = time.perf_counter()
+    maintainer, last_prices = load_state(state_path)
+    dates, prices = _read_prices(maintainer.tickers, maintainer.end + pd.Timedelta(days=1), input_dir=input_dir)
+
+    changes = []
+    for date, row in zip(dates, prices):
+        # Same returns as builder.log_returns: NaN unless both days have a price
+        returns = log_returns(np.vstack([last_prices, row]))[0]
+        changes.append(maintainer.step(date, returns, tolerance).assign(Date=date))
+        last_prices = row
+    if not changes:
+        print("[INFO] No new trading days; the graph is up to date.")
+        return pd.DataFrame(columns=CHANGE_COLUMNS)
+    changes = pd.concat(changes, ignore_index=True)[CHANGE_COLUMNS]
+
+    save_state(maintainer, last_prices, state_path)
+    save_graph(maintainer.graph(), graph_path)
+    if len(changes):
+        changes.to_csv(changes_path, mode="a", header=not os.path.exists(changes_path), index=False,
+                       date_format="%Y-%m-%d")
+    print(f"[INFO] Added {len(dates)} trading days to the graph ({len(changes)} edge changes) "
+          f"in {time.perf_counter() - started:.2f}s")
+    return changes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the stock graph incrementally as new prices arrive.")
+    parser.add_argument("-init", action="store_true", help="Start a new maintained graph from the price panel")
+    parser.add_argument("-window", choices=WINDOWS, default="sliding", help="Window of the running sums (with -init)")
+    parser.add_argument("-length", type=int, default=WINDOW_LENGTH, help="Sliding window length (with -init)")
+    parser.add_argument("-halflife", type=float, default=HALFLIFE, help="Exponential half-life (with -init)")
+    parser.add_argument("-k", type=int, default=TOP_K, help="Neighbours kept per ticker, 0: no limit (with -init)")
+    parser.add_argument("-threshold", type=float, default=None, help="Minimum edge weight (with -init)")
+    parser.add_argument("-fixed", action="store_true", help="Keep the initial edges and only update their weights")
+    args = parser.parse_args()
+
+    try:
+        if args.init:
+            initialize(args.window, length=args.length, halflife=args.halflife, k=args.k or None,
+                       threshold=args.threshold, fixed=args.fixed)
+        else:
+            refresh_graph()
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
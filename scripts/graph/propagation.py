@@ -0,0 +1,474 @@
+import os
+import sys
+import time
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from scripts.analysis.correlation import INDICATORS
+from scripts.analysis.regression import MERGED_DATA_PATH, load_sample
+from scripts.graph.builder import GRAPH_DIR, GRAPH_PATH, StockGraph, build_graph, load_graph, load_returns
+from scripts.stock_data.panel import PANEL_DIR
+
+# ------------------------------------------------------------------------
+# 1) Define Paths and Settings
+# ------------------------------------------------------------------------
+
+PREDICTIONS_PATH = os.path.join(GRAPH_DIR, "predictions.npz")
+SCORES_PATH = os.path.join(GRAPH_DIR, "prediction_scores.csv")
+
+MODELS = ("linear", "label_propagation", "residual", "gcn")
+
+# Share of the days (the earliest ones) the models are trained on
+TRAIN_FRACTION = 0.8
+
+# Past returns averaged into each ticker's momentum features
+MOMENTUM_WINDOWS = (5, 20)
+
+# Label propagation: weight of the neighbours against a node's own label, and sweeps
+ALPHA = 0.8
+ITERATIONS = 10
+
+# Ridge penalty of the pooled linear model
+RIDGE = 1.0
+
+# GCN: hidden units, full-batch Adam epochs, step size, L2 penalty and seed
+HIDDEN = 8
+EPOCHS = 100
+LEARNING_RATE = 0.01
+WEIGHT_DECAY = 1e-4
+SEED = 0
+
+# ------------------------------------------------------------------------
+# 2) Graph Operators
+# ------------------------------------------------------------------------
+
+def normalized_adjacency(adjacency, self_loops=True):
+    """
+    The symmetric normalization D^-1/2 A D^-1/2 of the stock graph, with
+    A + I when `self_loops` (as in a GCN layer). Edge weights are taken by
+    magnitude and an edge in either direction counts in both, so the
+    operator is symmetric with spectrum in [-1, 1].
+
+    Returns:
+        scipy.sparse.csr_matrix: (tickers x tickers) float32 operator.
+    """
+    A = abs(sparse.csr_matrix(adjacency, dtype="float64"))
+    A = A.maximum(A.T)
+    A = (A - sparse.diags(A.diagonal())).tocsr()
+    A.eliminate_zeros()
+    if self_loops:
+        A = A + sparse.identity(A.shape[0], format="csr")
+    degree = np.asarray(A.sum(axis=1)).ravel()
+    inverse_sqrt = np.zeros_like(degree)
+    np.divide(1.0, np.sqrt(degree), out=inverse_sqrt, where=degree > 0)
+    D = sparse.diags(inverse_sqrt)
+    return (D @ A @ D).tocsr().astype("float32")
+
+
+def propagate(operator, values):
+    """
+    Applies the (tickers x tickers) operator to every day of a (days x
+    tickers [x features]) stack in one sparse product.
+    """
+    T, N = values.shape[:2]
+    stacked = np.moveaxis(values, 1, 0).reshape(N, -1)
+    return np.ascontiguousarray(np.moveaxis((operator @ stacked).reshape((N, T) + values.shape[2:]), 0, 1))
+
+
+def label_propagation(operator, labels, alpha=ALPHA, iterations=ITERATIONS):
+    """
+    Spreads each day's known labels over the graph (Zhou et al.): F <-
+    alpha * S F + (1 - alpha) * Y, for all days at once. The known-label
+    indicator is propagated alongside and divides F, so every node gets a
+    diffusion-weighted average of the known labels around it, including
+    nodes whose own label is missing.
+
+    Parameters:
+        operator: normalized_adjacency(..., self_loops=False).
+        labels (np.ndarray): (days x tickers), NaN where unknown.
+
+    Returns:
+        np.ndarray: (days x tickers); NaN where no known label reaches a node.
+    """
+    known = ~np.isnan(labels)
+    seeds = np.stack([np.where(known, labels, 0.0), known], axis=-1).astype("float32")
+    spread = seeds.copy()
+    for _ in range(iterations):
+        spread = alpha * propagate(operator, spread) + (1.0 - alpha) * seeds
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(spread[..., 1] > 1e-6, spread[..., 0] / spread[..., 1], np.nan)
+
+# ------------------------------------------------------------------------
+# 3) Feature Panel
+# ------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class FeaturePanel:
+    """
+    Node features and targets on one date axis: `X[t, i]` holds the
+    `features` of `tickers[i]` known at the close of `dates[t]` and
+    `y[t, i]` its log return over the next trading day (NaN where missing,
+    and on the last day, whose prediction is the forecast for tomorrow).
+    `returns[t, i]` is the log return on `dates[t]` itself.
+    """
+    dates: pd.DatetimeIndex
+    tickers: tuple
+    features: tuple
+    X: np.ndarray
+    y: np.ndarray
+    returns: np.ndarray
+
+
+def _trailing_mean(returns, window):
+    """Mean of the last `window` returns up to each day, over the days present."""
+    present = ~np.isnan(returns)
+    totals = np.cumsum(np.where(present, returns, 0.0), axis=0)
+    counts = np.cumsum(present, axis=0).astype("float64")
+    totals[window:] -= totals[:-window].copy()
+    counts[window:] -= counts[:-window].copy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, totals / counts, np.nan)
+
+
+def build_feature_panel(dates, tickers, returns, macro, indicators=INDICATORS, train_days=None):
+    """
+    Builds the FeaturePanel: each ticker's return on the day and its
+    MOMENTUM_WINDOWS trailing means, and the macro `indicators` on the day
+    (the same for every ticker). Features are standardized with the first
+    `train_days` days (all days if None) and missing values set to 0.
+
+    Parameters:
+        macro (pd.DataFrame): merged_all_data.csv rows (Date + indicators),
+            carried forward onto `dates`.
+    """
+    indicators = [name for name in indicators if name in macro.columns]
+    macro = macro.drop_duplicates("Date").set_index("Date").sort_index()[indicators]
+    levels = macro.reindex(dates, method="ffill").to_numpy(dtype="float64")
+
+    T, N = returns.shape
+    node = [returns] + [_trailing_mean(returns, window) for window in MOMENTUM_WINDOWS]
+    X = np.concatenate([np.stack(node, axis=-1), np.broadcast_to(levels[:, None, :], (T, N, len(indicators)))],
+                       axis=-1)
+    fit = (X[:train_days] if train_days else X).reshape(-1, X.shape[-1])
+    present = ~np.isnan(fit)
+    count = np.maximum(present.sum(axis=0), 1)
+    mean = np.where(present, fit, 0.0).sum(axis=0) / count
+    scale = np.sqrt((np.where(present, fit - mean, 0.0) ** 2).sum(axis=0) / count)
+    scale = np.where(scale > 0, scale, 1.0)
+    X = np.nan_to_num((X - mean) / scale).astype("float32")
+
+    y = np.full_like(returns, np.nan)
+    y[:-1] = returns[1:]
+    names = ("return",) + tuple(f"momentum_{window}" for window in MOMENTUM_WINDOWS) + tuple(indicators)
+    return FeaturePanel(pd.DatetimeIndex(dates), tuple(tickers), names, X, y, returns)
+
+# ------------------------------------------------------------------------
+# 4) Models
+# ------------------------------------------------------------------------
+
+def fit_linear(X, y, ridge=RIDGE):
+    """
+    Pooled ridge regression of the targets on the features (with an
+    unpenalized intercept) over every (day, ticker) with a target.
+
+    Returns:
+        (intercept, coefficients)
+    """
+    mask = ~np.isnan(y)
+    Z = X[mask].astype("float64")
+    target = y[mask]
+    z_mean, y_mean = Z.mean(axis=0), target.mean()
+    Zc = Z - z_mean
+    coefficients = np.linalg.solve(Zc.T @ Zc + ridge * np.eye(Z.shape[1]), Zc.T @ (target - y_mean))
+    return y_mean - z_mean @ coefficients, coefficients
+
+
+def _fit_line(signal, y):
+    """Least-squares intercept and slope of y on one signal, over the entries where both are present."""
+    mask = ~np.isnan(signal) & ~np.isnan(y)
+    if mask.sum() < 2 or np.var(signal[mask]) == 0:
+        return 0.0, 0.0
+    slope, intercept = np.polyfit(signal[mask], y[mask], 1)
+    return intercept, slope
+
+
+class GCN:
+    """
+    Two-layer graph convolutional network predicting each ticker's next
+    return: y = S relu(S X W1 + b1) w2 + b2, with S the self-looped
+    normalized adjacency, trained full-batch with Adam on all training
+    days at once.
+
+    S X is formed once by the caller. Because the output layer is linear,
+    it is applied as S (H w2), so each epoch needs only two sparse
+    products with one column per day; the rest is dense NumPy on the
+    (days * tickers) rows.
+    """
+
+    def __init__(self, n_features, hidden=HIDDEN, seed=SEED):
+        rng = np.random.default_rng(seed)
+        limit = np.sqrt(6.0 / (n_features + hidden))
+        self.params = {
+            "W1": rng.uniform(-limit, limit, (n_features, hidden)).astype("float32"),
+            "b1": np.zeros(hidden, dtype="float32"),
+            "w2": rng.uniform(-limit, limit, hidden).astype("float32"),
+            "b2": np.zeros(1, dtype="float32"),
+        }
+        self.y_scale = 1.0
+
+    def _forward(self, operator, SX):
+        T, N, F = SX.shape
+        hidden = SX.reshape(-1, F) @ self.params["W1"]
+        hidden += self.params["b1"]
+        np.maximum(hidden, 0.0, out=hidden)
+        output = propagate(operator, (hidden @ self.params["w2"]).reshape(T, N)) + self.params["b2"]
+        return hidden, output
+
+    def fit(self, operator, SX, y, epochs=EPOCHS, learning_rate=LEARNING_RATE, weight_decay=WEIGHT_DECAY):
+        """
+        Trains on the propagated features SX = propagate(S, X) (days x
+        tickers x features) and targets y (NaN where missing). Returns the
+        training loss per epoch.
+        """
+        SX = np.ascontiguousarray(SX)
+        rows = SX.reshape(-1, SX.shape[-1])
+        mask = ~np.isnan(y)
+        self.y_scale = float(np.std(y[mask])) or 1.0
+        target = np.where(mask, y / self.y_scale, 0.0).astype("float32")
+        weight = (mask / max(mask.sum(), 1)).astype("float32")
+
+        moments = {name: (np.zeros_like(value), np.zeros_like(value)) for name, value in self.params.items()}
+        beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+        losses = []
+        for epoch in range(1, epochs + 1):
+            hidden, output = self._forward(operator, SX)
+            error = output - target
+            losses.append(float((weight * error ** 2).sum()))
+
+            d_output = 2.0 * weight * error
+            d_hidden_out = propagate(operator.T, d_output).ravel()
+            # d_hidden = outer(d_hidden_out, w2) on the active units, never formed
+            active = (hidden > 0).astype("float32")
+            w2 = self.params["w2"]
+            grads = {
+                "W1": ((rows * d_hidden_out[:, None]).T @ active) * w2 + 2.0 * weight_decay * self.params["W1"],
+                "b1": (d_hidden_out @ active) * w2,
+                "w2": hidden.T @ d_hidden_out + 2.0 * weight_decay * w2,
+                "b2": np.array([d_output.sum()], dtype="float32"),
+            }
+
+            for name, grad in grads.items():
+                m, v = moments[name]
+                m[...] = beta1 * m + (1 - beta1) * grad
+                v[...] = beta2 * v + (1 - beta2) * grad ** 2
+                step = learning_rate * (m / (1 - beta1 ** epoch)) / (np.sqrt(v / (1 - beta2 ** epoch)) + epsilon)
+                self.params[name] -= step.astype("float32")
+        return losses
+
+    def predict(self, operator, SX):
+        return self._forward(operator, np.ascontiguousarray(SX))[1] * self.y_scale
+
+# ------------------------------------------------------------------------
+# 5) Training and Scoring
+# ------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class PredictionResults:
+    """
+    `predictions[m, t, i]` is model `models[m]`'s forecast, at the close
+    of `dates[t]`, of `tickers[i]`'s next-day log return. Models are
+    trained on the days before `train_end` and scored on the rest.
+    """
+    dates: pd.DatetimeIndex
+    tickers: tuple
+    models: tuple
+    predictions: np.ndarray
+    train_end: pd.Timestamp
+
+    def forecast(self, model="gcn"):
+        """The latest day's forecasts of one model, by ticker."""
+        return pd.Series(self.predictions[self.models.index(model), -1], index=list(self.tickers),
+                         name=self.dates[-1])
+
+
+def train_models(panel, adjacency, train_days, alpha=ALPHA, iterations=ITERATIONS, ridge=RIDGE, hidden=HIDDEN,
+                 epochs=EPOCHS, learning_rate=LEARNING_RATE):
+    """
+    Trains every model on the first `train_days` days of the panel and
+    predicts every day:
+
+    - linear: pooled ridge regression on the features;
+    - label_propagation: each day's returns spread over the graph, as one
+      linearly rescaled signal;
+    - residual: the linear forecast plus the day's linear-model errors
+      (realized minus forecast return) spread over the graph and rescaled;
+    - gcn: the two-layer GCN on the features.
+
+    Returns:
+        PredictionResults
+    """
+    X, y = panel.X, panel.y
+    train = slice(0, train_days)
+    smoothing = normalized_adjacency(adjacency, self_loops=False)
+
+    intercept, coefficients = fit_linear(X[train], y[train], ridge)
+    linear = intercept + X.astype("float64") @ coefficients
+
+    propagated = label_propagation(smoothing, panel.returns, alpha, iterations)
+    a, b = _fit_line(propagated[train], y[train])
+    spread = a + b * propagated
+
+    errors = np.full_like(linear, np.nan)
+    errors[1:] = panel.returns[1:] - linear[:-1]
+    smoothed = label_propagation(smoothing, errors, alpha, iterations)
+    a, b = _fit_line(smoothed[train], (y - linear)[train])
+    residual = linear + np.nan_to_num(a + b * smoothed)
+
+    convolution = normalized_adjacency(adjacency, self_loops=True)
+    SX = propagate(convolution, X)
+    gcn = GCN(X.shape[-1], hidden)
+    gcn.fit(convolution, SX[train], y[train], epochs=epochs, learning_rate=learning_rate)
+
+    predictions = np.stack([linear, spread, residual, gcn.predict(convolution, SX)]).astype("float32")
+    return PredictionResults(panel.dates, panel.tickers, MODELS, predictions, panel.dates[train_days])
+
+
+def score_predictions(results, y):
+    """
+    Scores every model on the training and test days (those with a
+    target): mean squared error, out-of-sample R^2 against a zero
+    forecast, the mean daily cross-sectional correlation with the
+    realized returns (IC) and the share of correctly signed forecasts.
+
+    Returns:
+        pd.DataFrame: One row per (model, split).
+    """
+    test_start = results.dates.get_loc(results.train_end)
+    rows = []
+    for m, model in enumerate(results.models):
+        for split, days in (("train", slice(0, test_start)), ("test", slice(test_start, None))):
+            prediction, target = results.predictions[m, days].astype("float64"), y[days]
+            mask = ~np.isnan(target) & ~np.isnan(prediction)
+            error = np.where(mask, prediction - target, 0.0)
+
+            # Cross-sectional correlation of each day's forecasts with its returns
+            n = mask.sum(axis=1)
+            p = np.where(mask, prediction, 0.0)
+            t = np.where(mask, target, 0.0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                covariance = (p * t).sum(axis=1) - p.sum(axis=1) * t.sum(axis=1) / n
+                spread = np.sqrt(((p ** 2).sum(axis=1) - p.sum(axis=1) ** 2 / n)
+                                 * ((t ** 2).sum(axis=1) - t.sum(axis=1) ** 2 / n))
+                ic = covariance / spread
+            valid = (n > 2) & np.isfinite(ic)
+
+            rows.append({
+                "model": model,
+                "split": split,
+                "n_obs": int(mask.sum()),
+                "mse": (error ** 2).sum() / mask.sum(),
+                "r2_oos": 1.0 - (error ** 2).sum() / (t ** 2).sum(),
+                "ic": ic[valid].mean() if valid.any() else np.nan,
+                "hit_rate": (np.sign(p) == np.sign(t))[mask].mean(),
+            })
+    return pd.DataFrame(rows)
+
+
+def save_predictions(results, path=PREDICTIONS_PATH):
+    """Saves the predictions as one .npz archive, replacing `path` atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, dates=results.dates.to_numpy(dtype="datetime64[D]"), tickers=np.array(results.tickers),
+             models=np.array(results.models), predictions=results.predictions,
+             train_end=np.array(results.train_end, dtype="datetime64[D]"))
+    os.replace(tmp_path, path)
+    print(f"Predictions {results.predictions.shape} saved to {path}")
+
+
+def load_predictions(path=PREDICTIONS_PATH):
+    """
+    Reads predictions saved by save_predictions.
+
+    Raises:
+        FileNotFoundError: If `path` does not exist.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Predictions do not exist at path: {path}")
+    with np.load(path) as archive:
+        return PredictionResults(pd.DatetimeIndex(archive["dates"]), tuple(archive["tickers"].tolist()),
+                                 tuple(archive["models"].tolist()), archive["predictions"],
+                                 pd.Timestamp(archive["train_end"].item()))
+
+
+def run_predictions(graph_path=GRAPH_PATH, csv_path=MERGED_DATA_PATH, panel_dir=PANEL_DIR,
+                    output_path=PREDICTIONS_PATH, scores_path=SCORES_PATH, train_fraction=TRAIN_FRACTION,
+                    epochs=EPOCHS, hidden=HIDDEN, alpha=ALPHA):
+    """
+    Trains and scores every model on the saved stock graph, the daily
+    returns and the macro indicators of merged_all_data.csv, then saves
+    the predictions and the scores.
+
+    The scores are out of sample: a saved graph built from returns that
+    reach into the test period is rebuilt (with the default builder
+    settings and its measure) from the training days only.
+
+    Raises:
+        ValueError: If too few days are left for training or testing.
+    """
+    graph = load_graph(graph_path)
+    dates, tickers, returns = load_returns(panel_dir)
+    # Reorder the return columns to the graph's tickers (NaN for any the panel lacks)
+    columns = {ticker: j for j, ticker in enumerate(tickers)}
+    aligned = np.full((len(dates), len(graph.tickers)), np.nan)
+    for i, ticker in enumerate(graph.tickers):
+        if ticker in columns:
+            aligned[:, i] = returns[:, columns[ticker]]
+
+    train_days = int(len(dates) * train_fraction)
+    if train_days < 2 or train_days >= len(dates) - 1:
+        raise ValueError(f"Cannot split {len(dates)} days with a training fraction of {train_fraction}.")
+    if graph.end >= dates[train_days]:
+        # Edges picked from test-period returns would leak into the test scores
+        print(f"[INFO] The graph uses returns up to {graph.end:%Y-%m-%d}, inside the test period "
+              f"(from {dates[train_days]:%Y-%m-%d}); rebuilding it from the training days.")
+        adjacency = build_graph(aligned[:train_days], graph.tickers, measure=graph.measure)
+        graph = StockGraph(graph.tickers, adjacency, graph.measure, dates[0], dates[train_days - 1])
+
+    panel = build_feature_panel(dates, graph.tickers, aligned, load_sample(csv_path, years=None),
+                                train_days=train_days)
+    started = time.perf_counter()
+    results = train_models(panel, graph.adjacency, train_days, alpha=alpha, hidden=hidden, epochs=epochs)
+    print(f"[INFO] Trained {len(results.models)} models on {len(graph.tickers)} tickers x {train_days} days "
+          f"in {time.perf_counter() - started:.2f}s")
+
+    scores = score_predictions(results, panel.y)
+    print(scores.to_string(index=False, float_format=lambda value: f"{value:.4g}"))
+    save_predictions(results, output_path)
+    os.makedirs(os.path.dirname(scores_path), exist_ok=True)
+    scores.to_csv(scores_path, index=False)
+    print(f"Scores saved to {scores_path}")
+    return results, scores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Graph propagation models of next-day stock returns.")
+    parser.add_argument("-graph", default=GRAPH_PATH, help="Path of the stock graph .npz archive")
+    parser.add_argument("-input", default=MERGED_DATA_PATH, help="Path of merged_all_data.csv")
+    parser.add_argument("-panel", default=PANEL_DIR, help="Directory of the price panel")
+    parser.add_argument("-output", default=PREDICTIONS_PATH, help="Path of the predictions .npz archive")
+    parser.add_argument("-train", type=float, default=TRAIN_FRACTION, help="Share of the days to train on")
+    parser.add_argument("-epochs", type=int, default=EPOCHS, help="GCN training epochs")
+    parser.add_argument("-hidden", type=int, default=HIDDEN, help="GCN hidden units")
+    parser.add_argument("-alpha", type=float, default=ALPHA, help="Label propagation neighbour weight")
+    args = parser.parse_args()
+
+    try:
+        run_predictions(args.graph, args.input, args.panel, args.output, train_fraction=args.train,
+                        epochs=args.epochs, hidden=args.hidden, alpha=args.alpha)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,4 @@
+from scripts.pipeline.stages import Stage, STAGES, REFINE_STAGES, FORMAT_STAGES
+from scripts.pipeline.scheduler import build_graph, topological_order, run_parallel
+from scripts.pipeline.manifest import BuildManifest
+from scripts.pipeline.runner import run_stages
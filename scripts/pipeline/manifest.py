@@ -0,0 +1,178 @@
+import os
+import ast
+import json
+import hashlib
+import functools
+
+from scripts.pipeline.stages import PROJECT_ROOT
+
+MANIFEST_PATH = os.path.join(PROJECT_ROOT, "data", ".build_manifest.json")
+
+# Only modules of this package count as a stage's code; third-party
+# libraries are not hashed
+CODE_PACKAGE = "scripts"
+
+# ------------------------------------------------------------------------
+# 1) Content Hashing
+# ------------------------------------------------------------------------
+
+def _sha256_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _module_file(module):
+    """
+    Source file of a CODE_PACKAGE module, looked up by path under
+    PROJECT_ROOT (nothing is imported), or None if the dotted name is not a
+    module (e.g. a function imported with "from module import name").
+    """
+    base = os.path.join(PROJECT_ROOT, *module.split("."))
+    for path in (base + ".py", os.path.join(base, "__init__.py")):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def code_files(module):
+    """
+    Source files of `module` and of every CODE_PACKAGE module it imports,
+    directly or through other such modules (including imports inside
+    functions), found by parsing the sources rather than importing them.
+    Cached per module for the lifetime of the process.
+
+    Returns:
+        tuple of str: Absolute paths, sorted.
+    """
+    files, pending = set(), [module]
+    while pending:
+        path = _module_file(pending.pop())
+        if path is None or path in files:
+            continue
+        files.add(path)
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+                # "from package import module" imports a module, too
+                names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            else:
+                continue
+            pending.extend(name for name in names if name.split(".")[0] == CODE_PACKAGE)
+    return tuple(sorted(files))
+
+# ------------------------------------------------------------------------
+# 2) Build Manifest
+# ------------------------------------------------------------------------
+
+class BuildManifest:
+    """
+    Records, per stage, the content hashes of its code, inputs and outputs
+    after a successful run. A stage whose current hashes match the recorded
+    ones is up to date and can be skipped.
+
+    File hashes are cached by (size, mtime) so an unchanged tree is checked
+    with stat calls only; a file is re-hashed only when it was touched.
+
+    With force=True nothing is considered up to date, but successful runs
+    are still recorded.
+    """
+
+    def __init__(self, path=MANIFEST_PATH, force=False):
+        self.path = path
+        self.force = force
+        self.stages = {}
+        self.files = {}
+        # Code digests per stage module, computed once per run
+        self.code_digests = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    saved = json.load(f)
+                self.stages = saved.get("stages", {})
+                self.files = saved.get("files", {})
+            except (OSError, ValueError) as e:
+                print(f"[WARNING] Ignoring unreadable build manifest {path}: {e}")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"stages": self.stages, "files": self.files}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def digest(self, rel_path):
+        """
+        Returns the content hash of a project-relative file or directory,
+        or None if it does not exist. A directory hashes to the digest of its
+        sorted (name, file hash) pairs.
+        """
+        path = os.path.join(PROJECT_ROOT, rel_path)
+        if os.path.isdir(path):
+            digest = hashlib.sha256()
+            for name in sorted(os.listdir(path)):
+                if name.startswith("."):
+                    continue
+                file_digest = self.digest(os.path.join(rel_path, name))
+                if file_digest is not None:
+                    digest.update(f"{name}\0{file_digest}\n".encode("utf-8"))
+            return digest.hexdigest()
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        cached = self.files.get(rel_path)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+
+        sha = _sha256_file(path)
+        self.files[rel_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha}
+        return sha
+
+    def code_digest(self, stage):
+        """
+        Hash of the stage module and of every project module it imports
+        (see code_files), so editing a shared helper invalidates the stages
+        that use it. Computed once per module and manifest.
+        """
+        if stage.module not in self.code_digests:
+            digest = hashlib.sha256()
+            for path in code_files(stage.module):
+                rel_path = os.path.relpath(path, PROJECT_ROOT)
+                digest.update(f"{rel_path}\0{self.digest(rel_path)}\n".encode("utf-8"))
+            self.code_digests[stage.module] = digest.hexdigest()
+        return self.code_digests[stage.module]
+
+    def fingerprint(self, stage):
+        """Hashes of the stage's code, declared inputs and declared outputs."""
+        return {
+            "code": self.code_digest(stage),
+            "function": stage.function,
+            "inputs": {path: self.digest(path) for path in stage.inputs},
+            "outputs": {path: self.digest(path) for path in stage.outputs},
+        }
+
+    def is_up_to_date(self, stage):
+        """
+        True when the stage ran successfully before and neither its code,
+        its inputs nor its outputs changed since. Stages without declared
+        inputs (e.g. downloads) are never considered up to date.
+        """
+        recorded = self.stages.get(stage.name)
+        if self.force or not stage.inputs or recorded is None:
+            return False
+        current = self.fingerprint(stage)
+        if any(sha is None for sha in current["outputs"].values()):
+            return False
+        return current == recorded
+
+    def record(self, stage):
+        """Stores the stage's current fingerprint after a successful run."""
+        self.stages[stage.name] = self.fingerprint(stage)
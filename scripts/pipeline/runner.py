@@ -0,0 +1,82 @@
+import time
+
+from scripts.pipeline.stages import STAGES
+from scripts.pipeline.scheduler import run_parallel, topological_order
+
+# ------------------------------------------------------------------------
+# 1) In-process Stage Runner
+# ------------------------------------------------------------------------
+
+def run_stages(stages, results=None, jobs=1, manifest=None):
+    """
+    Runs the given stages (Stage objects or registry names) in dependency
+    order. Each stage's return value is kept in `results` and handed to
+    downstream stages in memory, so they do not have to re-read the CSV that
+    was just written.
+
+    With jobs=1 the stages run one after another in the current process;
+    with jobs > 1 independent stages run concurrently on a process pool.
+
+    When a BuildManifest is given, stages whose code, inputs and outputs are
+    unchanged since their last successful run are skipped, and the manifest
+    is updated and saved afterwards.
+
+    Returns the dictionary of stage results keyed by stage name.
+    """
+    results = {} if results is None else results
+    stages = topological_order([STAGES[s] if isinstance(s, str) else s for s in stages])
+
+    if jobs > 1:
+        start = time.perf_counter()
+        try:
+            results, timings = run_parallel(stages, jobs, results, manifest)
+        finally:
+            if manifest is not None:
+                manifest.save()
+        print_timings(timings, wall=time.perf_counter() - start)
+        return results
+
+    timings = []
+    for stage in stages:
+        if manifest is not None and manifest.is_up_to_date(stage):
+            print(f"[SKIP] {stage.name} is up to date")
+            timings.append((stage.name, "skipped", 0.0))
+            continue
+
+        start = time.perf_counter()
+        try:
+            stage_function = stage.load()
+            results[stage.name] = stage_function(**stage.collect_inputs(results))
+            status = "ok"
+        except Exception as e:
+            print(f"Error running {stage.name}: {e}")
+            results.pop(stage.name, None)
+            status = "failed"
+        elapsed = time.perf_counter() - start
+
+        print(f"[TIMING] {stage.name} finished in {elapsed:.2f}s ({status})")
+        timings.append((stage.name, status, elapsed))
+
+        if manifest is not None and results.get(stage.name) is not None:
+            manifest.record(stage)
+
+    if manifest is not None:
+        manifest.save()
+    print_timings(timings)
+    return results
+
+
+def print_timings(timings, wall=None):
+    """
+    Prints a wall-time summary for a list of (stage, status, seconds). `wall`
+    is the elapsed time of the whole run when stages overlapped.
+    """
+    if not timings:
+        return
+    width = max([len("total")] + [len(name) for name, _, _ in timings])
+    print("\n---- Stage Timings ----")
+    for name, status, elapsed in timings:
+        print(f"{name:<{width}}  {elapsed:8.2f}s  {status}")
+    print(f"{'total':<{width}}  {sum(t for _, _, t in timings):8.2f}s")
+    if wall is not None:
+        print(f"{'wall':<{width}}  {wall:8.2f}s")
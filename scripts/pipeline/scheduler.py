@@ -0,0 +1,115 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# ------------------------------------------------------------------------
+# 1) Dependency Graph
+# ------------------------------------------------------------------------
+
+def build_graph(stages):
+    """
+    Derives the dependency graph of `stages` from their declared files.
+    A stage depends on every other selected stage that writes one of its
+    inputs. Returns a dict: stage name -> set of upstream stage names.
+    """
+    producers = {}
+    for stage in stages:
+        for path in stage.outputs:
+            producers[path] = stage.name
+
+    graph = {}
+    for stage in stages:
+        graph[stage.name] = {
+            producers[path] for path in stage.inputs
+            if path in producers and producers[path] != stage.name
+        }
+    return graph
+
+
+def topological_order(stages):
+    """
+    Orders `stages` so that every stage comes after its upstream stages,
+    keeping the declared order among independent stages.
+
+    Raises:
+        ValueError: If the declared inputs/outputs form a cycle.
+    """
+    graph = build_graph(stages)
+    ordered, done = [], set()
+    remaining = list(stages)
+
+    while remaining:
+        ready = [stage for stage in remaining if graph[stage.name] <= done]
+        if not ready:
+            cycle = ", ".join(stage.name for stage in remaining)
+            raise ValueError(f"Dependency cycle between stages: {cycle}")
+        for stage in ready:
+            ordered.append(stage)
+            done.add(stage.name)
+        remaining = [stage for stage in remaining if stage.name not in done]
+
+    return ordered
+
+# ------------------------------------------------------------------------
+# 2) Parallel Execution
+# ------------------------------------------------------------------------
+
+def _run_stage_in_worker(stage, kwargs):
+    """Executes one stage inside a pool worker and returns (result, seconds)."""
+    start = time.perf_counter()
+    result = stage.load()(**kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_parallel(stages, jobs, results=None, manifest=None):
+    """
+    Runs `stages` on a pool of `jobs` worker processes. A stage is submitted
+    as soon as all of its upstream stages have finished, so independent
+    indicator branches run concurrently while e.g. format_csv_merge waits on
+    all of its inputs. Upstream results are sent to the worker in memory.
+
+    With a BuildManifest, a stage found up to date once its upstream stages
+    are done is skipped; successful stages are recorded in the manifest.
+
+    Returns (results, timings) where timings is a list of
+    (stage, status, seconds) in completion order.
+    """
+    results = {} if results is None else results
+    graph = build_graph(stages)
+    waiting = {stage.name: stage for stage in topological_order(stages)}
+    finished = set()
+    timings = []
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        running, started = {}, {}
+        while waiting or running:
+            for name, stage in list(waiting.items()):
+                if not graph[name] <= finished:
+                    continue
+                del waiting[name]
+                if manifest is not None and manifest.is_up_to_date(stage):
+                    print(f"[SKIP] {stage.name} is up to date")
+                    timings.append((stage.name, "skipped", 0.0))
+                    finished.add(name)
+                    continue
+                future = pool.submit(_run_stage_in_worker, stage, stage.collect_inputs(results))
+                running[future] = stage
+                started[future] = time.perf_counter()
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    results[stage.name], elapsed = future.result()
+                    status = "ok"
+                except Exception as e:
+                    print(f"Error running {stage.name}: {e}")
+                    elapsed, status = time.perf_counter() - started[future], "failed"
+                print(f"[TIMING] {stage.name} finished in {elapsed:.2f}s ({status})")
+                timings.append((stage.name, status, elapsed))
+                finished.add(stage.name)
+                if manifest is not None and results.get(stage.name) is not None:
+                    manifest.record(stage)
+
+    return results, timings
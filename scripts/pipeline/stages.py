@@ -0,0 +1,142 @@
+import os
+import importlib
+from dataclasses import dataclass, field
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+# ------------------------------------------------------------------------
+# 1) Stage Definition
+# ------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    A refine/format step that can be imported and called in-process.
+
+    `inputs` and `outputs` list the files (relative to the project root) the
+    stage reads and writes; the dependency graph is derived from them.
+
+    `handoff` maps a keyword argument of the stage function to the upstream
+    stage whose return value should be passed in memory. A value may also be
+    a dict (key -> upstream stage), in which case the keyword receives a dict
+    of the available upstream results.
+    """
+    name: str
+    module: str
+    function: str
+    inputs: tuple = ()
+    outputs: tuple = ()
+    handoff: dict = field(default_factory=dict)
+
+    def load(self):
+        """Imports the stage module and returns the stage function."""
+        return getattr(importlib.import_module(self.module), self.function)
+
+    def collect_inputs(self, results):
+        """Builds the keyword arguments for this stage from upstream results."""
+        kwargs = {}
+        for keyword, upstream in self.handoff.items():
+            if isinstance(upstream, dict):
+                available = {
+                    key: results[name] for key, name in upstream.items()
+                    if results.get(name) is not None
+                }
+                if available:
+                    kwargs[keyword] = available
+            elif results.get(upstream) is not None:
+                kwargs[keyword] = results[upstream]
+        return kwargs
+
+# ------------------------------------------------------------------------
+# 2) Stage Registry
+# ------------------------------------------------------------------------
+
+REFINE_STAGES = [
+    Stage("unemployment", "scripts.refine_data.unemployment", "refine_unemployment",
+          inputs=("data/raw/unemployment_rate_table.html",),
+          outputs=("data/processed/UnemploymentRate.csv",)),
+    Stage("m_pmi", "scripts.refine_data.m_pmi", "refine_manufacturing_pmi",
+          inputs=("data/raw/m_pmi_table.html",),
+          outputs=("data/processed/manufacturing_pmi.csv", "plots/manufacturing_pmi_plot.png")),
+    Stage("s_pmi", "scripts.refine_data.s_pmi", "refine_services_pmi",
+          inputs=("data/raw/s_pmi_table.html",),
+          outputs=("data/processed/services_pmi.csv", "plots/services_pmi_plot.png")),
+    Stage("sp500", "scripts.refine_data.sp500", "refine_sp500",
+          outputs=("data/processed/sp500.csv", "plots/sp500_closing_prices.png")),
+    Stage("cpi", "scripts.refine_data.cpi", "refine_cpi",
+          inputs=("data/raw/us_cpi_table.html",),
+          outputs=("data/processed/us_cpi.csv",)),
+    Stage("nominal_gdp", "scripts.refine_data.nominal_gdp", "refine_nominal_gdp",
+          inputs=("data/raw/us_nominal_gdp.csv",),
+          outputs=("data/processed/us_nominal_GDP.csv",)),
+    Stage("leading_index", "scripts.refine_data.leading_index", "refine_leading_index",
+          inputs=("data/raw/us_leading_index_table.html",),
+          outputs=("data/processed/us_leading_index.csv",)),
+    Stage("federal_interest_rate", "scripts.refine_data.federal_interest_rate", "refine_federal_interest_rate",
+          inputs=("data/raw/interest_rate_decision_table.html",),
+          outputs=("data/processed/federal_interest_rate.csv",)),
+]
+
+FORMAT_STAGES = [
+    Stage("format_cpi", "scripts.format_data.format_cpi", "process_cpi_data_with_year_month_day",
+          inputs=("data/processed/us_cpi.csv",),
+          outputs=("data/formatted/formatted_cpi_data.csv",),
+          handoff={"data": "cpi"}),
+    Stage("format_gdp", "scripts.format_data.format_gdp", "process_gdp_files_with_date_filter",
+          inputs=("data/processed/us_nominal_GDP.csv",),
+          outputs=("data/formatted/formatted_us_nominal_GDP.csv",),
+          handoff={"data": "nominal_gdp"}),
+    Stage("format_leading_index", "scripts.format_data.format_leading_index",
+          "process_leading_index_files_with_date_filter",
+          inputs=("data/processed/us_leading_index.csv",),
+          outputs=("data/formatted/formatted_us_leading_index.csv",),
+          handoff={"data": "leading_index"}),
+    Stage("format_merged_pmi", "scripts.format_data.format_merged_pmi", "process_pmi_files_with_date_filter",
+          inputs=("data/processed/manufacturing_pmi.csv", "data/processed/services_pmi.csv"),
+          outputs=("data/formatted/merged_pmi_data.csv",),
+          handoff={"data": {"manufacturing_pmi": "m_pmi", "services_pmi": "s_pmi"}}),
+    Stage("format_sp500", "scripts.format_data.format_sp500", "format_sp500",
+          inputs=("data/processed/sp500.csv",),
+          outputs=("data/formatted/processed_sp500_data.csv",),
+          handoff={"data": "sp500"}),
+    Stage("format_panel", "scripts.stock_data.panel", "build_panel",
+          inputs=("data/stock_data",),
+          outputs=("data/stock_panel",)),
+    # Reads the closing prices from the panel just built instead of the CSVs
+    Stage("format_stock", "scripts.format_data.format_stock", "merge_stock_data_by_date",
+          inputs=("data/stock_data", "data/stock_panel"),
+          outputs=("data/formatted/merged_stock_data.csv",),
+          handoff={"panel_dir": "format_panel"}),
+    Stage("format_unemployment", "scripts.format_data.format_unemployment", "process_unemployment_rate_data",
+          inputs=("data/processed/UnemploymentRate.csv",),
+          outputs=("data/formatted/formatted_UnemploymentRate.csv",),
+          handoff={"data": "unemployment"}),
+    Stage("format_interest_rate", "scripts.format_data.format_interest_rate", "format_interest_rate",
+          inputs=("data/processed/federal_interest_rate.csv",),
+          outputs=("data/formatted/formatted_interest_rate_data.csv",),
+          handoff={"data": "federal_interest_rate"}),
+    Stage("format_csv_merge", "scripts.format_data.format_csv_merge", "merge_all_data",
+          inputs=(
+              "data/formatted/formatted_cpi_data.csv",
+              "data/formatted/formatted_UnemploymentRate.csv",
+              "data/formatted/formatted_us_leading_index.csv",
+              "data/formatted/formatted_us_nominal_GDP.csv",
+              "data/formatted/merged_pmi_data.csv",
+              "data/formatted/merged_stock_data.csv",
+              "data/formatted/processed_sp500_data.csv",
+              "data/formatted/formatted_interest_rate_data.csv",
+          ),
+          outputs=("data/formatted/merged_all_data.csv",),
+          handoff={"data": {
+              "formatted_cpi_data.csv": "format_cpi",
+              "formatted_UnemploymentRate.csv": "format_unemployment",
+              "formatted_us_leading_index.csv": "format_leading_index",
+              "formatted_us_nominal_GDP.csv": "format_gdp",
+              "merged_pmi_data.csv": "format_merged_pmi",
+              "merged_stock_data.csv": "format_stock",
+              "processed_sp500_data.csv": "format_sp500",
+              "formatted_interest_rate_data.csv": "format_interest_rate",
+          }}),
+]
+
+STAGES = {stage.name: stage for stage in REFINE_STAGES + FORMAT_STAGES}
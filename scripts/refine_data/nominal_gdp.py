@@ -1,6 +1,5 @@
 import os
 import pandas as pd
-import calendar
 import sys
 
 # Step 1: Dynamically set PROJECT_ROOT
@@ -18,68 +17,63 @@ os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
 gdp_file_path = os.path.join(RAW_DATA_DIR, "us_nominal_gdp.csv")
 expanded_output_path = os.path.join(PROCESSED_DATA_DIR, "us_nominal_GDP.csv")
 
-# print(f"[DEBUG] Reading CSV from: {gdp_file_path}")
-if not os.path.exists(gdp_file_path):
-    sys.exit(f"[ERROR] File not found: {gdp_file_path}")
 
-# Step 3: Load the GDP data
-gdp_data = pd.read_csv(gdp_file_path)
-# print("[DEBUG] Columns in gdp_data:", gdp_data.columns.tolist())
-# print("[DEBUG] Data types in gdp_data (before conversion):\n", gdp_data.dtypes)
+def refine_nominal_gdp(gdp_file_path=gdp_file_path, expanded_output_path=expanded_output_path):
+    """
+    Cleans the yearly nominal GDP figures into one (Year, Month, Day, GDP)
+    row per year, saves them to CSV and returns the DataFrame.
 
-# Step 4: Ensure the 'Year' column is numeric and integer
-#         1) Convert to numeric
-#         2) Drop rows with NaN in 'Year'
-#         3) Cast to int
-gdp_data["Year"] = pd.to_numeric(gdp_data["Year"], errors="coerce")
-rows_before = len(gdp_data)
-gdp_data.dropna(subset=["Year"], inplace=True)
-rows_after = len(gdp_data)
-# print(f"[DEBUG] Dropped {rows_before - rows_after} rows where 'Year' was invalid/NaN.")
- 
-gdp_data["Year"] = gdp_data["Year"].astype(int)
-# print("[DEBUG] Data types in gdp_data (after conversion to int):\n", gdp_data.dtypes)
+    Raises:
+        FileNotFoundError: If the raw GDP CSV is missing.
+        ValueError: If the GDP column is missing.
+    """
+    # print(f"[DEBUG] Reading CSV from: {gdp_file_path}")
+    if not os.path.exists(gdp_file_path):
+        raise FileNotFoundError(f"File not found: {gdp_file_path}")
 
-# Optional: filter for Year >= 2000
-gdp_data = gdp_data[gdp_data["Year"] >= 2000].copy()
-# print("[DEBUG] Rows remaining after filtering Year >= 2000:", len(gdp_data))
+    # Step 3: Load the GDP data
+    gdp_data = pd.read_csv(gdp_file_path)
+    # print("[DEBUG] Columns in gdp_data:", gdp_data.columns.tolist())
+    # print("[DEBUG] Data types in gdp_data (before conversion):\n", gdp_data.dtypes)
 
-# Step 5: Expand rows for each day of each year
-expanded_rows = []
+    # Step 4: Ensure the 'Year' column is numeric and integer
+    #         1) Convert to numeric
+    #         2) Drop rows with NaN in 'Year'
+    #         3) Cast to int
+    gdp_data["Year"] = pd.to_numeric(gdp_data["Year"], errors="coerce")
+    rows_before = len(gdp_data)
+    gdp_data.dropna(subset=["Year"], inplace=True)
+    rows_after = len(gdp_data)
+    # print(f"[DEBUG] Dropped {rows_before - rows_after} rows where 'Year' was invalid/NaN.")
 
-# print("\n[DEBUG] Expanding rows now...")
-for idx, row in gdp_data.iterrows():
-    # Even though we cast to int, let's forcibly cast again in the loop for safety:
-    year_float = row["Year"]  # might be float if something re-converted it
-    year = int(year_float)
+    gdp_data["Year"] = gdp_data["Year"].astype(int)
+    # print("[DEBUG] Data types in gdp_data (after conversion to int):\n", gdp_data.dtypes)
 
-    # Print row index and types
-    # print(f"  Row idx={idx}, raw year={row['Year']} -> final year={year}, type(year)={type(year)}")
+    # Optional: filter for Year >= 2000
+    gdp_data = gdp_data[gdp_data["Year"] >= 2000].copy()
+    # print("[DEBUG] Rows remaining after filtering Year >= 2000:", len(gdp_data))
 
-    gdp_value = row.get("Nominal GDP (Current US$)", None)
-    if gdp_value is None:
-        # If there's no such column, print a warning and skip
-        print(f"[WARNING] Row idx={idx} has no 'Nominal GDP (Current US$)' column. Row data: {row}")
-        continue
+    if "Nominal GDP (Current US$)" not in gdp_data.columns:
+        raise ValueError("Column 'Nominal GDP (Current US$)' not found in the GDP data.")
 
-    # Now do the month/day expansion
-    for month in range(1, 13):
-        try:
-            days_in_month = calendar.monthrange(year, month)[1]
-        except Exception as e:
-            # Print a debug message if it fails
-            print(f"[ERROR] monthrange({year}, {month}) failed on row index={idx} with error: {e}")
-            print("[DEBUG] Full row data:\n", row)
-            raise  # re-raise the error so we can see the traceback
-        for day in range(1, days_in_month + 1):
-            expanded_rows.append({
-                "Year": year,
-                "Month": month,
-                "Day": day,
-                "GDP": gdp_value
-            })
+    # Step 5: One row per yearly figure, dated Jan 1 of its year. The format
+    #         stage materializes it onto the daily calendar
+    #         (scripts/utils/timeseries.py), so no daily rows are written here.
+    gdp_yearly = pd.DataFrame({
+        "Year": gdp_data["Year"].to_numpy(),
+        "Month": 1,
+        "Day": 1,
+        "GDP": gdp_data["Nominal GDP (Current US$)"].to_numpy(),
+    })
 
-# Step 6: Save expanded data
-gdp_expanded = pd.DataFrame(expanded_rows)
-gdp_expanded.to_csv(expanded_output_path, index=False)
-print("Expanded GDP data has been saved to {expanded_output_path}")
+    # Step 6: Save yearly data
+    gdp_yearly.to_csv(expanded_output_path, index=False)
+    print(f"Yearly GDP data has been saved to {expanded_output_path}")
+    return gdp_yearly
+
+
+if __name__ == "__main__":
+    try:
+        refine_nominal_gdp()
+    except (FileNotFoundError, ValueError) as e:
+        sys.exit(f"[ERROR] {e}")
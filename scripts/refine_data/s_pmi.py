@@ -1,15 +1,14 @@
 import os
-import csv
 import matplotlib.pyplot as plt
-from bs4 import BeautifulSoup
-from datetime import datetime
-import pandas as pd
+
+from scripts.utils.tables import SCHEMAS, read_history_frame
 
 # Set up dynamic paths
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
 RAW_DATA_DIR = os.path.join(PROJECT_ROOT, "data", "raw")
 PROCESSED_DATA_DIR = os.path.join(PROJECT_ROOT, "data", "processed")
 PLOTS_DIR = os.path.join(PROJECT_ROOT, "plots")
+
 os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
 os.makedirs(PLOTS_DIR, exist_ok=True)
 
@@ -21,59 +20,38 @@ services_plot = os.path.join(PLOTS_DIR, "services_pmi_plot.png")
 
 def extract_pmi_data(file_path):
     """Extract PMI data (Date, Actual, Forecast, Previous) from an HTML file."""
-    with open(file_path, "r", encoding="utf-8") as file:
-        html_content = file.read()
-
-    # Parse the HTML with BeautifulSoup
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # Find all <tr> tags with ids that start with "historicEvent_"
-    rows = soup.find_all("tr", id=lambda x: x and x.startswith("historicEvent_"))
-
-    # Prepare the data
-    data = []
-    for row in rows:
-        cols = [col.text.strip() for col in row.find_all("td")]
-        if len(cols) > 2:
-            date = cols[0]
-            actual = cols[2]
-            forecast = cols[3]
-            previous = cols[4]
+    return read_history_frame(file_path, SCHEMAS["s_pmi"])
 
-            try:
-                parsed_date = datetime.strptime(date.split('(')[0].strip(), "%b %d, %Y")
-                actual_value = float(actual)
-                forecast_value = float(forecast) if forecast else None
-                previous_value = float(previous) if previous else None
-                data.append([parsed_date, actual_value, forecast_value, previous_value])
-            except ValueError:
-                pass
 
-    return data
+def refine_services_pmi(html_file=services_file, csv_file=services_csv, plot_file=services_plot):
+    """
+    Extracts the Services PMI history, saves it to CSV, plots it and
+    returns it as a DataFrame.
+    """
+    # Extract data
+    services_data = extract_pmi_data(html_file)
 
+    # Save to CSV
+    services_data.to_csv(csv_file, index=False, date_format="%Y-%m-%d")
 
-# Extract data
-services_data = extract_pmi_data(services_file)
+    # Index by date for plotting
+    df_services = services_data.set_index("Date")
 
-# Save to CSV
-with open(services_csv, "w", newline="", encoding="utf-8") as csvfile:
-    writer = csv.writer(csvfile)
-    writer.writerow(["Date", "Actual", "Forecast", "Previous"])
-    writer.writerows(services_data)
+    # Plot
+    plt.figure(figsize=(10, 6))
+    plt.plot(df_services.index, df_services["Actual"], label="Services PMI", marker='o', color='g')
+    plt.xlabel("Year")
+    plt.ylabel("PMI")
+    plt.title("Services PMI Over Time")
+    plt.legend()
+    plt.tight_layout()
 
-# Load data into DataFrame
-df_services = pd.DataFrame(services_data, columns=["Date", "Actual", "Forecast", "Previous"])
-df_services.set_index("Date", inplace=True)
+    # Save the plot
+    plt.savefig(plot_file)
+    plt.close()
+    print(f"Services PMI plot saved as {plot_file}")
+    return df_services.reset_index()
 
-# Plot
-plt.figure(figsize=(10, 6))
-plt.plot(df_services.index, df_services["Actual"], label="Services PMI", marker='o', color='g')
-plt.xlabel("Year")
-plt.ylabel("PMI")
-plt.title("Services PMI Over Time")
-plt.legend()
-plt.tight_layout()
 
-# Save the plot
-plt.savefig(services_plot)
-print(f"Services PMI plot saved as {services_plot}")
+if __name__ == "__main__":
+    refine_services_pmi()
@@ -1,5 +1,6 @@
 import os
-import pandas as pd
+
+from scripts.utils.tables import SCHEMAS, read_history_frame
 
 # Step 1: Set up paths dynamically
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))  # Two levels up from this file
@@ -9,21 +10,28 @@ os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
 
 # Input and output file paths
 html_file_path = os.path.join(RAW_DATA_DIR, "unemployment_rate_table.html")  # HTML source file
-csv_output_path = os.path.join(PROCESSED_DATA_DIR, "unemploymentrate.csv")  # Processed CSV file
-
-# Step 2: Load the HTML file into a DataFrame
-try:
-    # Assuming the table is the first one on the page
-    unemployment_rate_data = pd.read_html(html_file_path)[0]
-    print("Data successfully loaded from HTML file.")
-except ValueError as e:
-    raise ValueError(f"Error reading HTML file: {e}")
-
-# Step 3: Display the first few rows and column names (for verification)
-print("Loaded Data Preview:")
-print(unemployment_rate_data.head())  # Preview the first 5 rows
-print("Available Columns:", unemployment_rate_data.columns)  # List all columns
-
-# Step 4: Save the DataFrame to a CSV file
-unemployment_rate_data.to_csv(csv_output_path, index=False)
-print(f"Data saved to CSV: {csv_output_path}")
+csv_output_path = os.path.join(PROCESSED_DATA_DIR, "UnemploymentRate.csv")  # Processed CSV file
+
+
+def refine_unemployment(html_file_path=html_file_path, csv_output_path=csv_output_path):
+    """
+    Extracts the unemployment rate releases (Date, Period, Time, Actual,
+    Forecast, Previous; rates in percent) from the saved table, saves them
+    to CSV and returns them as a DataFrame.
+    """
+    # Step 2: Parse the saved table into typed columns (see scripts/utils/tables.py)
+    unemployment_rate_data = read_history_frame(html_file_path, SCHEMAS["unemployment"])
+    print(f"Data successfully loaded from HTML file: {len(unemployment_rate_data)} releases.")
+
+    # Step 3: Display the first few rows (for verification)
+    print("Loaded Data Preview:")
+    print(unemployment_rate_data.head())
+
+    # Step 4: Save the DataFrame to a CSV file
+    unemployment_rate_data.to_csv(csv_output_path, index=False, date_format="%Y-%m-%d")
+    print(f"Data saved to CSV: {csv_output_path}")
+    return unemployment_rate_data
+
+
+if __name__ == "__main__":
+    refine_unemployment()
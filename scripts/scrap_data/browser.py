@@ -0,0 +1,173 @@
+import os
+import threading
+import contextlib
+import http.server
+from functools import partial
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+
+# ------------------------------------------------------------------------
+# 1) Define Paths and Browser Options
+# ------------------------------------------------------------------------
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+DRIVERS_DIR = os.path.join(PROJECT_ROOT, "drivers")
+CHROMEDRIVER_PATH = os.path.join(DRIVERS_DIR, "chromedriver-mac-x64", "chromedriver")
+
+CHROME_ARGUMENTS = [
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-images",  # Reduce rendering overhead
+    "--blink-settings=imagesEnabled=false",
+    "--disable-extensions",
+    "--disable-software-rasterizer",
+    "start-maximized",
+    "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+]
+
+PAGE_LOAD_TIMEOUT = 300
+
+
+def make_driver(chromedriver_path=CHROMEDRIVER_PATH, headless=True):
+    """Starts one Chrome instance with the scrapers' options."""
+    options = Options()
+    if headless:
+        options.add_argument("--headless")
+    for argument in CHROME_ARGUMENTS:
+        options.add_argument(argument)
+
+    driver = webdriver.Chrome(service=Service(chromedriver_path), options=options)
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    return driver
+
+# ------------------------------------------------------------------------
+# 2) Browser Pool
+# ------------------------------------------------------------------------
+
+class BrowserPool:
+    """
+    `size` Chrome instances shared by every page fetch of a scrape run.
+
+    Browsers are started on first use and kept until close() (or the end
+    of a `with` block). map() opens all of a browser's pages in their own
+    tabs at once, so they load concurrently, and then hands the tabs to
+    the page handler one at a time; with more than one browser, each
+    browser's tabs are handled in its own thread.
+    """
+
+    def __init__(self, size=1, chromedriver_path=CHROMEDRIVER_PATH, headless=True):
+        self.size = max(1, size)
+        self.chromedriver_path = chromedriver_path
+        self.headless = headless
+        self.drivers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        while len(self.drivers) < self.size:
+            self.drivers.append(make_driver(self.chromedriver_path, self.headless))
+        return self.drivers
+
+    def close(self):
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"[WARNING] Could not quit browser: {e}")
+        self.drivers = []
+
+    @staticmethod
+    def _open_tab(driver, url):
+        """Opens `url` in a new tab without waiting for it to load; returns the tab handle."""
+        before = set(driver.window_handles)
+        driver.execute_script("window.open(arguments[0], '_blank');", url)
+        (handle,) = set(driver.window_handles) - before
+        return handle
+
+    @staticmethod
+    def _run_tabs(driver, tabs, handler):
+        """Handles the already opened (handle, position, item) tabs of one browser in turn."""
+        home = driver.window_handles[0]
+        results = []
+        for handle, position, item in tabs:
+            driver.switch_to.window(handle)
+            try:
+                results.append((position, (item, handler(driver, item), None)))
+            except Exception as e:
+                results.append((position, (item, None, e)))
+            finally:
+                driver.close()
+        driver.switch_to.window(home)
+        return results
+
+    def map(self, handler, items, url=lambda item: item):
+        """
+        Calls handler(driver, item) with the browser switched to the tab
+        showing url(item), for every item.
+
+        Returns a list of (item, result, error) in the order of `items`,
+        where error is the exception the handler raised (None on success).
+        """
+        items = list(items)
+        drivers = self.start()
+
+        # Deal the items out over the browsers and open every tab up front
+        tabs = [[] for _ in drivers]
+        for position, item in enumerate(items):
+            driver_index = position % len(drivers)
+            handle = self._open_tab(drivers[driver_index], url(item))
+            tabs[driver_index].append((handle, position, item))
+
+        if len(drivers) == 1:
+            results = self._run_tabs(drivers[0], tabs[0], handler)
+        else:
+            outputs = [[] for _ in drivers]
+
+            def work(i):
+                outputs[i] = self._run_tabs(drivers[i], tabs[i], handler)
+
+            threads = [threading.Thread(target=work, args=(i,)) for i in range(len(drivers)) if tabs[i]]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            results = [result for output in outputs for result in output]
+
+        return [result for _, result in sorted(results, key=lambda pair: pair[0])]
+
+# ------------------------------------------------------------------------
+# 3) Local Fixture Server
+# ------------------------------------------------------------------------
+
+class _FixtureHandler(http.server.SimpleHTTPRequestHandler):
+    # Pages are saved without an extension (e.g. 'cpi-733') so a fixture
+    # directory mirrors the site's URL paths
+    extensions_map = {**http.server.SimpleHTTPRequestHandler.extensions_map, "": "text/html"}
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve_directory(directory):
+    """
+    Serves `directory` over HTTP on a free local port for the duration of
+    the `with` block and yields its base URL (ending in '/'). Used to run
+    the scrapers against saved fixture pages instead of the live site.
+    """
+    handler = partial(_FixtureHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,296 @@
+import os
+import sys
+import time
+import argparse
+import dataclasses
+
+import pandas as pd
+from bs4 import BeautifulSoup
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from scripts.scrap_data.browser import CHROMEDRIVER_PATH, PAGE_LOAD_TIMEOUT, BrowserPool, serve_directory
+from scripts.scrap_data.pagination import expand_history
+from scripts.utils.dates import parse_dates, dates_from_ymd
+
+# ------------------------------------------------------------------------
+# 1) Define Paths and Indicator Pages
+# ------------------------------------------------------------------------
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+RAW_DATA_DIR = os.path.join(PROJECT_ROOT, "data", "raw")
+PROCESSED_DATA_DIR = os.path.join(PROJECT_ROOT, "data", "processed")
+
+INVESTING_URL = "https://www.investing.com/economic-calendar/"
+
+
+@dataclasses.dataclass(frozen=True)
+class IndicatorPage:
+    """
+    An investing.com economic-calendar page, where its history table is
+    saved, and the refined CSV whose latest release date marks how far an
+    incremental scrape has to go back.
+    """
+    name: str
+    path: str
+    event_id: int
+    html_file: str
+    processed_file: str
+
+    @property
+    def table_id(self):
+        return f"eventHistoryTable{self.event_id}"
+
+    def url(self, base_url=INVESTING_URL):
+        return base_url + self.path
+
+
+INDICATOR_PAGES = {
+    page.name: page for page in (
+        IndicatorPage("cpi", "cpi-733", 733, "us_cpi_table.html", "us_cpi.csv"),
+        IndicatorPage("m_pmi", "manufacturing-pmi-829", 829, "m_pmi_table.html", "manufacturing_pmi.csv"),
+        IndicatorPage("s_pmi", "services-pmi-1062", 1062, "s_pmi_table.html", "services_pmi.csv"),
+        IndicatorPage("interest_rate", "interest-rate-decision-168", 168,
+                      "interest_rate_decision_table.html", "federal_interest_rate.csv"),
+        IndicatorPage("unemployment", "unemployment-rate-300", 300,
+                      "unemployment_rate_table.html", "UnemploymentRate.csv"),
+        IndicatorPage("leading_index", "us-leading-index-1968", 1968,
+                      "us_leading_index_table.html", "us_leading_index.csv"),
+    )
+}
+
+# ------------------------------------------------------------------------
+# 2) Fetching One History Table
+# ------------------------------------------------------------------------
+
+def fetch_table(driver, page, newer_than=None):
+    """
+    Expands the history table of `page` in the current tab and returns
+    the table's HTML. With `newer_than`, pagination stops once the table
+    reaches back to that release time (see pagination.expand_history).
+
+    Raises:
+        TimeoutException: If the table does not appear within PAGE_LOAD_TIMEOUT.
+    """
+    table = WebDriverWait(driver, PAGE_LOAD_TIMEOUT).until(
+        EC.presence_of_element_located((By.ID, page.table_id))
+    )
+    expand_history(driver, page.table_id, newer_than=newer_than)
+    return table.get_attribute("outerHTML")
+
+
+def save_table(page, table_html, raw_dir=RAW_DATA_DIR):
+    os.makedirs(raw_dir, exist_ok=True)
+    html_file = os.path.join(raw_dir, page.html_file)
+    with open(html_file, "w", encoding="utf-8") as file:
+        file.write(table_html)
+    return html_file
+
+# ------------------------------------------------------------------------
+# 3) Incremental Updates
+# ------------------------------------------------------------------------
+
+def latest_release_date(page, processed_dir=PROCESSED_DATA_DIR):
+    """
+    The latest release date ('YYYY-MM-DD') in the refined CSV of `page`,
+    or None if there is none. Reads the date layouts the refine scripts
+    write: a 'Date' column, a 'Release Date' column ("Dec 06, 2024 (Nov)"),
+    or Year/Month/Day columns (month as a number or a name).
+    """
+    csv_path = os.path.join(processed_dir, page.processed_file)
+    if not os.path.exists(csv_path):
+        return None
+
+    df = pd.read_csv(csv_path, dtype=str)
+    if "Date" in df.columns:
+        dates = parse_dates(df["Date"], "iso")
+    elif "Release Date" in df.columns:
+        dates = parse_dates(df["Release Date"], "release")
+    elif {"Year", "Month", "Day"} <= set(df.columns):
+        dates = dates_from_ymd(df["Year"], df["Month"], df["Day"])
+    else:
+        return None
+
+    latest = pd.Series(dates).max()
+    return None if pd.isna(latest) else latest.strftime("%Y-%m-%d")
+
+
+def _history_rows(table):
+    return table.find("tbody").find_all("tr", recursive=False)
+
+
+def merge_tables(stored_html, fetched_html, table_id):
+    """
+    Merges a partially expanded history table into the stored one.
+
+    Rows are matched by their 'id' attribute: fetched rows replace stored
+    rows with the same id (e.g. a release whose actual value arrived since)
+    and come first, followed by the stored rows the fetch did not reach.
+    Returns (merged table HTML, number of rows that were not stored yet).
+
+    Raises:
+        ValueError: If either table is missing.
+    """
+    fetched = BeautifulSoup(fetched_html, "html.parser").find("table", {"id": table_id})
+    stored = BeautifulSoup(stored_html, "html.parser").find("table", {"id": table_id})
+    if fetched is None or stored is None:
+        raise ValueError(f"Table with id '{table_id}' not found.")
+
+    fetched_body = fetched.find("tbody")
+    fetched_ids = {row.get("id") for row in _history_rows(fetched)}
+    stored_rows = _history_rows(stored)
+    stored_ids = {row.get("id") for row in stored_rows}
+
+    for row in stored_rows:
+        if row.get("id") not in fetched_ids:
+            fetched_body.append(row.extract())
+    return str(fetched), len(fetched_ids - stored_ids)
+
+# ------------------------------------------------------------------------
+# 4) Scraping Several Indicators in One Browser Session
+# ------------------------------------------------------------------------
+
+def scrape_indicators(names=None, pool=None, pool_size=1, base_url=INVESTING_URL, raw_dir=RAW_DATA_DIR,
+                      chromedriver_path=CHROMEDRIVER_PATH, incremental=False, processed_dir=PROCESSED_DATA_DIR):
+    """
+    Scrapes the history tables of the indicators in `names` (default: all
+    of INDICATOR_PAGES) into `raw_dir`.
+
+    All pages go through one BrowserPool: `pool` if given (left open, so a
+    caller can reuse it across runs), otherwise a pool of `pool_size`
+    browsers that is closed at the end. `base_url` replaces the
+    investing.com calendar URL, e.g. with the address of serve_directory.
+
+    With `incremental`, a page whose table is already saved is only
+    expanded back to the latest release date in its refined CSV (under
+    `processed_dir`), and the new rows are merged into the saved table.
+    Pages without a saved table or refined CSV are scraped in full.
+
+    Returns a dict indicator name -> error message for the pages that failed.
+    """
+    pages = [INDICATOR_PAGES[name] for name in (names or INDICATOR_PAGES)]
+
+    stop_dates = {}
+    if incremental:
+        for page in pages:
+            if os.path.exists(os.path.join(raw_dir, page.html_file)):
+                stop_dates[page.name] = latest_release_date(page, processed_dir)
+
+    def fetch(driver, page):
+        return fetch_table(driver, page, newer_than=stop_dates.get(page.name))
+
+    own_pool = pool is None
+    pool = BrowserPool(pool_size, chromedriver_path) if own_pool else pool
+
+    errors = {}
+    try:
+        started = time.perf_counter()
+        results = pool.map(fetch, pages, url=lambda page: page.url(base_url))
+        for page, table_html, error in results:
+            if error is None and stop_dates.get(page.name) is not None:
+                html_file = os.path.join(raw_dir, page.html_file)
+                try:
+                    with open(html_file, "r", encoding="utf-8") as file:
+                        table_html, added = merge_tables(file.read(), table_html, page.table_id)
+                except (OSError, ValueError) as e:
+                    error = e
+                else:
+                    print(f"{page.name}: {added} new rows since {stop_dates[page.name]}.")
+            if error is not None:
+                errors[page.name] = f"{type(error).__name__}: {error}"
+                print(f"Error: Could not scrape '{page.table_id}' for {page.name}: {errors[page.name]}")
+                continue
+            html_file = save_table(page, table_html, raw_dir)
+            print(f"Extracted {page.name} table saved to '{html_file}'.")
+        print(f"Scraped {len(pages) - len(errors)} of {len(pages)} indicator pages in {time.perf_counter() - started:.1f}s")
+    finally:
+        if own_pool:
+            pool.close()
+    return errors
+
+# ------------------------------------------------------------------------
+# 5) Local Fixtures
+# ------------------------------------------------------------------------
+# A fixture page shows the first rows of a saved history table and a
+# "Show more" link that appends the next rows after a short delay, then
+# hides itself, like the live page. Serve a fixture directory with
+# `-fixtures DIR` to run the scrapers offline.
+
+FIXTURE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{name}</title></head>
+<body>
+{table}
+<div id="showMoreHistory{event_id}"><a href="javascript:void(0);">Show more</a></div>
+<script>
+(function () {{
+  var body = document.querySelector("#{table_id} tbody");
+  var rows = Array.prototype.slice.call(body.rows);
+  rows.slice({rows_per_click}).forEach(function (row) {{ body.removeChild(row); }});
+  var next = {rows_per_click};
+  var more = document.getElementById("showMoreHistory{event_id}");
+  if (next >= rows.length) {{ more.style.display = "none"; }}
+  more.firstChild.addEventListener("click", function () {{
+    setTimeout(function () {{
+      rows.slice(next, next + {rows_per_click}).forEach(function (row) {{ body.appendChild(row); }});
+      next += {rows_per_click};
+      if (next >= rows.length) {{ more.style.display = "none"; }}
+    }}, {delay_ms});
+  }});
+}})();
+</script>
+</body></html>
+"""
+
+
+def write_fixtures(directory, raw_dir=RAW_DATA_DIR, rows_per_click=20, delay_ms=200):
+    """
+    Writes a fixture page for every indicator whose table is saved in
+    `raw_dir`, named after the page's URL path (e.g. 'cpi-733').
+    """
+    os.makedirs(directory, exist_ok=True)
+    for page in INDICATOR_PAGES.values():
+        html_file = os.path.join(raw_dir, page.html_file)
+        if not os.path.exists(html_file):
+            continue
+        with open(html_file, "r", encoding="utf-8") as file:
+            table_html = file.read()
+        with open(os.path.join(directory, page.path), "w", encoding="utf-8") as file:
+            file.write(FIXTURE_TEMPLATE.format(
+                name=page.name, table=table_html, event_id=page.event_id, table_id=page.table_id,
+                rows_per_click=rows_per_click, delay_ms=delay_ms,
+            ))
+    print(f"Fixture pages written to '{directory}'.")
+
+
+def main(names=None):
+    parser = argparse.ArgumentParser(description="Scrape investing.com indicator history tables into data/raw.")
+    parser.add_argument("-indicators", nargs="+", choices=sorted(INDICATOR_PAGES), default=names,
+                        help="Indicators to scrape (default: all)")
+    parser.add_argument("-pool", type=int, default=1, help="Number of browsers (pages are split across them)")
+    parser.add_argument("-output", default=RAW_DATA_DIR, help="Directory for the saved tables")
+    parser.add_argument("-incremental", action="store_true",
+                        help="Only fetch releases newer than data/processed and merge them into the saved tables")
+    parser.add_argument("-fixtures", default=None,
+                        help="Serve pages from this directory on a local HTTP server instead of investing.com")
+    parser.add_argument("-write-fixtures", default=None, metavar="DIR",
+                        help="Write fixture pages built from the saved tables to DIR and exit")
+    args = parser.parse_args()
+
+    errors = {}
+    if args.write_fixtures:
+        write_fixtures(args.write_fixtures, raw_dir=args.output)
+    elif args.fixtures:
+        with serve_directory(args.fixtures) as base_url:
+            errors = scrape_indicators(args.indicators, pool_size=args.pool, base_url=base_url,
+                                       raw_dir=args.output, incremental=args.incremental)
+    else:
+        errors = scrape_indicators(args.indicators, pool_size=args.pool, raw_dir=args.output,
+                                   incremental=args.incremental)
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
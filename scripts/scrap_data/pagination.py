@@ -0,0 +1,92 @@
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+# ------------------------------------------------------------------------
+# 1) Table and Button State
+# ------------------------------------------------------------------------
+# The history tables list releases newest first; every "Show more" click
+# appends the next batch of older rows to the table body. Each row carries
+# the release time in its 'event_timestamp' attribute ('YYYY-MM-DD HH:MM:SS').
+
+SHOW_MORE_XPATH = "//a[text()='Show more']"
+
+# How long to wait for a click to add rows before concluding that the
+# history is exhausted, and how often to check
+LOAD_TIMEOUT = 10
+POLL_INTERVAL = 0.05
+
+_TABLE_STATE_JS = """
+var rows = document.querySelectorAll('#' + arguments[0] + ' tbody tr');
+var last = rows.length ? rows[rows.length - 1].getAttribute('event_timestamp') : null;
+return [rows.length, last];
+"""
+
+
+def table_state(driver, table_id):
+    """(number of rows, 'event_timestamp' of the oldest loaded row) of the table."""
+    count, oldest = driver.execute_script(_TABLE_STATE_JS, table_id)
+    return count, oldest
+
+
+def visible_show_more(driver):
+    """The "Show more" link if it is currently displayed, else None."""
+    for link in driver.find_elements(By.XPATH, SHOW_MORE_XPATH):
+        try:
+            if link.is_displayed():
+                return link
+        except WebDriverException:
+            continue
+    return None
+
+# ------------------------------------------------------------------------
+# 2) Pagination
+# ------------------------------------------------------------------------
+
+def expand_history(driver, table_id, newer_than=None, timeout=LOAD_TIMEOUT, poll_interval=POLL_INTERVAL,
+                   max_clicks=None):
+    """
+    Clicks "Show more" until the table's history is fully loaded.
+
+    After each click it waits until the table's row count grows (checked
+    every `poll_interval` seconds), not a fixed delay, and it stops as soon
+    as the link is hidden, a click adds no rows within `timeout` seconds,
+    or `max_clicks` is reached.
+
+    With `newer_than` (a timestamp string or Timestamp-like) it also stops
+    once the oldest loaded row was released at or before that time, i.e.
+    the table already reaches back to rows that are stored locally.
+
+    Returns (clicks, rows loaded).
+    """
+    # Compared as strings: a date-only `newer_than` matches the whole day
+    newer_than = None if newer_than is None else str(newer_than)[:19]
+    count, oldest = table_state(driver, table_id)
+    clicks = 0
+    started = time.perf_counter()
+
+    while max_clicks is None or clicks < max_clicks:
+        if newer_than is not None and oldest is not None and oldest[:len(newer_than)] <= newer_than:
+            break
+        show_more_button = visible_show_more(driver)
+        if show_more_button is None:
+            break
+
+        driver.execute_script("arguments[0].scrollIntoView();", show_more_button)
+        driver.execute_script("arguments[0].click();", show_more_button)
+        clicks += 1
+
+        before = count
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=poll_interval).until(
+                lambda d: table_state(d, table_id)[0] > before
+            )
+        except TimeoutException:
+            # The link is still shown but nothing more arrives
+            break
+        count, oldest = table_state(driver, table_id)
+
+    print(f"'{table_id}': {count} rows after {clicks} 'Show more' clicks ({time.perf_counter() - started:.1f}s).")
+    return clicks, count
@@ -0,0 +1,179 @@
+import os
+import json
+import zlib
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from scripts.utils.dates import ISO_FORMAT, parse_dates
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+# Directory containing the raw per-ticker CSVs
+RAW_DATA_DIR = os.path.join(PROJECT_ROOT, "data", "stock_data")
+
+# Sidecar with one small record per ticker CSV. Hidden, so directory
+# listings of *.csv and the build manifest ignore it.
+INDEX_FILE_NAME = ".coverage.json"
+
+# ------------------------------------------------------------------------
+# 1) Per-Ticker Records
+# ------------------------------------------------------------------------
+# A record holds the ticker's date range ("min_date", "max_date" as
+# 'YYYY-MM-DD'), "rows", the CRC32 "checksum" of the file bytes, the
+# file's "size" and "mtime_ns" when the record was made (to detect edits
+# from outside the downloader), and "last_update" (UTC, ISO 8601).
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def file_crc32(path, chunk_size=1 << 20, crc=0):
+    """CRC32 of a file's bytes (continuing from `crc`)."""
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def scan_csv(csv_path):
+    """Builds the record of a ticker CSV by reading its 'Date' column and bytes."""
+    stat = os.stat(csv_path)
+    column = pd.read_csv(csv_path, usecols=["Date"], dtype={"Date": str})["Date"]
+    dates = pd.Series(parse_dates(column, "iso")).dropna()
+    return {
+        "min_date": dates.min().strftime(ISO_FORMAT) if len(dates) else None,
+        "max_date": dates.max().strftime(ISO_FORMAT) if len(dates) else None,
+        "rows": int(len(column)),
+        "checksum": file_crc32(csv_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "last_update": _now(),
+    }
+
+# ------------------------------------------------------------------------
+# 2) Coverage Index
+# ------------------------------------------------------------------------
+
+class CoverageIndex:
+    """
+    Date coverage of every ticker CSV in `data_dir`, kept in
+    '<data_dir>/.coverage.json', so that planning a refresh needs a stat
+    call per ticker instead of parsing every file. A record whose file
+    size or mtime no longer matches is rebuilt from the file.
+    """
+
+    def __init__(self, data_dir=RAW_DATA_DIR):
+        self.data_dir = data_dir
+        self.path = os.path.join(data_dir, INDEX_FILE_NAME)
+        self.records = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.records = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[WARNING] Ignoring unreadable coverage index {self.path}: {e}")
+
+    def save(self):
+        os.makedirs(self.data_dir, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.records, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def csv_path(self, ticker):
+        return os.path.join(self.data_dir, f"{ticker}.csv")
+
+    def get(self, ticker):
+        """
+        Returns the up-to-date record of `ticker`, or None if the ticker has
+        no CSV. The file is only read when it changed since it was indexed.
+        """
+        try:
+            stat = os.stat(self.csv_path(ticker))
+        except FileNotFoundError:
+            self.records.pop(ticker, None)
+            return None
+
+        record = self.records.get(ticker)
+        if record is None or record.get("size") != stat.st_size or record.get("mtime_ns") != stat.st_mtime_ns:
+            record = self.records[ticker] = scan_csv(self.csv_path(ticker))
+        return record
+
+    def date_range(self, ticker):
+        """(min date, max date) as Timestamps, or None if nothing is stored."""
+        record = self.get(ticker)
+        if record is None or record["rows"] == 0:
+            return None
+        return pd.Timestamp(record["min_date"]), pd.Timestamp(record["max_date"])
+
+    def record_rewrite(self, ticker, min_date, max_date, rows):
+        """Records a ticker file that was just written in full."""
+        csv_path = self.csv_path(ticker)
+        stat = os.stat(csv_path)
+        self.records[ticker] = {
+            "min_date": pd.Timestamp(min_date).strftime(ISO_FORMAT),
+            "max_date": pd.Timestamp(max_date).strftime(ISO_FORMAT),
+            "rows": int(rows),
+            "checksum": file_crc32(csv_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "last_update": _now(),
+        }
+
+    def record_append(self, ticker, appended, max_date, rows):
+        """
+        Records `rows` rows (`appended` bytes, ending at `max_date`) that
+        were just appended to a file whose record was up to date. The
+        checksum is extended over the new bytes only.
+        """
+        record = self.records[ticker]
+        stat = os.stat(self.csv_path(ticker))
+        record.update({
+            "max_date": pd.Timestamp(max_date).strftime(ISO_FORMAT),
+            "rows": record["rows"] + int(rows),
+            "checksum": zlib.crc32(appended, record["checksum"]),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "last_update": _now(),
+        })
+
+    def sync(self, tickers=None):
+        """
+        Brings the records of `tickers` (default: every CSV in the
+        directory) up to date and drops records of deleted files.
+        Returns the tickers whose records had to be rebuilt.
+        """
+        if tickers is None:
+            tickers = sorted(
+                os.path.splitext(name)[0] for name in os.listdir(self.data_dir) if name.endswith(".csv")
+            )
+            for ticker in set(self.records) - set(tickers):
+                del self.records[ticker]
+
+        rebuilt = []
+        for ticker in tickers:
+            before = self.records.get(ticker)
+            record = self.get(ticker)
+            if record is not None and record is not before:
+                rebuilt.append(ticker)
+        return rebuilt
+
+    def verify(self, ticker):
+        """True if the ticker file's bytes still match the recorded checksum."""
+        record = self.records.get(ticker)
+        return record is not None and file_crc32(self.csv_path(ticker)) == record["checksum"]
+
+
+def refresh_index(data_dir=RAW_DATA_DIR):
+    """
+    Syncs and saves the coverage index of `data_dir`. Called by the
+    formatters after they read the ticker CSVs, so edits made outside the
+    downloader are picked up. Returns the tickers whose records changed.
+    """
+    index = CoverageIndex(data_dir)
+    rebuilt = index.sync()
+    index.save()
+    if rebuilt:
+        print(f"Coverage index: re-indexed {len(rebuilt)} changed ticker files.")
+    return rebuilt
@@ -0,0 +1,150 @@
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+# ------------------------------------------------------------------------
+# 1) Data Sources
+# ------------------------------------------------------------------------
+# A data source has one method, fetch(tickers, start, end), returning a dict
+# ticker -> DataFrame with a datetime 'Date' column plus the OHLCV columns
+# for dates in [start, end). Tickers without data are left out.
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+
+class YFinanceSource:
+    """Downloads daily OHLCV from Yahoo Finance, many tickers per request."""
+
+    def fetch(self, tickers, start, end):
+        import yfinance as yf
+
+        raw = yf.download(
+            list(tickers), start=start, end=end,
+            group_by="ticker", auto_adjust=False, threads=False, progress=False,
+        )
+        if raw.empty:
+            return {}
+
+        frames = {}
+        for ticker in tickers:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if ticker not in raw.columns.get_level_values(0):
+                    continue
+                df = raw[ticker]
+            else:
+                # A single-ticker request comes back with flat columns
+                df = raw
+            df = df.dropna(how="all")
+            if df.empty:
+                continue
+            df = df.reset_index()
+            df["Date"] = pd.to_datetime(df["Date"])
+            frames[ticker] = df[["Date"] + [col for col in PRICE_COLUMNS if col in df.columns]]
+        return frames
+
+
+class LocalCsvSource:
+    """
+    Serves '<ticker>.csv' files from a local directory (e.g. a copy of
+    data/stock_data) as if they were downloaded. Stands in for yfinance
+    when testing the downloader offline; `latency` (seconds) simulates the
+    round trip of one request.
+    """
+
+    def __init__(self, directory, latency=0.0):
+        self.directory = directory
+        self.latency = latency
+
+    def fetch(self, tickers, start, end):
+        if self.latency:
+            time.sleep(self.latency)
+        frames = {}
+        for ticker in tickers:
+            csv_path = os.path.join(self.directory, f"{ticker}.csv")
+            if not os.path.exists(csv_path):
+                continue
+            df = pd.read_csv(csv_path, float_precision="round_trip")
+            df["Date"] = pd.to_datetime(df["Date"])
+            df = df[(df["Date"] >= pd.Timestamp(start)) & (df["Date"] < pd.Timestamp(end))]
+            if not df.empty:
+                frames[ticker] = df.reset_index(drop=True)
+        return frames
+
+# ------------------------------------------------------------------------
+# 2) Rate Limiting and Retries
+# ------------------------------------------------------------------------
+
+class RateLimiter:
+    """Spaces request starts at least 1 / `rate` seconds apart across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def fetch_with_retry(source, tickers, start, end, limiter=None, retries=3, backoff=1.0):
+    """
+    Calls source.fetch, retrying up to `retries` times on error with
+    exponential backoff (backoff, 2 * backoff, ... seconds, plus jitter).
+    The last error is re-raised.
+    """
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return source.fetch(tickers, start, end)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random() * 0.1))
+
+# ------------------------------------------------------------------------
+# 3) Batched Concurrent Fetching
+# ------------------------------------------------------------------------
+
+def make_batches(windows, batch_size):
+    """
+    Turns a dict (start, end) -> tickers into (start, end, tickers) requests
+    of at most `batch_size` tickers each.
+    """
+    batches = []
+    for (start, end), tickers in sorted(windows.items()):
+        for i in range(0, len(tickers), batch_size):
+            batches.append((start, end, tickers[i:i + batch_size]))
+    return batches
+
+
+def run_batches(batches, source, workers=4, rate=2.0, retries=3, backoff=1.0):
+    """
+    Fetches every (start, end, tickers) batch with at most `workers`
+    requests in flight and at most `rate` request starts per second.
+
+    Yields (start, end, tickers, frames, error) as batches complete, where
+    frames is the source's dict (None on failure) and error the exception
+    that remained after all retries (None on success).
+    """
+    limiter = RateLimiter(rate)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(fetch_with_retry, source, tickers, start, end, limiter, retries, backoff): (start, end, tickers)
+            for start, end, tickers in batches
+        }
+        for future in as_completed(futures):
+            start, end, tickers = futures[future]
+            try:
+                yield start, end, tickers, future.result(), None
+            except Exception as e:
+                yield start, end, tickers, None, e
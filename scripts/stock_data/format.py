@@ -1,5 +1,8 @@
 import os
-import pandas as pd
+
+from scripts.stock_data.coverage import refresh_index
+from scripts.stock_data.loader import load_stock_data, report_errors
+from scripts.stock_data.panel import PANEL_DIR, open_panel
 
 # ------------------------------------------------------------------------
 # 1) Define Paths
@@ -39,63 +42,18 @@ def load_tickers(ticker_file):
     return tickers
 
 # ------------------------------------------------------------------------
-# 3) Format CSV Function
-# ------------------------------------------------------------------------
-
-def format_csv(ticker, raw_dir, processed_dir):
-    """
-    Reads a CSV file for a given ticker, converts the 'Date' column to pd.DateTime,
-    and saves the formatted DataFrame to the processed directory.
-    """
-    raw_csv_path = os.path.join(raw_dir, f"{ticker}.csv")
-    
-    if not os.path.exists(raw_csv_path):
-        print(f"Warning: CSV for ticker '{ticker}' not found at {raw_csv_path}. Skipping.")
-        return None
-    
-    try:
-        # Read the CSV into a DataFrame
-        df = pd.read_csv(raw_csv_path)
-        
-        # Check if 'Date' column exists
-        if "Date" not in df.columns:
-            raise ValueError(f"'Date' column not found in {raw_csv_path}.")
-        
-        # Convert 'Date' to datetime
-        df["Date"] = pd.to_datetime(df["Date"], errors='coerce')
-        
-        # Handle rows where 'Date' conversion failed
-        if df["Date"].isnull().any():
-            num_invalid = df["Date"].isnull().sum()
-            print(f"Warning: {num_invalid} invalid dates found in {raw_csv_path}. These rows will be dropped.")
-            df = df.dropna(subset=["Date"])
-        
-        # Optional: Sort by Date
-        df = df.sort_values("Date")
-        
-        # Optional: Reset index
-        df = df.reset_index(drop=True)
-        
-        # Save the formatted DataFrame to the processed directory
-        processed_csv_path = os.path.join(processed_dir, f"{ticker}.csv")
-        df.to_csv(processed_csv_path, index=False)
-        
-        print(f"Formatted and saved: {processed_csv_path}")
-        return df  # Optionally return the DataFrame if needed elsewhere
-    
-    except Exception as e:
-        print(f"Error processing {raw_csv_path}: {e}")
-        return None
-
-# ------------------------------------------------------------------------
-# 4) Main Formatting Process
+# 3) Main Formatting Process
 # ------------------------------------------------------------------------
 
-def get_formatted_data():
+def get_formatted_data(workers=None):
     """
     Reads all tickers from tickers.txt, formats their CSVs,
     saves the formatted CSVs, and returns a dictionary of DataFrames
     keyed by ticker symbol.
+
+    The CSVs are parsed and saved concurrently by `workers` threads
+    (default: one per CPU); files that fail are listed in one
+    summary at the end.
     """
     # Load all tickers
     try:
@@ -105,20 +63,40 @@ def get_formatted_data():
         print(f"Error loading tickers: {e}")
         return {}
     
-    # Initialize dictionary to hold DataFrames
-    data = {}
-    
-    # Iterate through each ticker and format its CSV
-    for ticker in tickers:
-        df = format_csv(ticker, RAW_DATA_DIR, PROCESSED_DATA_DIR)
-        if df is not None:
-            data[ticker] = df
+    # Format every ticker's CSV in parallel
+    data, errors = load_stock_data(tickers, RAW_DATA_DIR, workers=workers, save_dir=PROCESSED_DATA_DIR)
+    report_errors(errors, len(tickers))
+
+    # Keep the coverage index of the raw CSVs in sync
+    refresh_index(RAW_DATA_DIR)
     
     print("All tickers have been processed.")
     return data
 
+def get_panel_data(tickers=None, start=None, end=None, panel_dir=PANEL_DIR):
+    """
+    Same dictionary as get_formatted_data, but read from the memory-mapped
+    price panel (see panel.py): each DataFrame's values are a view of the
+    panel, so nothing is parsed or copied. Dates on which a ticker has no
+    row are NaN. `tickers` defaults to every ticker in the panel.
+    """
+    panel = open_panel(panel_dir)
+    if tickers is None:
+        tickers = panel.tickers
+
+    data = {}
+    missing = []
+    for ticker in tickers:
+        if ticker in panel.ticker_index:
+            data[ticker] = panel.ticker_frame(ticker, start, end)
+        else:
+            missing.append(ticker)
+    if missing:
+        print(f"Warning: {len(missing)} tickers are not in the panel: {', '.join(missing)}")
+    return data
+
 # ------------------------------------------------------------------------
-# 5) Execute the Script (Optional)
+# 4) Execute the Script (Optional)
 # ------------------------------------------------------------------------
 
 if __name__ == "__main__":
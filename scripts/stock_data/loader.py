@@ -0,0 +1,202 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------
+# 1) Define Paths and Schema
+# ------------------------------------------------------------------------
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+# Directory containing the raw per-ticker CSVs
+RAW_DATA_DIR = os.path.join(PROJECT_ROOT, "data", "stock_data")
+
+DATE_FORMAT = "%Y-%m-%d"
+
+# Column types of the per-ticker CSVs written by macro.py. Volume is a
+# nullable integer so that a missing value does not fail the whole file.
+STOCK_DTYPES = {
+    "Date": str,
+    "Open": "float64",
+    "High": "float64",
+    "Low": "float64",
+    "Close": "float64",
+    "Adj Close": "float64",
+    "Volume": "Int64",
+}
+
+# ------------------------------------------------------------------------
+# 2) Single File
+# ------------------------------------------------------------------------
+
+def read_stock_csv(csv_path, columns=None, dtype=None):
+    """
+    Reads one ticker CSV with explicit dtypes, parses 'Date' with a fixed
+    format, drops rows with an invalid date and sorts by date.
+
+    Parameters:
+        csv_path (str): Path to the ticker CSV.
+        columns (list of str, optional): Columns to read besides 'Date'.
+            Default: all columns.
+        dtype (str, optional): Overrides the dtype of the price columns
+            (e.g. "float32"); Volume stays Int64.
+
+    Returns:
+        pd.DataFrame: The parsed rows with a datetime64 'Date' column.
+
+    Raises:
+        ValueError: If the file has no 'Date' column.
+    """
+    usecols = None if columns is None else ["Date"] + [col for col in columns if col != "Date"]
+    dtypes = dict(STOCK_DTYPES)
+    if dtype is not None:
+        dtypes.update({col: dtype for col in dtypes if col not in ("Date", "Volume")})
+
+    df = pd.read_csv(csv_path, usecols=usecols, dtype=dtypes)
+    if "Date" not in df.columns:
+        raise ValueError(f"'Date' column not found in {csv_path}.")
+
+    df["Date"] = pd.to_datetime(df["Date"], format=DATE_FORMAT, errors="coerce")
+    if df["Date"].isnull().any():
+        df = df.dropna(subset=["Date"])
+
+    dates = df["Date"].to_numpy()
+    if len(dates) > 1 and not (dates[1:] >= dates[:-1]).all():
+        df = df.sort_values("Date", kind="mergesort")
+    return df.reset_index(drop=True)
+
+
+def _load_one(ticker, input_dir, columns, dtype, save_dir, start, end, store_dir):
+    """Pool task: returns (ticker, frame, error message)."""
+    csv_path = os.path.join(input_dir, f"{ticker}.csv")
+    try:
+        if store_dir is not None:
+            # pyarrow is only needed when reading from the columnar store
+            from scripts.stock_data.store import read_ticker
+            df = read_ticker(ticker, columns, start, end, store_dir)
+            if dtype is not None:
+                casts = {
+                    col: dtype for col in df.columns
+                    if col not in ("Date", "Volume") and df[col].dtype != dtype
+                }
+                if casts:
+                    df = df.astype(casts)
+        else:
+            df = read_stock_csv(csv_path, columns, dtype)
+            if start is not None or end is not None:
+                dates = df["Date"]
+                keep = pd.Series(True, index=df.index)
+                if start is not None:
+                    keep &= dates >= pd.Timestamp(start)
+                if end is not None:
+                    keep &= dates <= pd.Timestamp(end)
+                df = df[keep].reset_index(drop=True)
+        if save_dir is not None:
+            df.to_csv(os.path.join(save_dir, f"{ticker}.csv"), index=False)
+        return ticker, df, None
+    except FileNotFoundError as e:
+        return ticker, None, f"Not found: {e.filename or csv_path}"
+    except (OSError, ValueError) as e:
+        return ticker, None, str(e)
+
+# ------------------------------------------------------------------------
+# 3) Whole Universe
+# ------------------------------------------------------------------------
+
+def available_cpus():
+    """Number of CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def list_tickers(input_dir=RAW_DATA_DIR, extension=".csv"):
+    """Returns the sorted tickers that have a `extension` file in `input_dir`."""
+    return sorted(
+        os.path.splitext(file_name)[0] for file_name in os.listdir(input_dir)
+        if file_name.endswith(extension)
+    )
+
+
+def load_stock_data(tickers=None, input_dir=RAW_DATA_DIR, columns=None, dtype=None,
+                    workers=None, use_processes=False, save_dir=None,
+                    start=None, end=None, store_dir=None):
+    """
+    Reads the CSVs of `tickers` (default: every CSV in `input_dir`)
+    concurrently.
+
+    Parameters:
+        columns, dtype: Passed to read_stock_csv for every file.
+        start, end (date-like, optional): Keep only rows in [start, end].
+        store_dir (str, optional): Read from this Parquet store (see
+            store.py) instead of the CSVs; columns and dates are then
+            pushed down to the reader.
+        workers (int, optional): Size of the pool. Default: one per CPU;
+            1 reads the files sequentially in this process.
+        use_processes (bool): Use a process pool instead of a thread pool.
+        save_dir (str, optional): If given, each parsed frame is also saved
+            there as '<ticker>.csv' by the worker that read it.
+
+    Returns:
+        (dict, dict): ticker -> DataFrame in `tickers` order, and
+        ticker -> error message for the files that could not be loaded.
+    """
+    if tickers is None:
+        tickers = list_tickers(input_dir) if store_dir is None else list_tickers(store_dir, ".parquet")
+    else:
+        tickers = list(tickers)
+    if save_dir is not None:
+        os.makedirs(save_dir, exist_ok=True)
+
+    args = (input_dir, columns, dtype, save_dir, start, end, store_dir)
+    workers = workers or available_cpus()
+    if workers == 1:
+        outcomes = [_load_one(ticker, *args) for ticker in tickers]
+    else:
+        pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with pool_class(max_workers=workers) as pool:
+            futures = [pool.submit(_load_one, ticker, *args) for ticker in tickers]
+            outcomes = [future.result() for future in futures]
+
+    data, errors = {}, {}
+    for ticker, df, error in outcomes:
+        if error is None:
+            data[ticker] = df
+        else:
+            errors[ticker] = error
+    return data, errors
+
+
+def report_errors(errors, total):
+    """Prints one summary of the files load_stock_data could not read."""
+    if not errors:
+        print(f"Loaded all {total} ticker files.")
+        return
+    print(f"Warning: {len(errors)} of {total} ticker files could not be loaded:")
+    for ticker, error in errors.items():
+        print(f"  {ticker}: {error}")
+
+
+def to_panel(data, columns=("Close",), dtype="float64"):
+    """
+    Aligns loaded frames on the union of their dates.
+
+    Returns:
+        (pd.DatetimeIndex, list, np.ndarray): dates, tickers and a
+        (dates x tickers x columns) array, NaN where a ticker has no row.
+    """
+    tickers = list(data)
+    if tickers:
+        dates = np.unique(np.concatenate([data[ticker]["Date"].to_numpy(dtype="datetime64[ns]") for ticker in tickers]))
+    else:
+        dates = np.array([], dtype="datetime64[ns]")
+
+    panel = np.full((len(dates), len(tickers), len(columns)), np.nan, dtype=dtype)
+    for j, ticker in enumerate(tickers):
+        df = data[ticker]
+        rows = np.searchsorted(dates, df["Date"].to_numpy(dtype="datetime64[ns]"))
+        for k, col in enumerate(columns):
+            panel[rows, j, k] = df[col].to_numpy(dtype=dtype, na_value=np.nan)
+    return pd.DatetimeIndex(dates, name="Date"), tickers, panel
@@ -1,123 +1,240 @@
 import os
+import sys
+import time
+import argparse
 import pandas as pd
-import yfinance as yf
+
+from scripts.stock_data.coverage import CoverageIndex
+from scripts.stock_data.downloader import YFinanceSource, LocalCsvSource, fetch_with_retry, make_batches, run_batches
+
+# Dynamically find the project root, assuming this script is in:
+# StockGraphPrediction/scripts/ or somewhere under the repo
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))  # adjust ".." as needed
+
+# Path to tickers.txt in StockGraphPrediction/data/stock_data/
+ticker_file = os.path.join(PROJECT_ROOT, "tickers.txt")
+
+# Path to data/stock_data for output
+output_dir = os.path.join(PROJECT_ROOT, "data", "stock_data")
+
+# Define date range
+start_date = "2020-01-01"
+end_date   = "2024-12-15"
 
 # ------------------------------------------------------------------------
-# 1) The incremental download function (enhanced to handle both earlier and newer data)
+# 1) Planning: which date windows does a ticker still need?
 # ------------------------------------------------------------------------
-def incremental_download(ticker, output_dir, start_date, end_date):
+
+def missing_windows(existing_range, start_date, end_date):
     """
-    Incrementally download data for a single ticker from yfinance.
-    If a CSV for this ticker already exists, fetch new data from the last date
-    and/or earlier data if start_date has been moved back.
+    Returns the (start, end) windows to download so that the data covers
+    [start_date, end_date): the full range if nothing is stored yet,
+    otherwise the earlier and/or newer part that is missing.
     """
+    if existing_range is None:
+        return [(start_date, end_date)]
+
+    min_existing_date, max_existing_date = existing_range
+    windows = []
+    # Check if we need to download earlier data (window ends are exclusive)
+    if pd.to_datetime(start_date) < min_existing_date:
+        windows.append((start_date, min_existing_date.strftime('%Y-%m-%d')))
+    # Check if we need to download newer data (the window [next day, end_date) may be empty)
+    next_date = max_existing_date + pd.Timedelta(days=1)
+    if pd.to_datetime(end_date) > next_date:
+        windows.append((next_date.strftime('%Y-%m-%d'), end_date))
+    return windows
+
+# ------------------------------------------------------------------------
+# 2) Saving downloaded rows
+# ------------------------------------------------------------------------
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def save_new_rows(ticker, output_dir, new_data, index):
+    """
+    Stores the downloaded frames in `new_data` in '<ticker>.csv' and
+    updates the ticker's record in the CoverageIndex `index`.
+
+    When every new row is strictly after the last stored date (the daily
+    refresh case), the rows are appended to the file without reading its
+    history. Otherwise (backfill, overlap, or no file yet) the file is
+    rewritten with duplicate dates dropped and rows sorted by date.
+    Returns the number of downloaded rows.
+    """
+    new_data = [df for df in new_data if df is not None and not df.empty]
+    if not new_data:
+        return 0
+
+    new_df = pd.concat(new_data, ignore_index=True)
+    new_df["Date"] = pd.to_datetime(new_df["Date"])
+    new_df = new_df.drop_duplicates(subset=["Date"], keep="last").sort_values("Date")
+
     csv_path = os.path.join(output_dir, f"{ticker}.csv")
+    stored = index.date_range(ticker)
+
+    if stored is not None and new_df["Date"].min() > stored[1]:
+        # Append path: only the header is read, to keep the column order
+        header = pd.read_csv(csv_path, nrows=0).columns
+        appended = new_df.reindex(columns=header).to_csv(header=False, index=False, date_format="%Y-%m-%d")
+        appended = ("" if _ends_with_newline(csv_path) else "\n") + appended
+        appended = appended.encode("utf-8")
+        with open(csv_path, "ab") as f:
+            f.write(appended)
+        index.record_append(ticker, appended, new_df["Date"].max(), len(new_df))
+        return len(new_df)
 
     if os.path.exists(csv_path):
-        # Load existing data
-        existing_df = pd.read_csv(csv_path)
+        # Backfill: load existing data and rewrite the whole file
+        existing_df = pd.read_csv(csv_path, float_precision="round_trip")
+        existing_df["Date"] = pd.to_datetime(existing_df["Date"])
+        combined_df = pd.concat([existing_df, new_df], ignore_index=True)
+    else:
+        combined_df = new_df
 
-        # Ensure 'Date' is datetime
-        if "Date" in existing_df.columns:
-            existing_df["Date"] = pd.to_datetime(existing_df["Date"])
-        else:
-            raise ValueError(f"Existing CSV for {ticker} has unexpected format (no 'Date' column).")
-
-        min_existing_date = existing_df["Date"].min()
-        max_existing_date = existing_df["Date"].max()
-
-        # Initialize list to hold new data chunks
-        new_data = []
-
-        # Check if we need to download earlier data
-        if pd.to_datetime(start_date) < min_existing_date:
-            download_start_earlier = start_date
-            download_end_earlier = (min_existing_date - pd.Timedelta(days=1)).strftime('%Y-%m-%d')
-            print(f"{ticker}: Downloading earlier data from {download_start_earlier} to {download_end_earlier}...")
-            df_earlier = yf.download(ticker, start=download_start_earlier, end=download_end_earlier)
-            if not df_earlier.empty:
-                df_earlier.reset_index(inplace=True)
-                df_earlier["Date"] = pd.to_datetime(df_earlier["Date"])
-                new_data.append(df_earlier)
-            else:
-                print(f"{ticker}: No earlier data returned by yfinance.")
-
-        # Check if we need to download newer data
-        if pd.to_datetime(end_date) > max_existing_date:
-            download_start_newer = (max_existing_date + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
-            download_end_newer = end_date
-            print(f"{ticker}: Downloading newer data from {download_start_newer} to {download_end_newer}...")
-            df_newer = yf.download(ticker, start=download_start_newer, end=download_end_newer)
-            if not df_newer.empty:
-                df_newer.reset_index(inplace=True)
-                df_newer["Date"] = pd.to_datetime(df_newer["Date"])
-                new_data.append(df_newer)
-            else:
-                print(f"{ticker}: No newer data returned by yfinance.")
-
-        # If there's new data, merge it with existing data
-        if new_data:
-            combined_df = existing_df.copy()
-
-            for df in new_data:
-                if df["Date"].min() < combined_df["Date"].min():
-                    # Prepend earlier data
-                    combined_df = pd.concat([df, combined_df], ignore_index=True)
-                else:
-                    # Append newer data
-                    combined_df = pd.concat([combined_df, df], ignore_index=True)
-
-            # Remove duplicate dates
-            combined_df.drop_duplicates(subset=["Date"], keep="last", inplace=True)
-
-            # Sort by Date
-            combined_df.sort_values("Date", inplace=True)
-
-            # Save updated data
-            combined_df.to_csv(csv_path, index=False)
-            total_new_rows = sum(len(df) for df in new_data)
-            print(f"{ticker}: CSV updated with {total_new_rows} new rows.")
+    # Remove duplicate dates
+    combined_df.drop_duplicates(subset=["Date"], keep="last", inplace=True)
+
+    # Sort by Date
+    combined_df.sort_values("Date", inplace=True)
+
+    # Save updated data
+    combined_df.to_csv(csv_path, index=False, date_format="%Y-%m-%d")
+    index.record_rewrite(ticker, combined_df["Date"].min(), combined_df["Date"].max(), len(combined_df))
+    return len(new_df)
+
+# ------------------------------------------------------------------------
+# 3) The incremental download function (handles both earlier and newer data)
+# ------------------------------------------------------------------------
+
+def incremental_download(ticker, output_dir, start_date, end_date, source=None, index=None):
+    """
+    Incrementally download data for a single ticker (from yfinance unless
+    another `source` is given). If a CSV for this ticker already exists,
+    fetch new data from the last date and/or earlier data if start_date has
+    been moved back. `index` is the CoverageIndex of `output_dir`; when not
+    given, one is opened and saved here.
+    """
+    source = source or YFinanceSource()
+    own_index = index is None
+    index = CoverageIndex(output_dir) if own_index else index
+
+    new_data = []
+    for window_start, window_end in missing_windows(index.date_range(ticker), start_date, end_date):
+        print(f"{ticker}: Downloading data from {window_start} to {window_end}...")
+        frames = fetch_with_retry(source, [ticker], window_start, window_end)
+        if ticker in frames:
+            new_data.append(frames[ticker])
         else:
-            print(f"{ticker}: No new data to download.")
+            print(f"{ticker}: No data returned for {window_start} to {window_end}.")
 
+    total_new_rows = save_new_rows(ticker, output_dir, new_data, index)
+    if own_index:
+        index.save()
+    if total_new_rows:
+        print(f"{ticker}: CSV updated with {total_new_rows} new rows.")
     else:
-        # No existing CSV -> fetch full data
-        print(f"{ticker}: No existing CSV found. Downloading full history from {start_date} to {end_date}...")
-        df = yf.download(ticker, start=start_date, end=end_date)
-        if df.empty:
-            print(f"{ticker}: No data returned by yfinance.")
-            return
-
-        df.reset_index(inplace=True)
-        df["Date"] = pd.to_datetime(df["Date"])
-        df.to_csv(csv_path, index=False)
-        print(f"{ticker}: CSV created with full history.")
+        print(f"{ticker}: No new data to download.")
 
 # ------------------------------------------------------------------------
-# 2) Top-level code that reads tickers.txt and downloads them
+# 4) Batched, concurrent download of the whole ticker list
 # ------------------------------------------------------------------------
 
-# Dynamically find the project root, assuming this script is in:
-# StockGraphPrediction/scripts/ or somewhere under the repo
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))  # adjust ".." as needed
-
-# Path to tickers.txt in StockGraphPrediction/data/stock_data/
-ticker_file = os.path.join(PROJECT_ROOT, "tickers.txt")
+def download_universe(tickers, output_dir, start_date, end_date, source=None,
+                      workers=4, batch_size=50, rate=2.0, retries=3, backoff=1.0):
+    """
+    Brings every ticker's CSV up to [start_date, end_date).
 
-# Path to data/stock_data for output
-output_dir = os.path.join(PROJECT_ROOT, "data", "stock_data")
-os.makedirs(output_dir, exist_ok=True)
+    Tickers missing the same date window are fetched together in
+    multi-ticker requests of up to `batch_size` tickers; at most `workers`
+    requests run at once, at most `rate` start per second, and failed
+    requests are retried with exponential backoff. Results are written as
+    batches complete (from this thread only, so a ticker's file is never
+    written concurrently).
 
-# Read all tickers from tickers.txt
-with open(ticker_file, "r", encoding="utf-8") as f:
-    lines = f.readlines()
-tickers = [line.strip() for line in lines if line.strip()]
+    Returns a dict ticker -> error message for tickers that failed.
+    """
+    source = source or YFinanceSource()
+    os.makedirs(output_dir, exist_ok=True)
+    index = CoverageIndex(output_dir)
+
+    # Plan from the coverage index: one stat call per ticker, and a file is
+    # only parsed if it changed since it was last indexed
+    windows, errors = {}, {}
+    for ticker in tickers:
+        try:
+            existing = index.date_range(ticker)
+        except ValueError as e:
+            errors[ticker] = f"Existing CSV has unexpected format: {e}"
+            continue
+        for window in missing_windows(existing, start_date, end_date):
+            windows.setdefault(window, []).append(ticker)
+
+    batches = make_batches(windows, batch_size)
+    print(f"Fetching {sum(len(b[2]) for b in batches)} ticker windows in {len(batches)} requests...")
+
+    updated = 0
+    for window_start, window_end, batch, frames, error in run_batches(batches, source, workers, rate, retries, backoff):
+        if error is not None:
+            for ticker in batch:
+                errors[ticker] = f"{window_start} to {window_end}: {error}"
+            continue
+        for ticker in batch:
+            if save_new_rows(ticker, output_dir, [frames.get(ticker)], index):
+                updated += 1
+    index.save()
+
+    print(f"Updated {updated} ticker windows; {len(errors)} tickers failed.")
+    for ticker, error in errors.items():
+        print(f"  {ticker}: {error}")
+    return errors
 
-# Define date range
-start_date = "2020-01-01"
-end_date   = "2024-12-15"
+# ------------------------------------------------------------------------
+# 5) Top-level code that reads tickers.txt and downloads them
+# ------------------------------------------------------------------------
 
-# Download incrementally for each ticker
-for tkr in tickers:
-    incremental_download(tkr, output_dir, start_date, end_date)
+def read_tickers(ticker_file):
+    """Reads ticker symbols (one per line) from a text file."""
+    with open(ticker_file, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    return [line.strip() for line in lines if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally download the tickers in tickers.txt.")
+    parser.add_argument("-start", default=start_date, help="First date to cover (YYYY-MM-DD)")
+    parser.add_argument("-end", default=end_date, help="Day after the last date to cover (YYYY-MM-DD)")
+    parser.add_argument("-workers", type=int, default=4, help="Concurrent requests")
+    parser.add_argument("-batch", type=int, default=50, help="Tickers per request")
+    parser.add_argument("-rate", type=float, default=2.0, help="Max requests started per second")
+    parser.add_argument("-retries", type=int, default=3, help="Retries per failed request")
+    parser.add_argument("-source", default=None,
+                        help="Serve data from this directory of CSVs instead of yfinance (offline testing)")
+    parser.add_argument("-graph", action="store_true",
+                        help="Add the new trading days to the maintained stock graph after downloading")
+    args = parser.parse_args()
+
+    source = LocalCsvSource(args.source) if args.source else YFinanceSource()
+    started = time.perf_counter()
+    failed = download_universe(
+        read_tickers(ticker_file), output_dir, args.start, args.end, source=source,
+        workers=args.workers, batch_size=args.batch, rate=args.rate, retries=args.retries,
+    )
+    print(f"Download finished in {time.perf_counter() - started:.1f}s")
+    if args.graph:
+        from scripts.graph.incremental import refresh_graph
+        try:
+            refresh_graph(input_dir=output_dir)
+        except FileNotFoundError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,140 @@
+import os
+import shutil
+import argparse
+import dataclasses
+
+import numpy as np
+import pandas as pd
+
+from scripts.stock_data.loader import RAW_DATA_DIR, list_tickers, load_stock_data, report_errors, to_panel
+
+# ------------------------------------------------------------------------
+# 1) Define Paths
+# ------------------------------------------------------------------------
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+# Binary panel built from data/stock_data:
+#   values.npy   dates x tickers x fields array, opened with numpy.memmap
+#   dates.npy    datetime64[D] row index
+#   tickers.txt  one ticker per line (column index)
+#   fields.txt   one field per line (last-axis index)
+PANEL_DIR = os.path.join(PROJECT_ROOT, "data", "stock_panel")
+
+PANEL_FIELDS = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+
+# ------------------------------------------------------------------------
+# 2) Panel
+# ------------------------------------------------------------------------
+
+@dataclasses.dataclass(frozen=True)
+class Panel:
+    """
+    A memory-mapped (dates x tickers x fields) price panel. `values` is
+    read-only and backed by the OS page cache, so every process that opens
+    the same panel shares one copy. All slicing methods return views.
+    """
+    dates: pd.DatetimeIndex
+    tickers: tuple
+    fields: tuple
+    values: np.ndarray
+    ticker_index: dict = dataclasses.field(repr=False)
+    field_index: dict = dataclasses.field(repr=False)
+
+    def date_slice(self, start=None, end=None):
+        """Row slice covering [start, end] (inclusive)."""
+        lo = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), side="left")
+        hi = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side="right")
+        return slice(lo, hi)
+
+    def get(self, ticker, field="Close", start=None, end=None):
+        """Returns a view of one ticker's `field` over [start, end]."""
+        return self.values[self.date_slice(start, end), self.ticker_index[ticker], self.field_index[field]]
+
+    def field_matrix(self, field="Close", start=None, end=None):
+        """Returns a (dates x tickers) view of `field` over [start, end]."""
+        return self.values[self.date_slice(start, end), :, self.field_index[field]]
+
+    def ticker_frame(self, ticker, start=None, end=None):
+        """
+        Returns a (Date, <fields>) frame for one ticker whose values are a
+        view of the panel. Dates on which the ticker has no row are NaN.
+        """
+        rows = self.date_slice(start, end)
+        frame = pd.DataFrame(
+            self.values[rows, self.ticker_index[ticker], :],
+            columns=list(self.fields),
+            copy=False,
+        )
+        frame.insert(0, "Date", self.dates[rows])
+        return frame
+
+
+def open_panel(panel_dir=PANEL_DIR):
+    """
+    Opens a panel written by build_panel without reading the values.
+
+    Raises:
+        FileNotFoundError: If `panel_dir` holds no panel.
+    """
+    values_path = os.path.join(panel_dir, "values.npy")
+    if not os.path.exists(values_path):
+        raise FileNotFoundError(f"No price panel found at {panel_dir}. Run scripts/stock_data/panel.py first.")
+
+    values = np.load(values_path, mmap_mode="r")
+    dates = pd.DatetimeIndex(np.load(os.path.join(panel_dir, "dates.npy")), name="Date")
+    with open(os.path.join(panel_dir, "tickers.txt"), "r", encoding="utf-8") as f:
+        tickers = tuple(line.strip() for line in f if line.strip())
+    with open(os.path.join(panel_dir, "fields.txt"), "r", encoding="utf-8") as f:
+        fields = tuple(line.strip() for line in f if line.strip())
+
+    return Panel(
+        dates, tickers, fields, values,
+        {ticker: j for j, ticker in enumerate(tickers)},
+        {name: k for k, name in enumerate(fields)},
+    )
+
+# ------------------------------------------------------------------------
+# 3) Builder
+# ------------------------------------------------------------------------
+
+def build_panel(input_dir=RAW_DATA_DIR, panel_dir=PANEL_DIR, fields=PANEL_FIELDS, dtype="float64",
+                workers=None, store_dir=None):
+    """
+    Builds the binary panel from every ticker CSV in `input_dir` (or from
+    the Parquet store, see store.py) and returns `panel_dir`; open it with
+    open_panel. The new panel is written next to `panel_dir` and swapped in
+    at the end, so readers never see a half-written panel.
+    """
+    tickers = list_tickers(input_dir) if store_dir is None else list_tickers(store_dir, ".parquet")
+    data, errors = load_stock_data(tickers, input_dir, columns=list(fields), workers=workers, store_dir=store_dir)
+    report_errors(errors, len(tickers))
+
+    dates, loaded, values = to_panel(data, columns=tuple(fields), dtype=dtype)
+    del data
+
+    tmp_dir = panel_dir.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, "values.npy"), values)
+    np.save(os.path.join(tmp_dir, "dates.npy"), dates.to_numpy(dtype="datetime64[D]"))
+    with open(os.path.join(tmp_dir, "tickers.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(loaded) + "\n")
+    with open(os.path.join(tmp_dir, "fields.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(fields) + "\n")
+
+    shutil.rmtree(panel_dir, ignore_errors=True)
+    os.replace(tmp_dir, panel_dir)
+    print(f"Price panel {values.shape} saved to {panel_dir}")
+    return panel_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the memory-mapped price panel from data/stock_data.")
+    parser.add_argument("-input", default=RAW_DATA_DIR, help="Directory with the per-ticker CSVs")
+    parser.add_argument("-output", default=PANEL_DIR, help="Directory of the panel")
+    parser.add_argument("-store", default=None, help="Read from this Parquet store instead of the CSVs")
+    parser.add_argument("-workers", type=int, default=None, help="Number of reader threads")
+    args = parser.parse_args()
+
+    build_panel(args.input, args.output, workers=args.workers, store_dir=args.store)
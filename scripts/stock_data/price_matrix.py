@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from scripts.stock_data.loader import RAW_DATA_DIR, list_tickers, load_stock_data, to_panel
+
+# ------------------------------------------------------------------------
+# 1) Price Matrix
+# ------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class PriceMatrix:
+    """
+    One price field for a whole ticker universe: `values[i, j]` is the price
+    of `tickers[j]` on `dates[i]`, NaN where the ticker has no row that day.
+    """
+    dates: pd.DatetimeIndex
+    tickers: tuple
+    values: np.ndarray
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def column(self, ticker):
+        """Returns the price series of one ticker."""
+        return pd.Series(self.values[:, self.tickers.index(ticker)], index=self.dates, name=ticker)
+
+    def to_frame(self, suffix="_closing"):
+        """
+        Returns the wide (Date, <ticker><suffix>, ...) frame used by
+        merged_stock_data.csv. The values are not copied.
+        """
+        frame = pd.DataFrame(
+            self.values,
+            columns=[f"{ticker}{suffix}" for ticker in self.tickers],
+            copy=False,
+        )
+        frame.insert(0, "Date", self.dates)
+        return frame
+
+# ------------------------------------------------------------------------
+# 2) Builder
+# ------------------------------------------------------------------------
+
+def build_price_matrix(input_dir=RAW_DATA_DIR, field="Close", dtype="float64", tickers=None, workers=None,
+                       start=None, end=None, store_dir=None):
+    """
+    Builds the (dates x tickers) matrix of `field` for every ticker CSV in
+    `input_dir` (or only `tickers`, if given) in a single pass.
+
+    Each file contributes its two columns only (read concurrently by
+    `workers` threads, see loader.py); the union of all dates is computed
+    once and every ticker is scattered into its column of one preallocated
+    `dtype` array, so memory stays close to the size of the final matrix.
+    With `store_dir`, the prices are read from the Parquet store instead
+    (see store.py); `start`/`end` restrict the dates either way.
+
+    Returns:
+        (PriceMatrix, errors): The matrix with tickers in sorted order, and
+        a dict ticker -> error message for files that could not be read.
+    """
+    if tickers is None:
+        tickers = list_tickers(input_dir) if store_dir is None else list_tickers(store_dir, ".parquet")
+    # The store is already typed; to_panel casts into the `dtype` matrix
+    read_dtype = dtype if store_dir is None else None
+    columns, errors = load_stock_data(sorted(tickers), input_dir, columns=[field], dtype=read_dtype,
+                                      workers=workers, start=start, end=end, store_dir=store_dir)
+
+    dates, loaded, panel = to_panel(columns, columns=(field,), dtype=dtype)
+    return PriceMatrix(dates, tuple(loaded), panel[:, :, 0]), errors
@@ -0,0 +1,122 @@
+import os
+import sys
+import errno
+import argparse
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from scripts.stock_data.loader import RAW_DATA_DIR, list_tickers, load_stock_data, report_errors
+
+# ------------------------------------------------------------------------
+# 1) Define Paths
+# ------------------------------------------------------------------------
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+# One Parquet file per ticker, typed like loader.STOCK_DTYPES
+STORE_DIR = os.path.join(PROJECT_ROOT, "data", "stock_store")
+
+# About one trading year per row group, so date filters can skip whole
+# groups using the Date min/max statistics
+ROW_GROUP_SIZE = 252
+
+# ------------------------------------------------------------------------
+# 2) Per-Ticker Files
+# ------------------------------------------------------------------------
+
+def store_path(ticker, store_dir=STORE_DIR):
+    return os.path.join(store_dir, f"{ticker}.parquet")
+
+
+def write_ticker(ticker, df, store_dir=STORE_DIR):
+    """
+    Saves a parsed ticker frame (see loader.read_stock_csv) as Parquet.
+    The file is replaced atomically so readers never see a partial write.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    path = store_path(ticker, store_dir)
+    tmp_path = path + ".tmp"
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp_path, path)
+
+
+def _matching_row_groups(parquet_file, start, end):
+    """Row groups whose Date min/max statistics overlap [start, end]."""
+    metadata = parquet_file.metadata
+    date_index = parquet_file.schema_arrow.get_field_index("Date")
+    groups = []
+    for i in range(metadata.num_row_groups):
+        stats = metadata.row_group(i).column(date_index).statistics
+        if stats is not None and stats.has_min_max:
+            if start is not None and pd.Timestamp(stats.max) < start:
+                continue
+            if end is not None and pd.Timestamp(stats.min) > end:
+                continue
+        groups.append(i)
+    return groups
+
+
+def read_ticker(ticker, columns=None, start=None, end=None, store_dir=STORE_DIR):
+    """
+    Reads one ticker from the store. Only 'Date' plus `columns` (default:
+    all) are decoded, and row groups entirely outside `start`/`end`
+    (inclusive) are skipped using their Date statistics.
+
+    Raises:
+        FileNotFoundError: If the ticker is not in the store.
+    """
+    path = store_path(ticker, store_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(errno.ENOENT, "Ticker not in store", path)
+
+    read_columns = None if columns is None else ["Date"] + [col for col in columns if col != "Date"]
+    start = None if start is None else pd.Timestamp(start)
+    end = None if end is None else pd.Timestamp(end)
+
+    parquet_file = pq.ParquetFile(path)
+    if start is None and end is None:
+        df = parquet_file.read(columns=read_columns).to_pandas()
+    else:
+        groups = _matching_row_groups(parquet_file, start, end)
+        df = parquet_file.read_row_groups(groups, columns=read_columns).to_pandas()
+        keep = pd.Series(True, index=df.index)
+        if start is not None:
+            keep &= df["Date"] >= start
+        if end is not None:
+            keep &= df["Date"] <= end
+        df = df[keep].reset_index(drop=True)
+    return df
+
+# ------------------------------------------------------------------------
+# 3) Migration
+# ------------------------------------------------------------------------
+
+def migrate(input_dir=RAW_DATA_DIR, store_dir=STORE_DIR, workers=None):
+    """
+    Converts every ticker CSV in `input_dir` into the Parquet store.
+    Returns a dict ticker -> error message for the files that failed.
+    """
+    tickers = list_tickers(input_dir)
+    data, errors = load_stock_data(tickers, input_dir, workers=workers)
+    for ticker, df in data.items():
+        try:
+            write_ticker(ticker, df, store_dir)
+        except (OSError, pa.ArrowException) as e:
+            errors[ticker] = str(e)
+    report_errors(errors, len(tickers))
+    print(f"Migrated {len(tickers) - len(errors)} tickers to {store_dir}")
+    return errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert data/stock_data CSVs into the Parquet store.")
+    parser.add_argument("-input", default=RAW_DATA_DIR, help="Directory with the per-ticker CSVs")
+    parser.add_argument("-output", default=STORE_DIR, help="Directory of the Parquet store")
+    parser.add_argument("-workers", type=int, default=None, help="Number of reader threads")
+    args = parser.parse_args()
+
+    if migrate(args.input, args.output, args.workers):
+        sys.exit(1)
@@ -0,0 +1,92 @@
+import calendar
+
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------
+# 1) Known Source Layouts
+# ------------------------------------------------------------------------
+# "iso"      '2024-12-19', '2024-12-19 00:00:00', '2015-01-05 00:00:00-05:00'
+#            (refined/formatted CSVs, yfinance exports; the date part is kept)
+# "release"  'Dec 19, 2024 (Nov)', 'Dec 19, 2024' (investing.com tables)
+# Year/Month/Day columns are combined with dates_from_ymd instead.
+
+ISO_FORMAT = "%Y-%m-%d"
+RELEASE_FORMAT = "%b %d, %Y"
+
+DATE_LAYOUTS = ("iso", "release")
+
+MONTH_NUMBERS = {name.lower(): number for number, name in enumerate(calendar.month_abbr) if name}
+
+# ------------------------------------------------------------------------
+# 2) Parsing
+# ------------------------------------------------------------------------
+
+def _clean(text, layout):
+    if layout == "iso":
+        return text.str[:10], ISO_FORMAT
+    return text.str.split("(").str[0].str.strip(), RELEASE_FORMAT
+
+
+def parse_dates(values, layout="iso"):
+    """
+    Parses dates written in one of the known source layouts.
+
+    Each distinct string is parsed once, with the layout's explicit format,
+    and the result is broadcast back to all rows. Values that are already
+    datetimes are returned without a string round trip (timezone-aware
+    ones as their local wall time).
+
+    Parameters:
+        values (array-like): Date strings or datetimes.
+        layout (str): One of DATE_LAYOUTS.
+
+    Returns:
+        np.ndarray: datetime64[ns] values, NaT where a value does not parse.
+
+    Raises:
+        ValueError: If `layout` is not a known layout.
+    """
+    if layout not in DATE_LAYOUTS:
+        raise ValueError(f"Unknown date layout '{layout}'. Expected one of {DATE_LAYOUTS}.")
+
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        series = series.dt.tz_localize(None)
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series.to_numpy(dtype="datetime64[ns]")
+
+    codes, uniques = pd.factorize(series)
+    text, date_format = _clean(pd.Series(uniques, dtype=object).astype(str), layout)
+    parsed = pd.to_datetime(text, format=date_format, errors="coerce").to_numpy(dtype="datetime64[ns]")
+
+    dates = parsed.take(np.maximum(codes, 0)) if len(parsed) else np.full(len(codes), np.datetime64("NaT", "ns"))
+    dates[codes < 0] = np.datetime64("NaT", "ns")
+    return dates
+
+
+def _month_numbers(month):
+    month = pd.Series(month)
+    if pd.api.types.is_numeric_dtype(month.dtype):
+        return month.to_numpy(dtype="float64", na_value=np.nan)
+    numbers = month.astype(str).str.strip().str[:3].str.lower().map(MONTH_NUMBERS)
+    return numbers.fillna(pd.to_numeric(month, errors="coerce")).to_numpy(dtype="float64")
+
+
+def dates_from_ymd(year, month, day):
+    """
+    Combines Year, Month (number or name such as 'Dec') and Day columns
+    into datetime64[ns] with integer arithmetic, without building strings.
+    Rows with a missing part or an impossible date (e.g. Feb 30) are NaT.
+    """
+    year = pd.to_numeric(pd.Series(year), errors="coerce").to_numpy(dtype="float64")
+    month = _month_numbers(month)
+    day = pd.to_numeric(pd.Series(day), errors="coerce").to_numpy(dtype="float64")
+
+    valid = np.isfinite(year) & np.isfinite(month) & np.isfinite(day) & (month >= 1) & (month <= 12) & (day >= 1)
+    months = np.where(valid, (year - 1970) * 12 + month - 1, 0).astype("int64").astype("datetime64[M]")
+    dates = months.astype("datetime64[D]") + np.where(valid, day - 1, 0).astype("int64")
+
+    # A day past the end of its month rolls into the next month
+    valid &= dates.astype("datetime64[M]") == months
+    return np.where(valid, dates.astype("datetime64[ns]"), np.datetime64("NaT", "ns"))
@@ -0,0 +1,159 @@
+import os
+import dataclasses
+
+import numpy as np
+import pandas as pd
+from lxml import etree
+
+from scripts.utils.dates import parse_dates
+
+# ------------------------------------------------------------------------
+# 1) Table Schemas
+# ------------------------------------------------------------------------
+# The scraped investing.com history tables (data/raw/*.html) all have the
+# cells Release Date | Time | Actual | Forecast | Previous | (icon), one
+# <tr id="historicEvent_..."> per release. A schema names the cells an
+# indicator keeps and how each one is typed:
+#   "date"     "Dec 19, 2024 (Nov)" -> datetime64 (the release day)
+#   "period"   "Dec 19, 2024 (Nov)" -> "Nov" (reference period, or "")
+#   "percent"  "4.50%" -> 4.5, "" -> NaN
+#   "number"   "48.3" -> 48.3, "" -> NaN
+#   "text"     stripped cell text
+
+COLUMN_KINDS = ("date", "period", "percent", "number", "text")
+
+
+@dataclasses.dataclass(frozen=True)
+class Column:
+    name: str
+    cell: int
+    kind: str = "text"
+
+
+@dataclasses.dataclass(frozen=True)
+class TableSchema:
+    """
+    The columns extracted from one indicator's history table. Rows whose
+    `required` columns are missing (an unparseable date, or a scheduled
+    release without an actual value yet) are dropped.
+    """
+    columns: tuple
+    required: tuple = ("Date", "Actual")
+
+
+def _release_columns(value_kind, value_name="Actual", forecast=True, previous=True, time=False, period=False):
+    columns = [Column("Date", 0, "date")]
+    if period:
+        columns.append(Column("Period", 0, "period"))
+    if time:
+        columns.append(Column("Time", 1, "text"))
+    columns.append(Column(value_name, 2, value_kind))
+    if forecast:
+        columns.append(Column("Forecast", 3, value_kind))
+    if previous:
+        columns.append(Column("Previous", 4, value_kind))
+    return tuple(columns)
+
+
+SCHEMAS = {
+    "cpi": TableSchema(_release_columns("percent", forecast=False, previous=False)),
+    "unemployment": TableSchema(_release_columns("percent", time=True, period=True)),
+    "leading_index": TableSchema(
+        _release_columns("percent", value_name="LeadingIndex", forecast=False, previous=False),
+        required=("Date", "LeadingIndex"),
+    ),
+    "m_pmi": TableSchema(_release_columns("number")),
+    "s_pmi": TableSchema(_release_columns("number")),
+    "interest_rate": TableSchema(
+        _release_columns("percent", time=True),
+        required=("Date", "Actual", "Forecast", "Previous"),
+    ),
+}
+
+# ------------------------------------------------------------------------
+# 2) Streaming Row Extraction
+# ------------------------------------------------------------------------
+
+def iter_history_rows(html_path, width=None):
+    """
+    Yields the stripped texts of the first `width` cells (default: all) of
+    every release row in a saved history table. The file is parsed
+    incrementally with lxml and each row is discarded once read.
+
+    Raises:
+        FileNotFoundError: If `html_path` does not exist.
+    """
+    if not os.path.exists(html_path):
+        raise FileNotFoundError(f"The file '{html_path}' does not exist.")
+
+    for _, row in etree.iterparse(html_path, events=("end",), tag="tr", html=True, encoding="utf-8"):
+        if (row.get("id") or "").startswith("historicEvent_"):
+            # Non-breaking spaces mark empty cells
+            cells = row.findall("td")[:width]
+            yield ["".join(cell.itertext()).replace("\xa0", " ").strip() for cell in cells]
+        row.clear()
+
+# ------------------------------------------------------------------------
+# 3) Typed Columns
+# ------------------------------------------------------------------------
+
+def _to_float(texts, strip_percent):
+    cleaned = pd.Series(texts, dtype=object).str.replace(",", "", regex=False)
+    if strip_percent:
+        cleaned = cleaned.str.rstrip("%")
+    return pd.to_numeric(cleaned, errors="coerce").to_numpy(dtype="float64")
+
+
+def _convert(texts, kind):
+    if kind == "date":
+        return parse_dates(pd.Series(texts, dtype=object), "release")
+    if kind == "period":
+        period = pd.Series(texts, dtype=object).str.extract(r"\(([^)]*)\)", expand=False)
+        return period.fillna("").to_numpy(dtype=object)
+    if kind == "percent":
+        return _to_float(texts, strip_percent=True)
+    if kind == "number":
+        return _to_float(texts, strip_percent=False)
+    if kind == "text":
+        return np.asarray(texts, dtype=object)
+    raise ValueError(f"Unknown column kind '{kind}'. Expected one of {COLUMN_KINDS}.")
+
+
+def read_history_table(html_path, schema):
+    """
+    Extracts the columns of `schema` from a saved history table.
+
+    Parameters:
+        html_path (str): Path to the saved table (data/raw/*.html).
+        schema (TableSchema): The indicator's schema (see SCHEMAS).
+
+    Returns:
+        dict: Column name -> NumPy array (datetime64[ns], float64 or object),
+            in table order (newest release first).
+
+    Raises:
+        FileNotFoundError: If `html_path` does not exist.
+        ValueError: If the table has no release rows.
+    """
+    width = max(column.cell for column in schema.columns) + 1
+    cells = [[] for _ in range(width)]
+    for row in iter_history_rows(html_path, width):
+        if len(row) < width:
+            continue
+        for i in range(width):
+            cells[i].append(row[i])
+    if not cells[0]:
+        raise ValueError(f"No release rows found in '{html_path}'.")
+
+    arrays = {column.name: _convert(cells[column.cell], column.kind) for column in schema.columns}
+
+    keep = np.ones(len(cells[0]), dtype=bool)
+    for name in schema.required:
+        values = arrays[name]
+        keep &= ~(np.isnat(values) if values.dtype.kind == "M" else pd.isna(values))
+    return {name: values[keep] for name, values in arrays.items()}
+
+
+def read_history_frame(html_path, schema):
+    """read_history_table as a DataFrame."""
+    return pd.DataFrame(read_history_table(html_path, schema))
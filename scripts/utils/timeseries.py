@@ -0,0 +1,202 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+STOCK_DATA_DIR = os.path.join(PROJECT_ROOT, "data", "stock_data")
+
+# Target calendar shared by the format_data scripts
+FORMAT_CALENDAR = "daily"
+FORMAT_START = "2020-01-01"
+
+CALENDARS = ("daily", "business", "trading")
+FILLS = ("step", "linear", "release_lag")
+
+# ------------------------------------------------------------------------
+# 1) Target Calendars
+# ------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def trading_days(stock_dir=STOCK_DATA_DIR):
+    """
+    Returns the sorted union of all dates found in the per-ticker CSVs of
+    `stock_dir` as a DatetimeIndex. Only the 'Date' column is read.
+    """
+    dates = []
+    for file_name in sorted(os.listdir(stock_dir)):
+        if file_name.endswith(".csv"):
+            try:
+                frame = pd.read_csv(os.path.join(stock_dir, file_name), usecols=["Date"])
+            except (ValueError, OSError) as e:
+                print(f"[WARNING] Skipping {file_name} while building the trading calendar: {e}")
+                continue
+            dates.append(pd.to_datetime(frame["Date"], format="%Y-%m-%d", errors="coerce").to_numpy(dtype="datetime64[ns]"))
+    if not dates:
+        return pd.DatetimeIndex([])
+    all_dates = np.concatenate(dates)
+    return pd.DatetimeIndex(np.unique(all_dates[~np.isnat(all_dates)]))
+
+
+def build_calendar(kind, start, end, stock_dir=STOCK_DATA_DIR):
+    """
+    Builds a target calendar between `start` and `end` (inclusive).
+
+    Parameters:
+        kind (str): "daily" (every calendar day), "business" (Mon-Fri) or
+            "trading" (dates present in data/stock_data).
+        start, end (date-like): Calendar bounds.
+
+    Returns:
+        pd.DatetimeIndex: The calendar days.
+
+    Raises:
+        ValueError: If `kind` is not a known calendar.
+    """
+    if kind == "daily":
+        return pd.date_range(start=start, end=end, freq="D")
+    if kind == "business":
+        return pd.bdate_range(start=start, end=end)
+    if kind == "trading":
+        days = trading_days(stock_dir)
+        return days[(days >= pd.Timestamp(start)) & (days <= pd.Timestamp(end))]
+    raise ValueError(f"Unknown calendar '{kind}'. Expected one of {CALENDARS}.")
+
+# ------------------------------------------------------------------------
+# 2) As-of Materialization
+# ------------------------------------------------------------------------
+
+def materialize(frame, date_column="Date", calendar=FORMAT_CALENDAR, start=None, end=None,
+                fill="step", release_lag=None, value_columns=None):
+    """
+    Materializes a release-dated indicator onto a target calendar in one
+    vectorized pass.
+
+    Parameters:
+        frame (pd.DataFrame): One row per release, with a datetime column.
+        date_column (str): Name of the release/observation date column.
+        calendar (str or pd.DatetimeIndex): A calendar kind accepted by
+            build_calendar, or the calendar days themselves.
+        start, end (date-like, optional): Calendar bounds when `calendar` is a
+            kind. Default: first and last date the values become available.
+        fill (str): "step" carries the latest release forward; "linear"
+            interpolates `value_columns` between releases (other columns
+            step); "release_lag" is a step fill where each value only becomes
+            available `release_lag` after its observation date.
+        release_lag (pd.DateOffset or pd.Timedelta): Required for
+            fill="release_lag".
+        value_columns (list of str, optional): Columns to interpolate for
+            fill="linear". Default: all numeric columns.
+
+    Returns:
+        pd.DataFrame: One row per calendar day, with `date_column` holding the
+        day and the other columns taken as of that day. Days before the
+        first available value are dropped.
+
+    Raises:
+        ValueError: If `fill` is unknown or release_lag is missing.
+    """
+    if fill not in FILLS:
+        raise ValueError(f"Unknown fill '{fill}'. Expected one of {FILLS}.")
+
+    observations = frame.dropna(subset=[date_column])
+    if fill == "release_lag":
+        if release_lag is None:
+            raise ValueError("fill='release_lag' requires a release_lag.")
+        observations = observations.assign(**{date_column: observations[date_column] + release_lag})
+
+    observations = (
+        observations.sort_values(date_column, kind="mergesort")
+        .drop_duplicates(subset=[date_column], keep="last")
+        .reset_index(drop=True)
+    )
+    if observations.empty:
+        return observations
+
+    observation_dates = observations[date_column].to_numpy(dtype="datetime64[ns]")
+    if isinstance(calendar, str):
+        start = observation_dates[0] if start is None else start
+        end = observation_dates[-1] if end is None else end
+        calendar = build_calendar(calendar, start, end)
+    calendar_days = pd.DatetimeIndex(calendar).to_numpy(dtype="datetime64[ns]")
+
+    # Index of the last release on or before each calendar day (-1 if none)
+    positions = np.searchsorted(observation_dates, calendar_days, side="right") - 1
+    valid = positions >= 0
+
+    materialized = observations.take(positions[valid]).reset_index(drop=True)
+    materialized[date_column] = pd.DatetimeIndex(calendar_days[valid])
+
+    if fill == "linear":
+        if value_columns is None:
+            value_columns = [
+                col for col in observations.columns
+                if col != date_column and pd.api.types.is_numeric_dtype(observations[col])
+            ]
+        x_days = calendar_days[valid].astype("int64")
+        x_obs = observation_dates.astype("int64")
+        for col in value_columns:
+            values = observations[col].to_numpy(dtype="float64")
+            known = ~np.isnan(values)
+            if known.any():
+                materialized[col] = np.interp(x_days, x_obs[known], values[known])
+
+    return materialized
+
+# ------------------------------------------------------------------------
+# 3) As-of Joins onto an Existing Index
+# ------------------------------------------------------------------------
+
+# Releases at or after the close can only be acted on the next trading day
+MARKET_CLOSE = "16:00"
+
+
+def asof_join(index, frame, date_column="Date", columns=None, release_time=None, lag=None,
+              close_time=MARKET_CLOSE):
+    """
+    Aligns a dated table onto the days of `index` with merge_asof
+    (backward) semantics in one sorted pass: each day gets the latest row
+    that was already public at that day's close.
+
+    Parameters:
+        index (pd.DatetimeIndex): Target days, e.g. the trading days of
+            the price matrix. Need not be sorted.
+        frame (pd.DataFrame): Rows dated by `date_column` (release days, or
+            a table already materialized onto a calendar).
+        columns (list of str, optional): Columns to align. Default: all
+            but `date_column`.
+        release_time (str, optional): 'HH:MM' publication time on the row's
+            date. At or after `close_time` a row is only used from the
+            following day; earlier (or None) it is used on its own date.
+        lag (pd.DateOffset or pd.Timedelta, optional): Delay between a
+            row's date and its publication (e.g. for observation-dated data).
+
+    Returns:
+        pd.DataFrame: `columns` aligned to `index` (same length and order,
+        default RangeIndex). Days before the first available row are NaN.
+    """
+    columns = [col for col in frame.columns if col != date_column] if columns is None else list(columns)
+
+    rows = frame.dropna(subset=[date_column])
+    if lag is not None:
+        rows = rows.assign(**{date_column: rows[date_column] + lag})
+    rows = (
+        rows.sort_values(date_column, kind="mergesort")
+        .drop_duplicates(subset=[date_column], keep="last")
+        .reset_index(drop=True)
+    )
+
+    days = pd.DatetimeIndex(index).to_numpy(dtype="datetime64[ns]")
+    available = rows[date_column].to_numpy(dtype="datetime64[ns]")
+    same_day = release_time is None or release_time < close_time
+
+    # Index of the last row public by each day's close (-1 if none)
+    positions = np.searchsorted(available, days, side="right" if same_day else "left") - 1
+    valid = positions >= 0
+
+    aligned = rows[columns].take(np.maximum(positions, 0)).reset_index(drop=True)
+    if not valid.all():
+        aligned = aligned.where(np.broadcast_to(valid[:, None], aligned.shape))
+    return aligned
+
@@ -0,0 +1,214 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.stock_data import coverage, downloader
+from scripts.stock_data.downloader import PRICE_COLUMNS, LocalCsvSource, fetch_with_retry, make_batches
+from scripts.stock_data.coverage import CoverageIndex
+from scripts.stock_data.macro import download_universe, save_new_rows
+
+START, END = "2024-01-02", "2024-02-01"
+DATES = pd.bdate_range(START, "2024-01-31")
+TICKERS = ["A", "B", "C", "D", "E"]
+
+# ------------------------------------------------------------------------
+# 1) Helpers
+# ------------------------------------------------------------------------
+
+def price_frame(dates, base=100.0):
+    """OHLCV rows whose prices are exact in binary, so CSV round trips are lossless."""
+    steps = np.arange(len(dates)) * 0.25
+    frame = pd.DataFrame({"Date": dates})
+    for offset, column in enumerate(PRICE_COLUMNS[:-1]):
+        frame[column] = base + offset + steps
+    frame["Volume"] = 1000 + np.arange(len(dates))
+    return frame
+
+
+def write_prices(directory, ticker, frame):
+    path = directory / f"{ticker}.csv"
+    frame.to_csv(path, index=False, date_format="%Y-%m-%d")
+    return path
+
+
+def read_prices(path):
+    frame = pd.read_csv(path, float_precision="round_trip")
+    frame["Date"] = pd.to_datetime(frame["Date"])
+    return frame
+
+
+class RecordingSource(LocalCsvSource):
+    """LocalCsvSource that records every request and fails the first `failures` of them."""
+
+    def __init__(self, directory, failures=0):
+        super().__init__(directory)
+        self.failures = failures
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def fetch(self, tickers, start, end):
+        with self.lock:
+            self.calls.append((start, end, tuple(tickers)))
+            fail = len(self.calls) <= self.failures
+        if fail:
+            raise ConnectionError("simulated outage")
+        return super().fetch(tickers, start, end)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records the backoff delays instead of sleeping."""
+    delays = []
+    monkeypatch.setattr(downloader.time, "sleep", delays.append)
+    return delays
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    directory = tmp_path / "source"
+    directory.mkdir()
+    for i, ticker in enumerate(TICKERS):
+        write_prices(directory, ticker, price_frame(DATES, base=100.0 * (i + 1)))
+    return directory
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    """A, B and C are stored up to 2024-01-15; D and E are not stored yet."""
+    directory = tmp_path / "stock_data"
+    directory.mkdir()
+    for i, ticker in enumerate(TICKERS[:3]):
+        write_prices(directory, ticker, price_frame(DATES, base=100.0 * (i + 1))[:10])
+    return directory
+
+# ------------------------------------------------------------------------
+# 2) Batching
+# ------------------------------------------------------------------------
+
+def test_make_batches_splits_each_window():
+    windows = {("2024-01-16", END): ["A", "B", "C"], (START, END): ["D"]}
+    assert make_batches(windows, 2) == [
+        (START, END, ["D"]),
+        ("2024-01-16", END, ["A", "B"]),
+        ("2024-01-16", END, ["C"]),
+    ]
+
+
+def test_download_universe_batches_tickers_sharing_a_window(source_dir, output_dir, sleeps):
+    source = RecordingSource(source_dir)
+    errors = download_universe(TICKERS, str(output_dir), START, END, source=source,
+                               workers=2, batch_size=2, rate=0, retries=0)
+
+    assert errors == {}
+    assert sorted(source.calls) == [
+        (START, END, ("D", "E")),
+        ("2024-01-16", END, ("A", "B")),
+        ("2024-01-16", END, ("C",)),
+    ]
+    for ticker in TICKERS:
+        pd.testing.assert_frame_equal(read_prices(output_dir / f"{ticker}.csv"),
+                                      read_prices(source_dir / f"{ticker}.csv"))
+
+# ------------------------------------------------------------------------
+# 3) Retries and Backoff
+# ------------------------------------------------------------------------
+
+def test_fetch_with_retry_backs_off_exponentially(source_dir, sleeps):
+    source = RecordingSource(source_dir, failures=2)
+    frames = fetch_with_retry(source, ["A"], START, END, retries=3, backoff=0.5)
+
+    assert len(source.calls) == 3
+    assert len(frames["A"]) == len(DATES)
+    assert len(sleeps) == 2
+    assert 0.5 <= sleeps[0] <= 0.55
+    assert 1.0 <= sleeps[1] <= 1.1
+
+
+def test_fetch_with_retry_reraises_the_last_error(source_dir, sleeps):
+    source = RecordingSource(source_dir, failures=5)
+    with pytest.raises(ConnectionError):
+        fetch_with_retry(source, ["A"], START, END, retries=2, backoff=0.5)
+    assert len(source.calls) == 3
+
+
+def test_download_universe_retries_failed_batches(source_dir, output_dir, sleeps):
+    source = RecordingSource(source_dir, failures=2)
+    errors = download_universe(TICKERS, str(output_dir), START, END, source=source,
+                               workers=1, batch_size=2, rate=0, retries=2, backoff=0.5)
+
+    assert errors == {}
+    assert len(source.calls) == 3 + 2
+    assert len(sleeps) == 2
+    for ticker in TICKERS:
+        pd.testing.assert_frame_equal(read_prices(output_dir / f"{ticker}.csv"),
+                                      read_prices(source_dir / f"{ticker}.csv"))
+
+
+def test_download_universe_reports_batches_that_keep_failing(source_dir, output_dir, sleeps):
+    source = RecordingSource(source_dir, failures=100)
+    errors = download_universe(TICKERS, str(output_dir), START, END, source=source,
+                               workers=2, batch_size=2, rate=0, retries=1, backoff=0.5)
+
+    assert sorted(errors) == TICKERS
+    assert all("simulated outage" in error for error in errors.values())
+    assert len(source.calls) == 3 * 2
+    assert not (output_dir / "D.csv").exists()
+    assert len(read_prices(output_dir / "A.csv")) == 10
+
+# ------------------------------------------------------------------------
+# 4) Saving New Rows
+# ------------------------------------------------------------------------
+
+def test_save_new_rows_appends_newer_days_without_reading_the_history(output_dir, monkeypatch):
+    csv_path = output_dir / "A.csv"
+    stored = csv_path.read_bytes()
+    index = CoverageIndex(str(output_dir))
+    index.date_range("A")
+
+    reads = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(pd, "read_csv", lambda *args, **kwargs: reads.append(kwargs) or read_csv(*args, **kwargs))
+    rows = save_new_rows("A", str(output_dir), [price_frame(DATES)[10:]], index)
+    monkeypatch.undo()
+
+    assert rows == len(DATES) - 10
+    # Only the header was read, and the stored bytes were left in place
+    assert [kwargs.get("nrows") for kwargs in reads] == [0]
+    assert csv_path.read_bytes().startswith(stored)
+    pd.testing.assert_frame_equal(read_prices(csv_path), price_frame(DATES))
+    assert index.date_range("A") == (DATES[0], DATES[-1])
+
+
+def test_save_new_rows_rewrites_the_file_on_backfill(tmp_path):
+    write_prices(tmp_path, "A", price_frame(DATES)[5:])
+    index = CoverageIndex(str(tmp_path))
+
+    # Overlapping earlier rows: merged, de-duplicated and sorted by date
+    rows = save_new_rows("A", str(tmp_path), [price_frame(DATES)[:8]], index)
+
+    assert rows == 8
+    pd.testing.assert_frame_equal(read_prices(tmp_path / "A.csv"), price_frame(DATES))
+    assert index.date_range("A") == (DATES[0], DATES[-1])
+
+# ------------------------------------------------------------------------
+# 5) Coverage Index
+# ------------------------------------------------------------------------
+
+def test_download_universe_keeps_the_coverage_index_current(source_dir, output_dir, sleeps, monkeypatch):
+    download_universe(TICKERS, str(output_dir), START, END, source=RecordingSource(source_dir),
+                      workers=2, batch_size=2, rate=0, retries=0)
+
+    index = CoverageIndex(str(output_dir))
+    for ticker in TICKERS:
+        record = index.records[ticker]
+        assert (record["min_date"], record["max_date"], record["rows"]) == ("2024-01-02", "2024-01-31", len(DATES))
+        # Appended files carry a checksum extended over the new bytes only
+        assert index.verify(ticker)
+
+    # A second run plans from the saved records alone: no file is parsed, nothing is fetched
+    monkeypatch.setattr(coverage, "scan_csv", lambda csv_path: pytest.fail(f"re-scanned {csv_path}"))
+    source = RecordingSource(source_dir)
+    assert download_universe(TICKERS, str(output_dir), START, END, source=source, rate=0) == {}
+    assert source.calls == []
@@ -0,0 +1,82 @@
+import os
+import shutil
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("selenium")
+
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import WebDriverException
+
+from scripts.scrap_data.browser import CHROMEDRIVER_PATH, BrowserPool, serve_directory
+from scripts.scrap_data.investing import INDICATOR_PAGES, RAW_DATA_DIR, scrape_indicators, write_fixtures
+
+# Saved tables are cut to this many rows: the fixture pages show 20 and
+# need two "Show more" clicks for the rest
+ROWS = 45
+NAMES = ["cpi", "unemployment"]
+
+# ------------------------------------------------------------------------
+# 1) Helpers
+# ------------------------------------------------------------------------
+
+def history_rows(table_html, page):
+    """(row id, cell texts) of every row of the page's history table."""
+    table = BeautifulSoup(table_html, "html.parser").find("table", {"id": page.table_id})
+    return [
+        (row.get("id"), [cell.get_text(" ", strip=True) for cell in row.find_all("td")])
+        for row in table.find("tbody").find_all("tr", recursive=False)
+    ]
+
+
+def truncated_table(page, rows=ROWS):
+    """The page's table saved under data/raw, cut to its first `rows` rows."""
+    with open(os.path.join(RAW_DATA_DIR, page.html_file), "r", encoding="utf-8") as file:
+        soup = BeautifulSoup(file.read(), "html.parser")
+    table = soup.find("table", {"id": page.table_id})
+    for row in table.find("tbody").find_all("tr", recursive=False)[rows:]:
+        row.decompose()
+    return str(table)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    """One headless Chrome shared by the tests; skipped when Chrome cannot start."""
+    chromedriver = CHROMEDRIVER_PATH if os.path.exists(CHROMEDRIVER_PATH) else shutil.which("chromedriver")
+    if chromedriver is None:
+        pytest.skip("chromedriver not found")
+    browsers = BrowserPool(1, chromedriver)
+    try:
+        browsers.start()
+    except WebDriverException as e:
+        pytest.skip(f"Chrome could not be started: {e.msg}")
+    yield browsers
+    browsers.close()
+
+# ------------------------------------------------------------------------
+# 2) Scraping the Fixture Pages
+# ------------------------------------------------------------------------
+
+def test_scrape_indicators_expands_every_fixture_table(tmp_path, pool):
+    tables_dir = tmp_path / "tables"
+    tables_dir.mkdir()
+    for name in NAMES:
+        page = INDICATOR_PAGES[name]
+        (tables_dir / page.html_file).write_text(truncated_table(page), encoding="utf-8")
+    fixtures_dir = tmp_path / "fixtures"
+    write_fixtures(str(fixtures_dir), raw_dir=str(tables_dir), delay_ms=50)
+
+    raw_dir = tmp_path / "raw"
+    with serve_directory(str(fixtures_dir)) as base_url:
+        errors = scrape_indicators(NAMES, pool=pool, base_url=base_url, raw_dir=str(raw_dir))
+
+    assert errors == {}
+    for name in NAMES:
+        page = INDICATOR_PAGES[name]
+        expected = history_rows((tables_dir / page.html_file).read_text(encoding="utf-8"), page)
+        scraped = history_rows((raw_dir / page.html_file).read_text(encoding="utf-8"), page)
+        assert len(expected) == ROWS
+        assert scraped == expected
+    # The pool stays open for the caller, with only its home tab left
+    assert len(pool.drivers[0].window_handles) == 1